@@ -12,12 +12,16 @@ def main():
     parser.add_argument('-s', '--skip', help='Skip boot rom', action='store_true')
     parser.add_argument('-c', '--cgb', help='CGB MODE', action='store_true')
     parser.add_argument('-d', '--debug', help='Debug mode', action='store_true')
+    parser.add_argument('--headless', help='Run without window and sound', action='store_true')
     args = parser.parse_args()
     if args.debug:
         logging.basicConfig(level=logging.DEBUG, filename='vsgb.log', filemode='w', format='%(levelname)s: %(message)s')
     else:
         logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
-    emulator = Emulator(args.rom, args.cgb)
+    if args.headless:
+        emulator = Emulator(args.rom, args.cgb, video=None, audio=None)
+    else:
+        emulator = Emulator(args.rom, args.cgb)
     if args.skip:
         emulator.skip_boot_rom()
     emulator.run()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from vsgb import alu_tables
+
+# Reference implementations, computing every flag on its own the way the
+# instruction handlers did before the tables. They return (result, F).
+
+def flags(z: bool, n: bool, h: bool, c: bool) -> int:
+    return (0x80 if z else 0) | (0x40 if n else 0) | (0x20 if h else 0) | (0x10 if c else 0)
+
+def add(a: int, value: int, carry: int) -> tuple:
+    result = a + value + carry
+    return result & 0xff, flags(result & 0xff == 0, False, (a & 0xf) + (value & 0xf) + carry > 0xf, result > 0xff)
+
+def sub(a: int, value: int, carry: int) -> tuple:
+    result = a - value - carry
+    return result & 0xff, flags(result & 0xff == 0, True, (a & 0xf) - (value & 0xf) - carry < 0, result < 0)
+
+def inc(value: int) -> tuple:
+    result = (value + 1) & 0xff
+    return result, flags(result == 0, False, result & 0xf == 0, False)
+
+def dec(value: int) -> tuple:
+    result = (value - 1) & 0xff
+    return result, flags(result == 0, True, result & 0xf == 0xf, False)
+
+def daa(a: int, f: int) -> tuple:
+    n, h, c = f & 0x40, f & 0x20, f & 0x10
+    if n:
+        if h:
+            a = (a - 0x06) & 0xff
+        if c:
+            a = (a - 0x60) & 0xff
+    else:
+        if h or (a & 0x0f) > 0x09:
+            a += 0x06
+        if c or a > 0x9f:
+            a += 0x60
+    return a & 0xff, flags(a & 0xff == 0, n, False, c or a > 0xff)
+
+def rlc(value: int, carry: int) -> tuple:
+    result = ((value << 1) & 0xff) | (value >> 7)
+    return result, flags(result == 0, False, False, value & 0x80)
+
+def rrc(value: int, carry: int) -> tuple:
+    result = (value >> 1) | ((value & 1) << 7)
+    return result, flags(result == 0, False, False, value & 1)
+
+def rl(value: int, carry: int) -> tuple:
+    result = ((value << 1) & 0xff) | carry
+    return result, flags(result == 0, False, False, value & 0x80)
+
+def rr(value: int, carry: int) -> tuple:
+    result = (value >> 1) | (carry << 7)
+    return result, flags(result == 0, False, False, value & 1)
+
+def sla(value: int, carry: int) -> tuple:
+    result = (value << 1) & 0xff
+    return result, flags(result == 0, False, False, value & 0x80)
+
+def sra(value: int, carry: int) -> tuple:
+    result = (value >> 1) | (value & 0x80)
+    return result, flags(result == 0, False, False, value & 1)
+
+def srl(value: int, carry: int) -> tuple:
+    result = value >> 1
+    return result, flags(result == 0, False, False, value & 1)
+
+def swap(value: int, carry: int) -> tuple:
+    result = ((value << 4) & 0xff) | (value >> 4)
+    return result, flags(result == 0, False, False, False)
+
+
+class AluTablesTest(unittest.TestCase):
+
+    def check(self, table, index: int, expected: tuple):
+        result, f = expected
+        self.assertEqual(table[index], (result << 8) | f, 'index {:05x}'.format(index))
+
+    def test_add_sub(self):
+        for table, reference in ((alu_tables.ADD, add), (alu_tables.SUB, sub)):
+            self.assertEqual(len(table), 0x20000)
+            for carry in (0, 1):
+                for a in range(0x100):
+                    for value in range(0x100):
+                        self.check(table, (carry << 16) | (a << 8) | value, reference(a, value, carry))
+
+    def test_inc_dec(self):
+        for value in range(0x100):
+            self.check(alu_tables.INC, value, inc(value))
+            self.check(alu_tables.DEC, value, dec(value))
+
+    def test_daa(self):
+        self.assertEqual(len(alu_tables.DECIMAL_ADJUST), 0x1000)
+        for f in range(0, 0x100, 0x10):
+            for a in range(0x100):
+                self.check(alu_tables.DECIMAL_ADJUST, (f << 4) | a, daa(a, f))
+
+    def test_rotates_and_shifts(self):
+        for table, reference in (
+            (alu_tables.RLC, rlc), (alu_tables.RRC, rrc), (alu_tables.SLA, sla),
+            (alu_tables.SRA, sra), (alu_tables.SRL, srl), (alu_tables.SWAP, swap)
+        ):
+            self.assertEqual(len(table), 0x100)
+            for value in range(0x100):
+                self.check(table, value, reference(value, 0))
+        for table, reference in ((alu_tables.RL, rl), (alu_tables.RR, rr)):
+            self.assertEqual(len(table), 0x200)
+            for carry in (0, 1):
+                for value in range(0x100):
+                    self.check(table, (carry << 8) | value, reference(value, carry))
+
+
+if __name__ == '__main__':
+    unittest.main()
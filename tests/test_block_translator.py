@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+from vsgb.emulator import Emulator
+
+# Starts a fast timer whose interrupt counts in 0xc000, then loops over: an
+# ALU loop writing its results to WRAM, an idle loop waiting on the counter,
+# one waiting on DIV and a halt
+PROGRAM = bytes((
+    0xf3,                   # di
+    0x31, 0xfe, 0xff,       # ld sp, 0xfffe
+    0xaf,                   # xor a
+    0xea, 0x00, 0xc0,       # ld (0xc000), a
+    0x3e, 0xf0, 0xe0, 0x06, # ld a, 0xf0; ldh (TMA), a
+    0x3e, 0x05, 0xe0, 0x07, # ld a, 0x05; ldh (TAC), a
+    0x3e, 0x04, 0xe0, 0xff, # ld a, 0x04; ldh (IE), a
+    0xaf, 0xe0, 0x0f,       # xor a; ldh (IF), a
+    0xfb,                   # ei
+    0x21, 0x00, 0xc1,       # ld hl, 0xc100
+    0x06, 0x00,             # ld b, 0x00
+    0x0e, 0x11,             # ld c, 0x11
+    0x78,                   # alu: ld a, b
+    0x81,                   # add a, c
+    0x27,                   # daa
+    0x22,                   # ld (hl+), a
+    0x89,                   # adc a, c
+    0x99,                   # sbc a, c
+    0xcb, 0x11,             # rl c
+    0x1f,                   # rra
+    0xee, 0x5a,             # xor 0x5a
+    0x22,                   # ld (hl+), a
+    0x47,                   # ld b, a
+    0xcb, 0x37,             # swap a
+    0x91,                   # sub c
+    0x77,                   # ld (hl), a
+    0x7c,                   # ld a, h
+    0xfe, 0xc4,             # cp 0xc4
+    0x20, 0xea,             # jr nz, alu
+    0x21, 0x00, 0xc1,       # ld hl, 0xc100
+    0xfa, 0x00, 0xc0,       # ticks: ld a, (0xc000)
+    0xfe, 0x40,             # cp 0x40
+    0x38, 0xf9,             # jr c, ticks
+    0xaf,                   # xor a
+    0xea, 0x00, 0xc0,       # ld (0xc000), a
+    0xf0, 0x04,             # div: ldh a, (DIV)
+    0xe6, 0x80,             # and 0x80
+    0x28, 0xfa,             # jr z, div
+    0x76,                   # halt
+    0x04,                   # inc b
+    0xc3, 0x6f, 0x01        # jp alu
+))
+
+# Timer interrupt
+HANDLER = bytes((
+    0xf5,                   # push af
+    0xfa, 0x00, 0xc0,       # ld a, (0xc000)
+    0x3c,                   # inc a
+    0xea, 0x00, 0xc0,       # ld (0xc000), a
+    0xf1,                   # pop af
+    0xd9                    # reti
+))
+
+def build_rom(path: str):
+    rom = bytearray(0x8000)
+    rom[0x50:0x50 + len(HANDLER)] = HANDLER
+    rom[0x100:0x104] = bytes((0x00, 0xc3, 0x50, 0x01)) # nop; jp 0x150
+    rom[0x134:0x13c] = b'BLOCKS  '
+    rom[0x150:0x150 + len(PROGRAM)] = PROGRAM
+    with open(path, 'wb') as rom_file:
+        rom_file.write(rom)
+
+
+class BlockTranslatorTest(unittest.TestCase):
+
+    # run_cycles() budgets, some end in the middle of blocks and idle loops
+    BUDGETS = (1000, 4567, 16411, 70224, 123457, 250001)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.rom = os.path.join(self.directory.name, 'test.gb')
+        build_rom(self.rom)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def emulator(self, translate: bool) -> Emulator:
+        emulator = Emulator(self.rom, False, video=None, audio=None)
+        if not translate:
+            emulator.cpu.translator.block = lambda pc: None
+        emulator.skip_boot_rom()
+        return emulator
+
+    @staticmethod
+    def state(emulator) -> tuple:
+        registers = emulator.registers
+        return (
+            registers.a, registers.f, registers.b, registers.c, registers.d,
+            registers.e, registers.h, registers.l, registers.pc, registers.sp,
+            emulator.cpu.ime, emulator.cpu.halted,
+            emulator.scheduler.now,
+            emulator.interrupt_manager.if_register,
+            emulator.timer.TIMA,
+            [bytes(bank) for bank in emulator.mmu.wram.ram],
+            bytes(emulator.mmu.hram.ram)
+        )
+
+    def test_same_as_interpreter(self):
+        interpreted = self.emulator(False)
+        translated = self.emulator(True)
+        for cycles in self.BUDGETS:
+            self.assertEqual(translated.run_cycles(cycles), interpreted.run_cycles(cycles))
+            self.assertEqual(self.state(translated), self.state(interpreted), 'after {} cycles'.format(cycles))
+        # Both paths were taken
+        self.assertEqual(interpreted.cpu.translator.blocks, {})
+        self.assertTrue(any(block is not None for block in translated.cpu.translator.blocks.values()))
+        self.assertTrue(any(translated.cpu.translator.idle_loops.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import threading
+import unittest
+
+from vsgb.emulator import Emulator
+from tests.test_save_state import build_rom
+
+TIMEOUT = 30
+
+class ControlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.rom = os.path.join(self.directory.name, 'test.gb')
+        build_rom(self.rom)
+        self.emulator = Emulator(self.rom, False, video=None, audio=None)
+        self.emulator.skip_boot_rom()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def start(self, function, *args) -> threading.Thread:
+        thread = threading.Thread(target=function, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def join(self, thread: threading.Thread):
+        thread.join(TIMEOUT)
+        self.assertFalse(thread.is_alive(), 'emulation thread did not return')
+
+    def test_pause_stop_restart(self):
+        emulator = self.emulator
+        thread = self.start(emulator.run)
+        emulator.pause()
+        self.assertTrue(emulator.paused)
+        # Parked, no instruction runs until resumed
+        now = emulator.scheduler.now
+        self.assertEqual(emulator.request(lambda: emulator.scheduler.now), now)
+        emulator.stop()
+        self.join(thread)
+        self.assertFalse(emulator.paused)
+        self.assertFalse(emulator.stop_requested)
+        # A new run is neither paused nor stopped right away
+        frames = emulator.ppu.frames
+        thread = self.start(emulator.run_frames, 2)
+        self.join(thread)
+        self.assertEqual(emulator.ppu.frames, frames + 2)
+
+    def test_pause_resume(self):
+        emulator = self.emulator
+        thread = self.start(emulator.run)
+        emulator.pause()
+        now = emulator.scheduler.now
+        emulator.resume()
+        frames = emulator.ppu.frames
+        while emulator.request(lambda: emulator.ppu.frames) < frames + 2:
+            pass
+        self.assertGreater(emulator.scheduler.now, now)
+        emulator.stop()
+        self.join(thread)
+
+    def test_stop_before_run_is_kept(self):
+        emulator = self.emulator
+        emulator.stop()
+        thread = self.start(emulator.run)
+        self.join(thread)
+        self.assertFalse(emulator.stop_requested)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+from vsgb.emulator import Emulator
+from tests.test_save_state import build_rom
+
+class DirtyPagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        rom = os.path.join(self.directory.name, 'test.gb')
+        build_rom(rom)
+        self.emulator = Emulator(rom, False, video=None, audio=None)
+        self.dirty_pages = self.emulator.mmu.dirty_pages
+        self.dirty_pages.clear()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_snapshots_keep_the_public_flags(self):
+        emulator = self.emulator
+        manager = emulator.save_state_manager
+        emulator.mmu.write_byte(0xc123, 0x42)
+        manager.snapshot(emulator)
+        emulator.mmu.write_byte(0xff90, 0x42)
+        manager.snapshot(emulator)
+        self.assertEqual(self.dirty_pages.dirty(), [('wram', 0, 0x100), ('hram', 0, 0)])
+        self.assertEqual(self.dirty_pages.dirty(manager.dirty_view), [])
+        self.dirty_pages.clear()
+        self.assertEqual(self.dirty_pages.bitmap(), 0)
+
+    def test_views_are_independent(self):
+        first = self.dirty_pages.view()
+        second = self.dirty_pages.view()
+        self.dirty_pages.clear(first)
+        self.dirty_pages.clear(second)
+        self.emulator.mmu.write_byte(0xc000, 1)
+        self.assertEqual(self.dirty_pages.dirty(first), [('wram', 0, 0)])
+        self.dirty_pages.clear(first)
+        self.emulator.mmu.write_byte(0xc100, 1)
+        self.assertEqual(self.dirty_pages.dirty(first), [('wram', 0, 0x100)])
+        self.assertEqual(self.dirty_pages.dirty(second), [('wram', 0, 0), ('wram', 0, 0x100)])
+        # A new view starts with every page marked
+        third = self.dirty_pages.view()
+        self.assertEqual(self.dirty_pages.bitmap(third), (1 << sum(len(flags) for flags in third)) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
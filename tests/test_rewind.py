@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+from vsgb.emulator import Emulator
+from tests.test_save_state import build_rom
+
+class RewindTest(unittest.TestCase):
+
+    FRAMES = 40
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.rom = os.path.join(self.directory.name, 'test.gb')
+        build_rom(self.rom)
+        self.emulator = Emulator(self.rom, False, video=None, audio=None)
+        self.emulator.skip_boot_rom()
+        self.emulator.run_frames(2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def state(self) -> tuple:
+        emulator = self.emulator
+        return (
+            emulator.ppu.frames,
+            emulator.scheduler.now,
+            emulator.registers.pc,
+            emulator.registers.get_af(),
+            bytes(emulator.mmu.wram.ram[0]),
+            bytes(emulator.ppu.vram[0]),
+            list(emulator.framebuffer)
+        )
+
+    def record(self) -> dict:
+        # States at the end of each frame, when the snapshots are taken
+        states = {}
+        for i in range(self.FRAMES):
+            self.emulator.run_frames(1)
+            states[self.emulator.ppu.frames] = self.state()
+        return states
+
+    def test_rewind_restores_recorded_state(self):
+        emulator = self.emulator
+        emulator.enable_rewind(keyframe_interval=8)
+        states = self.record()
+        for frames in (1, 5, 12):
+            frame = emulator.ppu.frames
+            self.assertEqual(emulator.rewind(frames), frames)
+            self.assertEqual(self.state(), states[frame - frames])
+        # Running again from there gives the same frames
+        frame = emulator.ppu.frames
+        emulator.run_frames(3)
+        self.assertEqual(self.state(), states[frame + 3])
+
+    def test_deltas_are_compressed(self):
+        emulator = self.emulator
+        emulator.enable_rewind(keyframe_interval=8)
+        self.record()
+        entries = emulator.rewind_buffer.entries
+        keyframe = entries[0][3]
+        for frame, full, delta, size in entries:
+            if full is None:
+                # Every frame scrolls, the framebuffer is in each delta
+                self.assertLess(size, keyframe // 10)
+
+    def test_memory_limit(self):
+        emulator = self.emulator
+        emulator.enable_rewind(keyframe_interval=8)
+        emulator.run_frames(1)
+        keyframe = emulator.rewind_buffer.size
+        limit = keyframe * 3
+        emulator.enable_rewind(keyframe_interval=8, memory_limit=limit)
+        states = self.record()
+        rewind_buffer = emulator.rewind_buffer
+        self.assertLessEqual(rewind_buffer.size, limit)
+        self.assertEqual(rewind_buffer.size, sum(entry[3] for entry in rewind_buffer.entries))
+        # Older snapshots were dropped a keyframe at a time
+        oldest = rewind_buffer.entries[0]
+        self.assertIsNotNone(oldest[1])
+        self.assertGreater(oldest[0], min(states))
+        frame = emulator.ppu.frames
+        self.assertEqual(emulator.rewind(self.FRAMES), frame - oldest[0])
+        self.assertEqual(self.state(), states[oldest[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+from vsgb.emulator import Emulator
+
+FRAME_CYCLES = 70224
+
+# Fills VRAM with a pattern, turns the LCD on and then changes SCX and the
+# tile map every VBlank so each frame renders differently
+PROGRAM = bytes((
+    0xf3,                   # di
+    0x31, 0xfe, 0xff,       # ld sp, 0xfffe
+    0xaf,                   # xor a
+    0xe0, 0x40,             # ldh (LCDC), a
+    0x21, 0x00, 0x80,       # ld hl, 0x8000
+    0x7d,                   # fill: ld a, l
+    0xac,                   # xor h
+    0x22,                   # ld (hl+), a
+    0x7c,                   # ld a, h
+    0xfe, 0xa0,             # cp 0xa0
+    0x20, 0xf8,             # jr nz, fill
+    0x3e, 0xe4, 0xe0, 0x47, # ld a, 0xe4; ldh (BGP), a
+    0x3e, 0x91, 0xe0, 0x40, # ld a, 0x91; ldh (LCDC), a
+    0x3e, 0x01, 0xe0, 0xff, # ld a, 0x01; ldh (IE), a
+    0xfb,                   # ei
+    0x76, 0x00,             # main: halt; nop
+    0xfa, 0x00, 0xc0,       # ld a, (0xc000)
+    0x3c,                   # inc a
+    0xea, 0x00, 0xc0,       # ld (0xc000), a
+    0xe0, 0x43,             # ldh (SCX), a
+    0x26, 0x98,             # ld h, 0x98
+    0x6f,                   # ld l, a
+    0x77,                   # ld (hl), a
+    0x18, 0xef              # jr main
+))
+
+def build_rom(path: str):
+    rom = bytearray(0x8000)
+    rom[0x40] = 0xd9 # VBlank: reti
+    rom[0x100:0x104] = bytes((0x00, 0xc3, 0x50, 0x01)) # nop; jp 0x150
+    rom[0x134:0x13c] = b'SAVETEST'
+    rom[0x150:0x150 + len(PROGRAM)] = PROGRAM
+    with open(path, 'wb') as rom_file:
+        rom_file.write(rom)
+
+
+class SaveStateTest(unittest.TestCase):
+
+    FRAMES = 5
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.rom = os.path.join(self.directory.name, 'test.gb')
+        build_rom(self.rom)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_and_record(self, emulator) -> tuple:
+        emulator.run_frames(self.FRAMES)
+        return list(emulator.ppu.framebuffer), emulator.registers.pc, emulator.scheduler.now
+
+    def test_round_trip_mid_frame(self):
+        emulator = Emulator(self.rom, False, video=None, audio=None)
+        emulator.skip_boot_rom()
+        emulator.run_cycles(3 * FRAME_CYCLES + 12345)
+        snapshot = emulator.save_state_manager.snapshot(emulator)
+        first = self.run_and_record(emulator)
+        emulator.save_state_manager.load(emulator, snapshot)
+        second = self.run_and_record(emulator)
+        self.assertEqual(first[1:], second[1:])
+        self.assertEqual(first[0], second[0])
+        # The frames after the snapshot did render something
+        self.assertGreater(len(set(first[0])), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,12 @@
 class AddressSpace:
 
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    __slots__ = ()
+
+    def accept(self, address: int) -> bool:
         pass
 
-    @classmethod
-    def read(cls, address: int) -> int:
+    def read(self, address: int) -> int:
         return 0xff
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
         pass
\ No newline at end of file
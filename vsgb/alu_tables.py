@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Precomputed results of the 8 bit ALU operations. Every entry packs the
+# result and the new flags as result << 8 | F, so an instruction is a table
+# lookup instead of computing each flag. Operations that depend on the carry
+# flag are indexed with it above the operands. The tables take about 530KB
+# and are built once at import.
+
+from array import array
+
+from vsgb.registers import Z_FLAG, N_FLAG, H_FLAG, C_FLAG
+
+def _add(a: int, value: int, carry: int) -> int:
+    result = a + value + carry
+    f = (0 if result & 0xff else Z_FLAG) \
+        | (H_FLAG if (a & 0xf) + (value & 0xf) + carry > 0xf else 0) \
+        | (C_FLAG if result > 0xff else 0)
+    return ((result & 0xff) << 8) | f
+
+def _sub(a: int, value: int, carry: int) -> int:
+    result = a - value - carry
+    f = (0 if result & 0xff else Z_FLAG) | N_FLAG \
+        | (H_FLAG if (a & 0xf) - (value & 0xf) - carry < 0 else 0) \
+        | (C_FLAG if result < 0 else 0)
+    return ((result & 0xff) << 8) | f
+
+def _daa(a: int, f: int) -> int:
+    if f & N_FLAG:
+        if f & H_FLAG:
+            a = (a - 0x06) & 0xff
+        if f & C_FLAG:
+            a = (a - 0x60) & 0xff
+    else:
+        if f & H_FLAG or (a & 0x0f) > 0x09:
+            a += 0x06
+        if f & C_FLAG or a > 0x9f:
+            a += 0x60
+    # H is reset, N kept and C only ever set
+    f &= N_FLAG | C_FLAG
+    if a > 0xff:
+        f |= C_FLAG
+    a &= 0xff
+    return (a << 8) | f | (0 if a else Z_FLAG)
+
+def _shift(result: int, carry_out: int) -> int:
+    return (result << 8) | (0 if result else Z_FLAG) | (C_FLAG if carry_out else 0)
+
+# ADD/ADC and SUB/SBC/CP: [carry << 16 | a << 8 | value]
+ADD = array('H', [_add(a, value, carry) for carry in (0, 1) for a in range(0x100) for value in range(0x100)])
+SUB = array('H', [_sub(a, value, carry) for carry in (0, 1) for a in range(0x100) for value in range(0x100)])
+
+# INC/DEC: [value], the carry flag is left as it was
+INC = array('H', [(((value + 1) & 0xff) << 8)
+    | (0 if (value + 1) & 0xff else Z_FLAG)
+    | (0 if (value + 1) & 0xf else H_FLAG) for value in range(0x100)])
+DEC = array('H', [(((value - 1) & 0xff) << 8) | N_FLAG
+    | (0 if (value - 1) & 0xff else Z_FLAG)
+    | (H_FLAG if (value - 1) & 0xf == 0xf else 0) for value in range(0x100)])
+
+# DAA: [F << 4 | a]
+DECIMAL_ADJUST = array('H', [_daa(a, f << 4) for f in range(0x10) for a in range(0x100)])
+
+# Rotates and shifts: [value], RL and RR [carry << 8 | value]
+RLC = array('H', [_shift(((value << 1) & 0xff) | (value >> 7), value & 0x80) for value in range(0x100)])
+RRC = array('H', [_shift((value >> 1) | ((value & 1) << 7), value & 1) for value in range(0x100)])
+RL = array('H', [_shift(((value << 1) & 0xff) | carry, value & 0x80) for carry in (0, 1) for value in range(0x100)])
+RR = array('H', [_shift((value >> 1) | (carry << 7), value & 1) for carry in (0, 1) for value in range(0x100)])
+SLA = array('H', [_shift((value << 1) & 0xff, value & 0x80) for value in range(0x100)])
+SRA = array('H', [_shift((value >> 1) | (value & 0x80), value & 1) for value in range(0x100)])
+SRL = array('H', [_shift(value >> 1, value & 1) for value in range(0x100)])
+SWAP = array('H', [_shift(((value << 4) & 0xff) | (value >> 4), 0) for value in range(0x100)])
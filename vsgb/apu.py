@@ -8,13 +8,14 @@ from vsgb.audio.sound_channel1 import SoundChannel1
 from vsgb.audio.sound_channel2 import SoundChannel2
 from vsgb.audio.sound_channel3 import SoundChannel3
 from vsgb.audio.sound_channel4 import SoundChannel4
-from vsgb.audio.sound_driver import SoundDriver
 from vsgb.io_registers import IO_Registers
 import time
 
 class APU:
 
-    def __init__(self, cgb_mode):
+    FRAME_SEQUENCER_TIME: int = 8192 # cycles, 512Hz
+
+    def __init__(self, cgb_mode, sound_driver = None):
         self.registers = {
             IO_Registers.NR_10: 0,
             IO_Registers.NR_11: 0,
@@ -54,8 +55,34 @@ class APU:
             IO_Registers.WAVE_PATTERN_E: 0x00,
             IO_Registers.WAVE_PATTERN_F: 0xff
         }
-        self.sound_driver = SoundDriver()
+        # Without a sound driver (headless) the channels keep their register,
+        # length and envelope state but no samples are generated
+        self.sound_driver = sound_driver
         self.sound_channels = [SoundChannel1(cgb_mode), SoundChannel2(cgb_mode), SoundChannel3(cgb_mode), SoundChannel4(cgb_mode)]
+        self.scheduler = None
+        self.frame_sequencer_time = 0
+        self.sample_time = 0
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
+        self.frame_sequencer_time = scheduler.now + APU.FRAME_SEQUENCER_TIME
+        scheduler.schedule(self.frame_sequencer_time, self.frame_sequencer)
+        if self.sound_driver is not None:
+            self.sample_time = scheduler.now + self.sound_driver.div
+            scheduler.schedule(self.sample_time, self.sample)
+
+    def frame_sequencer(self):
+        # length counters, envelopes and the sweep are clocked here instead of
+        # on every sample
+        for sound_channel in self.sound_channels:
+            sound_channel.frame_sequencer_step(APU.FRAME_SEQUENCER_TIME)
+        self.frame_sequencer_time += APU.FRAME_SEQUENCER_TIME
+        self.scheduler.schedule(self.frame_sequencer_time, self.frame_sequencer)
+
+    def sample(self):
+        self.step(self.sound_driver.div)
+        self.sample_time += self.sound_driver.div
+        self.scheduler.schedule(self.sample_time, self.sample)
 
     def read_register(self, register):
         for sound_channel in self.sound_channels:
@@ -106,4 +133,4 @@ class APU:
         left *= ((volumes >> 4) & 0b111)
         #right *= (volumes & 0b111)
         
-        self.sound_driver.play(left & 0xff, right & 0xff, ticks)
+        self.sound_driver.play(left & 0xff, right & 0xff)
@@ -28,6 +28,9 @@ class AbstractSoundChannel:
     def step(self, ticks):
         pass
 
+    def frame_sequencer_step(self, ticks):
+        self.update_length(ticks)
+
     def trigger(self):
         pass
 
@@ -26,9 +26,14 @@ class PolynomialCounter:
         self.shifted_divisor = divisor << clock_shifted
         self.i = 1
 
-    def step(self, ticks):
+    def step(self, ticks) -> int:
+        # returns how many times the counter expired
         self.i -= ticks
-        if self.i <= 0:
-            self.i = self.shifted_divisor
-            return True
-        return False
+        if self.i > 0:
+            return 0
+        if self.shifted_divisor == 0:
+            self.i = 0
+            return 1
+        clocks = 1 + (-self.i) // self.shifted_divisor
+        self.i += clocks * self.shifted_divisor
+        return clocks
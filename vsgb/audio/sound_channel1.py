@@ -16,6 +16,7 @@ class SoundChannel1(AbstractSoundChannel):
         self.freq_divider = 0
         self.frequency_sweep = FrequencySweep()
         self.volume_envelope = VolumeEnvelope()
+        self.last_output = 0
 
     def start(self):
         self.i = 0
@@ -27,21 +28,24 @@ class SoundChannel1(AbstractSoundChannel):
 
     def trigger(self):
         self.i = 0
-        self.freq_divider = 1
+        self.freq_divider = 0
         self.volume_envelope.trigger()
 
     def step(self, ticks):
-        self.volume_envelope.step(ticks)
-        e = self.update_length(ticks) and self.update_sweep(ticks) and self.dac_enabled
-        if not e:
+        if not (self.channel_enabled and self.dac_enabled):
             return 0
-        self.freq_divider -= 1
-        if self.freq_divider == 0:
-            self.reset_freq_divider()
-            self.last_output = (self.get_duty() & (1 >> self.i)) >> self.i
-            self.i = (self.i + ticks) % 8
+        self.freq_divider -= ticks
+        if self.freq_divider <= 0:
+            steps = self.reset_freq_divider()
+            self.i = (self.i + steps) % 8
+            self.last_output = (self.get_duty() >> self.i) & 1
         return self.last_output * self.volume_envelope.get_volume()
 
+    def frame_sequencer_step(self, ticks):
+        self.volume_envelope.step(ticks)
+        self.update_length(ticks)
+        self.update_sweep(ticks)
+
     def set_nr0(self, value):
         super().set_nr0(value)
         self.frequency_sweep.set_nr10(value)
@@ -77,8 +81,12 @@ class SoundChannel1(AbstractSoundChannel):
             3: 0b01111110
         }.get(self.get_nr1() >> 6)
 
-    def reset_freq_divider(self):
-        self.freq_divider = self.get_frequency() * 4
+    def reset_freq_divider(self) -> int:
+        # returns how many duty steps elapsed
+        period = self.get_frequency() * 4
+        steps = 1 + (-self.freq_divider) // period
+        self.freq_divider += steps * period
+        return steps
 
     def update_sweep(self, ticks):
         self.frequency_sweep.step(ticks)
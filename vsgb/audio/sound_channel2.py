@@ -14,6 +14,7 @@ class SoundChannel2(AbstractSoundChannel):
         super().__init__(IO_Registers.NR_21 - 1, 64, cgb_mode)
         self.freq_divider = 0
         self.volume_envelope = VolumeEnvelope()
+        self.last_output = 0
 
     def start(self):
         self.i = 0
@@ -24,21 +25,23 @@ class SoundChannel2(AbstractSoundChannel):
 
     def trigger(self):
         self.i = 0
-        self.freq_divider = 1
+        self.freq_divider = 0
         self.volume_envelope.trigger()
 
     def step(self, ticks):
-        self.volume_envelope.step(ticks)
-        e = self.update_length(ticks) and self.dac_enabled
-        if not e:
+        if not (self.channel_enabled and self.dac_enabled):
             return 0
-        self.freq_divider -= 1
-        if self.freq_divider == 0:
-            self.reset_freq_divider()
-            self.last_output = (self.get_duty() & (1 >> self.i)) >> self.i
-            self.i = (self.i + ticks) % 8
+        self.freq_divider -= ticks
+        if self.freq_divider <= 0:
+            steps = self.reset_freq_divider()
+            self.i = (self.i + steps) % 8
+            self.last_output = (self.get_duty() >> self.i) & 1
         return self.last_output * self.volume_envelope.get_volume()
 
+    def frame_sequencer_step(self, ticks):
+        self.volume_envelope.step(ticks)
+        self.update_length(ticks)
+
     def set_nr0(self, value):
         super().set_nr0(value)
 
@@ -60,6 +63,10 @@ class SoundChannel2(AbstractSoundChannel):
             3: 0b01111110
         }.get(self.get_nr1() >> 6)
 
-    def reset_freq_divider(self):
-        self.freq_divider = self.get_frequency() * 4
+    def reset_freq_divider(self) -> int:
+        # returns how many duty steps elapsed
+        period = self.get_frequency() * 4
+        steps = 1 + (-self.freq_divider) // period
+        self.freq_divider += steps * period
+        return steps
         
\ No newline at end of file
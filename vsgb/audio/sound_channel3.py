@@ -66,7 +66,7 @@ class SoundChannel3(AbstractSoundChannel):
 
     def step(self, ticks):
         self.ticks_since_read += ticks
-        if not self.update_length(ticks):
+        if not self.channel_enabled:
             return 0
         if not self.dac_enabled:
             return 0
@@ -74,13 +74,13 @@ class SoundChannel3(AbstractSoundChannel):
             return 0
         self.freq_divider -= ticks
         if self.freq_divider <= 0:
-            self.reset_freq_divider()
+            steps = self.reset_freq_divider()
             if self.triggered:
                 self.last_output = (self.buffer >> 4) & 0x0f
                 self.triggered = False
             else:
                 self.last_output = self.get_wave_entry()
-            self.i = (self.i + (ticks)) % 32
+            self.i = (self.i + steps) % 32
         return self.last_output
 
     def get_volume(self):
@@ -126,5 +126,9 @@ class SoundChannel3(AbstractSoundChannel):
                         self.wave_ram[i] = self.wave_ram[((pos + i) % 0x10)]
         super().set_nr4(value)
 
-    def reset_freq_divider(self):
-        self.freq_divider = self.get_frequency() * 4
+    def reset_freq_divider(self) -> int:
+        # returns how many wave samples elapsed
+        period = self.get_frequency() * 2
+        steps = 1 + (-self.freq_divider) // period
+        self.freq_divider += steps * period
+        return steps
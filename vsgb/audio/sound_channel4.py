@@ -32,17 +32,20 @@ class SoundChannel4(AbstractSoundChannel):
         self.volume_envelope.trigger()
 
     def step(self, ticks):
-        self.volume_envelope.step(ticks)
-        if not self.update_length(ticks):
+        if not self.channel_enabled:
             return 0
         if not self.dac_enabled:
             return 0
         
-        if self.polynominal_counter.step(ticks):
+        for i in range(self.polynominal_counter.step(ticks)):
             self.last_result = self.lfsr.next_bit((self._nr3 & (1 << 3)) != 0)
 
         return self.last_result * self.volume_envelope.get_volume()
 
+    def frame_sequencer_step(self, ticks):
+        self.volume_envelope.step(ticks)
+        self.update_length(ticks)
+
 
     def set_nr1(self, value):
         super().set_nr1(value)
@@ -4,7 +4,6 @@
 # Documentation source:
 # - https://gbdev.gg8.se/wiki/articles/Sound_Controller
 
-import simpleaudio as sa
 import threading
 
 class SoundDriver():
@@ -14,23 +13,19 @@ class SoundDriver():
     #BUFFER_SIZE = 220
 
     def __init__(self):
+        # imported here, the timing constants are used without a sound device
+        import simpleaudio
+        self.simpleaudio = simpleaudio
         self.sample_rate = 22050
         self.buffer = bytearray([0]*(SoundDriver.BUFFER_SIZE))
-        self.ticks = 0
         self.div = SoundDriver.TICKS_PER_SEC // (self.sample_rate )
         self.i = 0
         self.play_obj = None
         self.has_sound = False
 
     
-    def play(self, left, right, ticks):
-        
-        self.ticks += ticks
-        if self.ticks <= self.div:
-            return
-            
-        self.ticks = 0
-
+    def play(self, left, right):
+        # called once per sample by the APU sample event
         if left:
             self.has_sound = True
 
@@ -56,7 +51,7 @@ class SoundDriver():
 
     def play_sound(self,wave):
         try:
-            wave_obj = sa.WaveObject(wave,1,1,self.sample_rate)
+            wave_obj = self.simpleaudio.WaveObject(wave,1,1,self.sample_rate)
             while self.play_obj and self.play_obj.is_playing():
                 pass
             self.play_obj = wave_obj.play()
@@ -0,0 +1,783 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Basic block translator
+#
+# Straight-line runs of instructions are translated to Python source with the
+# registers held in locals, compiled once and cached by address (and ROM/WRAM
+# bank). A block stops at the first jump, call or return, at any instruction
+# that has no template (those are left to the InstructionPerformer) and at the
+# end of its memory region.
+#
+# A block only runs instructions that the interpreter would have run before the
+# next scheduler event: it gets the number of cycles left and returns how many
+# it used. Writes that may have side effects (I/O registers, MBC registers and
+# translated code) end the block right after the instruction.
+#
+# Blocks that branch back to their own start without writing anything, only
+# reading registers and the I/O registers and RAM that change through
+# scheduler events, are idle loops (like waiting for LY or for a flag set by
+# the VBlank handler). The CPU skips their iterations up to the next event.
+
+import logging
+
+from vsgb.alu_tables import ADD, SUB, INC, DEC, DECIMAL_ADJUST
+from vsgb.byte_operations import signed_value
+from vsgb.instructions import instructions
+from vsgb.io_registers import IO_Registers
+
+REGISTERS = ('b', 'c', 'd', 'e', 'h', 'l', None, 'a')
+PAIRS = (('b', 'c'), ('d', 'e'), ('h', 'l'))
+CONDITIONS = ('(f & 0x80) == 0', 'f & 0x80', '(f & 0x10) == 0', 'f & 0x10')
+ALU = {
+    'add': [
+        't = ADD[(a << 8) | {v}]',
+        'a = t >> 8',
+        'f = t & 0xff'
+    ],
+    'adc': [
+        't = ADD[((f & 0x10) << 12) | (a << 8) | {v}]',
+        'a = t >> 8',
+        'f = t & 0xff'
+    ],
+    'sub': [
+        't = SUB[(a << 8) | {v}]',
+        'a = t >> 8',
+        'f = t & 0xff'
+    ],
+    'sbc': [
+        't = SUB[((f & 0x10) << 12) | (a << 8) | {v}]',
+        'a = t >> 8',
+        'f = t & 0xff'
+    ],
+    'and': [
+        'a &= {v}',
+        'f = 0x20 if a else 0xa0'
+    ],
+    'xor': [
+        'a ^= {v}',
+        'f = 0 if a else 0x80'
+    ],
+    'or': [
+        'a |= {v}',
+        'f = 0 if a else 0x80'
+    ],
+    'cp': [
+        'f = SUB[(a << 8) | {v}] & 0xff'
+    ]
+}
+ALU_OPS = ('add', 'adc', 'sub', 'sbc', 'and', 'xor', 'or', 'cp')
+ROTATIONS = {
+    'rlc': [
+        't = ((v << 1) & 0xff) | (v >> 7)',
+        'f = (0 if t else 0x80) | ((v >> 3) & 0x10)'
+    ],
+    'rrc': [
+        't = (v >> 1) | ((v & 1) << 7)',
+        'f = (0 if t else 0x80) | ((v & 1) << 4)'
+    ],
+    'rl': [
+        't = ((v << 1) & 0xff) | ((f >> 4) & 1)',
+        'f = (0 if t else 0x80) | ((v >> 3) & 0x10)'
+    ],
+    'rr': [
+        't = (v >> 1) | ((f & 0x10) << 3)',
+        'f = (0 if t else 0x80) | ((v & 1) << 4)'
+    ],
+    'sla': [
+        't = (v << 1) & 0xff',
+        'f = (0 if t else 0x80) | ((v >> 3) & 0x10)'
+    ],
+    'sra': [
+        't = (v >> 1) | (v & 0x80)',
+        'f = (0 if t else 0x80) | ((v & 1) << 4)'
+    ],
+    'swap': [
+        't = ((v << 4) & 0xff) | (v >> 4)',
+        'f = 0 if t else 0x80'
+    ],
+    'srl': [
+        't = v >> 1',
+        'f = (0 if t else 0x80) | ((v & 1) << 4)'
+    ]
+}
+ROTATION_OPS = ('rlc', 'rrc', 'rl', 'rr', 'sla', 'sra', 'swap', 'srl')
+# Instructions that only change registers: NOP, rotations of A, DAA, CPL,
+# SCF, CCF, LD r,r', ALU A,r, INC r, DEC r, LD r,d8, INC rr, DEC rr and
+# ALU A,d8
+IDLE_OPCODES = frozenset(
+    [0x00, 0x07, 0x0f, 0x17, 0x1f, 0x27, 0x2f, 0x37, 0x3f] +
+    [opcode for opcode in range(0x40, 0xc0) if opcode & 7 != 6 and (opcode >= 0x80 or (opcode >> 3) & 7 != 6)] +
+    [(y << 3) | z for y in range(8) if y != 6 for z in (4, 5, 6)] +
+    [(p << 4) | q for p in range(4) for q in (0x03, 0x0b)] +
+    [0xc6, 0xce, 0xd6, 0xde, 0xe6, 0xee, 0xf6, 0xfe]
+)
+# Cycles of the jumps an idle loop ends with, when taken
+IDLE_JUMPS = {0x18: 12, 0x20: 12, 0x28: 12, 0x30: 12, 0x38: 12, 0xc3: 16, 0xc2: 16, 0xca: 16, 0xd2: 16, 0xda: 16}
+
+
+class Block:
+
+    __slots__ = ('start', 'end', 'run', 'idle', 'loop_cycles', 'loop_last', 'reads_div')
+
+    def __init__(self, start: int, end: int, run, loop_cycles: int = 0, loop_last: int = 0, reads_div: bool = False):
+        self.start = start
+        self.end = end
+        self.run = run
+        # Idle loop, an iteration takes loop_cycles and its branch starts
+        # loop_last cycles in
+        self.idle = loop_cycles > 0
+        self.loop_cycles = loop_cycles
+        self.loop_last = loop_last
+        self.reads_div = reads_div
+
+
+class BlockTranslator:
+
+    MAX_INSTRUCTIONS = 64
+    # write_breaks flags
+    BREAK_IO = 0x01
+    BREAK_CODE = 0x02
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.mmu = cpu.mmu
+        self.blocks = {}
+        # translated RAM blocks covering each address
+        self.code_owners = {}
+        self.page_writers = [None]*0x100
+        self.banked_rom = hasattr(self.mmu.rom, 'rom_bank')
+        self.write_breaks = bytearray(0x10000)
+        for address in range(0x0000, 0x8000):
+            self.write_breaks[address] = BlockTranslator.BREAK_IO
+        for address in range(0xff00, 0xff80):
+            self.write_breaks[address] = BlockTranslator.BREAK_IO
+        self.write_breaks[0xffff] = BlockTranslator.BREAK_IO
+        self.namespace = None
+        # Cycles skipped in each idle loop found, by address
+        self.idle_loops = {}
+
+    def block(self, pc: int):
+        if pc < 0x4000:
+            key = pc
+        elif pc < 0x8000:
+            key = pc | (self.mmu.rom.rom_bank << 16) if self.banked_rom else pc
+        elif 0xd000 <= pc < 0xe000:
+            key = pc | (self.mmu.wram.SVBK << 16)
+        else:
+            key = pc
+        try:
+            return self.blocks[key]
+        except KeyError:
+            pass
+        if self.mmu.bootstrap_enabled:
+            return None
+        block = self.translate(pc)
+        self.blocks[key] = block
+        if block is not None and pc >= 0x8000:
+            self.watch_code(key, block)
+        return block
+
+    def region_end(self, pc: int) -> int:
+        if pc < 0x4000:
+            return 0x4000
+        if pc < 0x8000:
+            return 0x8000
+        if 0xc000 <= pc < 0xd000:
+            return 0xd000
+        if 0xd000 <= pc < 0xe000:
+            return 0xe000
+        if 0xff80 <= pc < 0xffff:
+            return 0xffff
+        return 0
+
+    def watch_code(self, key: int, block: Block):
+        for address in range(block.start, block.end):
+            self.code_owners.setdefault(address, []).append(key)
+            self.write_breaks[address] |= BlockTranslator.BREAK_CODE
+            if address < 0xde00:
+                # echo ram
+                self.write_breaks[address + 0x2000] |= BlockTranslator.BREAK_CODE
+        for page in {block.start >> 8, (block.end - 1) >> 8}:
+            self.watch_page(page)
+            if page < 0xde:
+                self.watch_page(page + 0x20)
+
+    def watch_page(self, page: int):
+        if self.page_writers[page] is None:
+            self.page_writers[page] = self.mmu.write_table[page]
+            self.mmu.write_table[page] = self.write_code_page
+
+    def write_code_page(self, address: int, value: int):
+        self.page_writers[address >> 8](address, value)
+        if self.write_breaks[address] & BlockTranslator.BREAK_CODE:
+            if 0xe000 <= address < 0xfe00:
+                address -= 0x2000
+            self.invalidate(address)
+
+    def invalidate(self, address: int):
+        for key in self.code_owners.pop(address, ()):
+            block = self.blocks.pop(key, None)
+            if block is None:
+                continue
+            for covered in range(block.start, block.end):
+                owners = self.code_owners.get(covered)
+                if owners is not None and key in owners:
+                    owners.remove(key)
+                    if not owners:
+                        del self.code_owners[covered]
+                        self.clear_break(covered)
+        self.clear_break(address)
+
+    def clear_break(self, address: int):
+        self.write_breaks[address] &= ~BlockTranslator.BREAK_CODE & 0xff
+        if address < 0xde00:
+            self.write_breaks[address + 0x2000] &= ~BlockTranslator.BREAK_CODE & 0xff
+
+    def invalidate_code(self):
+        # Drops the blocks translated from RAM, ROM blocks stay valid
+        for address in list(self.code_owners):
+            self.invalidate(address)
+
+    def flush(self):
+        self.invalidate_code()
+        self.blocks = {}
+
+    def translate(self, pc: int):
+        end = self.region_end(pc)
+        if end == 0:
+            return None
+        generator = BlockGenerator(self.mmu, pc, end)
+        if not generator.generate(BlockTranslator.MAX_INSTRUCTIONS):
+            return None
+        if self.namespace is None:
+            self.namespace = {
+                'R': self.cpu.registers,
+                'rd': self.mmu.read_byte,
+                'wr': self.mmu.write_byte,
+                'bw': self.write_breaks,
+                'cpu': self.cpu,
+                'sched': self.cpu.scheduler,
+                'ADD': ADD,
+                'SUB': SUB,
+                'INC': INC,
+                'DEC': DEC,
+                'DAA': DECIMAL_ADJUST
+            }
+        namespace = dict(self.namespace)
+        exec(compile(generator.source(), '<block {:04x}>'.format(pc), 'exec'), namespace)
+        block = Block(pc, generator.pc, namespace['block'], generator.loop_cycles, generator.loop_last, generator.reads_div)
+        if block.idle:
+            logging.debug('Idle loop at {:04x}'.format(pc))
+            self.idle_loops.setdefault(pc, 0)
+        return block
+
+
+class BlockGenerator:
+
+    def __init__(self, mmu, pc: int, end: int):
+        self.mmu = mmu
+        self.start = pc
+        self.pc = pc
+        self.end = end
+        self.lines = []
+        self.used = set()
+        self.dirty = set()
+        # cycles from the start of the block to the current instruction
+        self.cycles = 0
+        self.count = 0
+        self.synced = False
+        self.terminated = False
+        self.last_pc = pc
+        self.last_opcode = 0
+        # Idle loop detection, see idle_instruction()
+        self.idle = True
+        self.loop_cycles = 0
+        self.loop_last = 0
+        self.reads_div = False
+
+    def generate(self, max_instructions: int) -> bool:
+        while self.count < max_instructions and not self.terminated:
+            if not self.emit_instruction():
+                break
+        if self.count == 0:
+            return False
+        if not self.idle:
+            self.loop_cycles = 0
+        if not self.terminated:
+            self.exit(1, str(self.cycles), str(self.pc))
+        return True
+
+    def source(self) -> str:
+        header = ['def block(limit):']
+        for register in sorted(self.used):
+            header.append('    {0} = R.{0}'.format(register))
+        if self.synced:
+            header.append('    now0 = sched.now')
+            header.append('    s = sched.speed_shift')
+        return '\n'.join(header + self.lines) + '\n'
+
+    def read_operand(self, address: int) -> int:
+        return self.mmu.read_byte(address)
+
+    def emit(self, line: str, indent: int = 1):
+        self.lines.append('    '*indent + line)
+
+    def use(self, *registers):
+        self.used.update(registers)
+
+    def modify(self, *registers):
+        self.used.update(registers)
+        self.dirty.update(registers)
+
+    def exit(self, indent: int, cycles: str, pc: str):
+        for register in sorted(self.dirty):
+            self.emit('R.{0} = {0}'.format(register), indent)
+        self.emit('R.pc = {}'.format(pc), indent)
+        self.emit('cpu.last_pc = {}'.format(self.last_pc), indent)
+        self.emit('cpu.last_instruction = {}'.format(self.last_opcode), indent)
+        if self.synced:
+            self.emit('sched.now = now0', indent)
+        self.emit('return {}'.format(cycles), indent)
+
+    def sync(self, indent: int):
+        # keep DIV and TIMA exact for I/O accesses in the middle of a block
+        self.synced = True
+        self.emit('sched.now = now0 + ({} >> s)'.format(self.cycles), indent)
+
+    def read(self, target: str, address: str):
+        self.emit('x = {}'.format(address))
+        self.emit('if x >= 0xff00:')
+        self.sync(2)
+        self.emit('{} = rd(x)'.format(target))
+
+    def begin_write(self, *addresses):
+        # flags are taken before writing since the write may drop them
+        self.emit('brk = ' + ' | '.join('bw[{}]'.format(address) for address in addresses))
+        self.emit('if brk:')
+        self.sync(2)
+
+    def end_write(self, cycles: int):
+        self.emit('if brk:')
+        self.exit(2, str(self.cycles + cycles), str(self.pc))
+
+    def emit_instruction(self) -> bool:
+        pc = self.pc
+        opcode = self.read_operand(pc)
+        length = 1
+        if opcode == 0xcb:
+            if pc + 2 > self.end:
+                return False
+            opcode = 0x100 | self.read_operand(pc + 1)
+            length = 2
+            name = instructions[opcode][0]
+        else:
+            length += instructions[opcode][1]
+            if pc + length > self.end:
+                return False
+            name = instructions[opcode][0]
+        operand = 0
+        if length == 2 and opcode < 0x100:
+            operand = self.read_operand(pc + 1)
+        elif length == 3:
+            operand = self.read_operand(pc + 1) | (self.read_operand(pc + 2) << 8)
+        if not self.supported(opcode):
+            return False
+        self.idle = self.idle and self.idle_instruction(opcode, operand)
+        if self.count > 0:
+            self.emit('if limit <= {}:'.format(self.cycles))
+            self.exit(2, str(self.cycles), str(pc))
+        self.emit('# {:04x}: {}'.format(pc, name.format(operand)))
+        self.last_pc = pc
+        self.last_opcode = opcode
+        self.pc = pc + length
+        if opcode >= 0x100:
+            cycles = self.emit_cb(opcode & 0xff)
+        else:
+            cycles = self.emit_opcode(opcode, operand)
+        self.count += 1
+        self.cycles += cycles
+        return True
+
+    def supported(self, opcode: int) -> bool:
+        if opcode >= 0x100:
+            return True
+        # STOP, HALT, DI, EI and RETI change the cpu state, the rest are rare
+        # enough to be left to the interpreter
+        return opcode not in (
+            0x08, 0x10, 0x76, 0xd9, 0xe8, 0xf3, 0xf8, 0xfb,
+            0xd3, 0xdb, 0xdd, 0xe3, 0xe4, 0xeb, 0xec, 0xed, 0xf4, 0xfc, 0xfd
+        )
+
+    def idle_instruction(self, opcode: int, operand: int) -> bool:
+        # Whether the instruction can be part of an idle loop, for the
+        # branch back to the start the loop cycles are set too
+        if opcode >= 0x100:
+            # Register operands only
+            return opcode & 7 != 6
+        if opcode in IDLE_OPCODES:
+            return True
+        if opcode in (0xf0, 0xfa):
+            address = 0xff00 | operand if opcode == 0xf0 else operand
+            if address == IO_Registers.DIV:
+                self.reads_div = True
+                return True
+            return address in (IO_Registers.LY, IO_Registers.STAT, IO_Registers.IF) \
+                or 0xc000 <= address < 0xe000 or 0xff80 <= address < 0xffff
+        if opcode in IDLE_JUMPS:
+            if opcode < 0x40:
+                target = (self.pc + 2 + signed_value(operand)) & 0xffff
+            else:
+                target = operand
+            if target == self.start:
+                self.loop_last = self.cycles
+                self.loop_cycles = self.cycles + IDLE_JUMPS[opcode]
+                return True
+        return False
+
+    def get_register(self, index: int) -> str:
+        register = REGISTERS[index]
+        self.use(register)
+        return register
+
+    def set_register(self, index: int, value: str):
+        register = REGISTERS[index]
+        self.modify(register)
+        if register != value:
+            self.emit('{} = {}'.format(register, value))
+
+    def hl(self) -> str:
+        self.use('h', 'l')
+        return '(h << 8) + l'
+
+    def pair(self, index: int) -> str:
+        if index == 3:
+            self.use('sp')
+            return 'sp'
+        high, low = PAIRS[index]
+        self.use(high, low)
+        return '({} << 8) + {}'.format(high, low)
+
+    def set_pair(self, index: int, value: str):
+        if index == 3:
+            self.modify('sp')
+            self.emit('sp = {}'.format(value))
+            return
+        high, low = PAIRS[index]
+        self.modify(high, low)
+        self.emit('x = {}'.format(value))
+        self.emit('{} = (x >> 8) & 0xff'.format(high))
+        self.emit('{} = x & 0xff'.format(low))
+
+    def push(self, value: str, write_flags: bool):
+        self.modify('sp')
+        if write_flags:
+            self.begin_write('(sp - 1) & 0xffff', '(sp - 2) & 0xffff')
+        self.emit('x = {}'.format(value))
+        self.emit('sp -= 1')
+        self.emit('wr(sp, (x >> 8) & 0xff)')
+        self.emit('sp -= 1')
+        self.emit('wr(sp, x & 0xff)')
+
+    def pop(self, target: str):
+        self.modify('sp')
+        self.emit('{} = rd(sp) | (rd(sp + 1) << 8)'.format(target))
+        self.emit('sp += 2')
+
+    def jump(self, condition: str, taken: int, not_taken: int, pc: str):
+        if condition is None:
+            self.exit(1, str(self.cycles + taken), pc)
+        else:
+            self.use('f')
+            self.emit('if {}:'.format(condition))
+            self.exit(2, str(self.cycles + taken), pc)
+            self.exit(1, str(self.cycles + not_taken), str(self.pc))
+        self.terminated = True
+
+    def emit_alu(self, op: str, value: str):
+        self.use('a')
+        self.modify('f')
+        if op != 'cp':
+            self.modify('a')
+        for line in ALU[op]:
+            self.emit(line.format(v=value))
+
+    def emit_opcode(self, opcode: int, operand: int) -> int:
+        x = opcode >> 6
+        y = (opcode >> 3) & 7
+        z = opcode & 7
+        if x == 1:
+            # LD r,r'
+            if z == 6:
+                self.read('v', self.hl())
+                self.set_register(y, 'v')
+                return 8
+            if y == 6:
+                value = self.get_register(z)
+                self.emit('x = {}'.format(self.hl()))
+                self.begin_write('x')
+                self.emit('wr(x, {})'.format(value))
+                self.end_write(8)
+                return 8
+            self.set_register(y, self.get_register(z))
+            return 4
+        if x == 2:
+            # ALU A,r
+            if z == 6:
+                self.read('v', self.hl())
+                self.emit_alu(ALU_OPS[y], 'v')
+                return 8
+            self.emit_alu(ALU_OPS[y], self.get_register(z))
+            return 4
+        if opcode == 0x00:
+            return 4
+        if z == 6 and x == 3:
+            # ALU A,d8
+            self.emit_alu(ALU_OPS[y], str(operand))
+            return 8
+        if x == 0 and z == 6:
+            # LD r,d8
+            if y == 6:
+                self.emit('x = {}'.format(self.hl()))
+                self.begin_write('x')
+                self.emit('wr(x, {})'.format(operand))
+                self.end_write(12)
+                return 12
+            self.set_register(y, str(operand))
+            return 8
+        if x == 0 and z in (4, 5):
+            # INC r / DEC r
+            if y == 6:
+                self.read('v', self.hl())
+            else:
+                self.emit('v = {}'.format(self.get_register(y)))
+            self.modify('f')
+            self.emit('t = {}[v]'.format('INC' if z == 4 else 'DEC'))
+            self.emit('f = (f & 0x10) | (t & 0xff)')
+            self.emit('t >>= 8')
+            if y == 6:
+                self.begin_write('x')
+                self.emit('wr(x, t)')
+                self.end_write(12)
+                return 12
+            self.set_register(y, 't')
+            return 4
+        if x == 0 and z == 1:
+            if y & 1 == 0:
+                # LD rr,d16
+                self.set_pair(y >> 1, str(operand))
+                return 12
+            # ADD HL,rr
+            self.modify('f', 'h', 'l')
+            self.emit('v = {}'.format(self.pair(y >> 1)))
+            self.emit('t = {} + v'.format(self.hl()))
+            self.emit('f = (f & 0x80) | ((t >> 12) & 0x10) | (0x20 if ({} ^ v ^ (t & 0xffff)) & 0x1000 else 0)'.format(self.hl()))
+            self.emit('h = (t >> 8) & 0xff')
+            self.emit('l = t & 0xff')
+            return 8
+        if x == 0 and z == 3:
+            # INC rr / DEC rr
+            delta = '+ 1' if y & 1 == 0 else '- 1'
+            self.set_pair(y >> 1, '({} {}) & 0xffff'.format(self.pair(y >> 1), delta))
+            return 8
+        if x == 0 and z == 2:
+            # LD (rr),A / LD A,(rr) with HL+/HL-
+            address = self.pair(y >> 1) if y < 4 else self.hl()
+            if y & 1 == 0:
+                self.use('a')
+                self.emit('x = {}'.format(address))
+                self.begin_write('x')
+                self.emit('wr(x, a)')
+            else:
+                self.read('v', address)
+                self.set_register(7, 'v')
+            if y in (4, 5):
+                self.set_pair(2, 'x + 1')
+            elif y in (6, 7):
+                self.set_pair(2, 'x - 1')
+            if y & 1 == 0:
+                self.end_write(8)
+            return 8
+        if x == 0 and z == 7:
+            return self.emit_accumulator(y)
+        if x == 0 and z == 0:
+            # JR
+            target = (self.pc + signed_value(operand)) & 0xffff
+            condition = None if y == 3 else CONDITIONS[y - 4]
+            self.jump(condition, 12, 8, str(target))
+            return 0
+        if x == 3:
+            return self.emit_misc(opcode, operand, y, z)
+        return 0
+
+    def emit_accumulator(self, y: int) -> int:
+        self.use('a')
+        self.modify('a', 'f')
+        if y == 0:
+            # RLCA
+            self.emit('f = (a >> 3) & 0x10')
+            self.emit('a = ((a << 1) & 0xff) | (a >> 7)')
+        elif y == 1:
+            # RRCA
+            self.emit('f = (a & 1) << 4')
+            self.emit('a = (a >> 1) | ((a & 1) << 7)')
+        elif y == 2:
+            # RLA
+            self.emit('t = ((a << 1) & 0xff) | ((f >> 4) & 1)')
+            self.emit('f = (a >> 3) & 0x10')
+            self.emit('a = t')
+        elif y == 3:
+            # RRA
+            self.emit('t = (a >> 1) | ((f & 0x10) << 3)')
+            self.emit('f = (a & 1) << 4')
+            self.emit('a = t')
+        elif y == 4:
+            # DAA
+            self.emit('t = DAA[((f & 0xf0) << 4) | a]')
+            self.emit('a = t >> 8')
+            self.emit('f = t & 0xff')
+        elif y == 5:
+            # CPL
+            self.emit('a ^= 0xff')
+            self.emit('f |= 0x60')
+        elif y == 6:
+            # SCF
+            self.emit('f = (f & 0x80) | 0x10')
+        else:
+            # CCF
+            self.emit('f = (f & 0x90) ^ 0x10')
+        return 4
+
+    def emit_misc(self, opcode: int, operand: int, y: int, z: int) -> int:
+        if z == 0 and y < 4:
+            # RET cc
+            self.use('f')
+            self.emit('if {}:'.format(CONDITIONS[y]))
+            self.modify('sp')
+            self.emit('x = rd(sp) | (rd(sp + 1) << 8)', 2)
+            self.emit('sp += 2', 2)
+            self.exit(2, str(self.cycles + 20), 'x')
+            self.exit(1, str(self.cycles + 8), str(self.pc))
+            self.terminated = True
+            return 0
+        if opcode == 0xc9:
+            self.pop('x')
+            self.jump(None, 16, 16, 'x')
+            return 0
+        if z == 1 and y & 1 == 0:
+            # POP rr
+            self.pop('v')
+            if y == 6:
+                self.modify('a', 'f')
+                self.emit('a = (v >> 8) & 0xff')
+                self.emit('f = v & 0xf0')
+            else:
+                self.set_pair(y >> 1, 'v')
+            return 12
+        if opcode == 0xe9:
+            # JP (HL)
+            self.jump(None, 4, 4, self.hl())
+            return 0
+        if opcode == 0xf9:
+            # LD SP,HL
+            self.modify('sp')
+            self.emit('sp = {}'.format(self.hl()))
+            return 8
+        if z == 5 and y & 1 == 0:
+            # PUSH rr
+            if y == 6:
+                self.use('a', 'f')
+                value = '((a << 8) + f) & 0xfff0'
+            else:
+                value = self.pair(y >> 1)
+            self.push(value, True)
+            self.end_write(16)
+            return 16
+        if opcode == 0xc3:
+            self.jump(None, 16, 16, str(operand))
+            return 0
+        if z == 2 and y < 4:
+            # JP cc
+            self.jump(CONDITIONS[y], 16, 12, str(operand))
+            return 0
+        if opcode == 0xcd:
+            self.push(str(self.pc), False)
+            self.jump(None, 24, 24, str(operand))
+            return 0
+        if z == 4 and y < 4:
+            # CALL cc
+            self.use('f')
+            self.emit('if {}:'.format(CONDITIONS[y]))
+            self.modify('sp')
+            self.emit('sp -= 1', 2)
+            self.emit('wr(sp, {})'.format((self.pc >> 8) & 0xff), 2)
+            self.emit('sp -= 1', 2)
+            self.emit('wr(sp, {})'.format(self.pc & 0xff), 2)
+            self.exit(2, str(self.cycles + 24), str(operand))
+            self.exit(1, str(self.cycles + 12), str(self.pc))
+            self.terminated = True
+            return 0
+        if z == 7:
+            # RST
+            self.push(str(self.pc), False)
+            self.jump(None, 16, 16, str(y * 8))
+            return 0
+        if opcode in (0xe0, 0xe2, 0xea):
+            # LDH (a8),A / LD (C),A / LD (a16),A
+            self.use('a')
+            if opcode == 0xe0:
+                self.emit('x = {}'.format(operand + 0xff00))
+            elif opcode == 0xe2:
+                self.use('c')
+                self.emit('x = c + 0xff00')
+            else:
+                self.emit('x = {}'.format(operand))
+            self.begin_write('x')
+            self.emit('wr(x, a)')
+            cycles = {0xe0: 12, 0xe2: 8, 0xea: 16}[opcode]
+            self.end_write(cycles)
+            return cycles
+        if opcode in (0xf0, 0xf2, 0xfa):
+            # LDH A,(a8) / LD A,(C) / LD A,(a16)
+            if opcode == 0xf0:
+                address = str(operand + 0xff00)
+            elif opcode == 0xf2:
+                self.use('c')
+                address = 'c + 0xff00'
+            else:
+                address = str(operand)
+            self.read('v', address)
+            self.set_register(7, 'v')
+            return {0xf0: 12, 0xf2: 8, 0xfa: 16}[opcode]
+        return 0
+
+    def emit_cb(self, opcode: int) -> int:
+        x = opcode >> 6
+        y = (opcode >> 3) & 7
+        z = opcode & 7
+        if z == 6:
+            self.read('v', self.hl())
+        else:
+            self.emit('v = {}'.format(self.get_register(z)))
+        if x == 1:
+            # BIT
+            self.modify('f')
+            self.emit('f = (f & 0x10) | 0x20 | (0 if v & {} else 0x80)'.format(1 << y))
+            return 12 if z == 6 else 8
+        if x == 0:
+            self.modify('f')
+            if y in (2, 3):
+                self.use('f')
+            for line in ROTATIONS[ROTATION_OPS[y]]:
+                self.emit(line)
+        elif x == 2:
+            self.emit('t = v & {}'.format((1 << y) ^ 0xff))
+        else:
+            self.emit('t = v | {}'.format(1 << y))
+        if z == 6:
+            self.begin_write('x')
+            self.emit('wr(x, t)')
+            self.end_write(16)
+            return 16
+        self.set_register(z, 't')
+        return 8
@@ -5,10 +5,13 @@
 # - https://gbdev.gg8.se/wiki/articles/The_Cartridge_Header
 # - https://gbdev.gg8.se/wiki/articles/Memory_Bank_Controllers
 
-import datetime
+import atexit
 import logging
+import mmap
 import os
 import struct
+import threading
+import time
 
 from shutil import copyfile
 
@@ -147,138 +150,306 @@ class CartridgeHeader:
     # doesn't verify this checksum. 
     GLOBAL_CHECKSUM = 0x014e
 
+    HEADER_SIZE = 0x0150
+
+    ROM_BANKS = {
+        0x00: 2,
+        0x01: 4,
+        0x02: 8,
+        0x03: 16,
+        0x04: 32,
+        0x05: 64,
+        0x06: 128,
+        0x07: 256,
+        0x08: 512,
+        0x52: 72,
+        0x53: 80,
+        0x54: 96
+    }
+
+    RAM_BANKS = {
+        0x00: 0,
+        0x01: 1,
+        0x02: 1,
+        0x03: 4,
+        0x04: 16
+    }
+
+    # Values used by the emulator, parsed once from the header bytes
+    __slots__ = ('game_id', 'cgb', 'cartridge_type', 'rom_banks', 'ram_banks')
+
+    def __init__(self, data: bytes, size: int):
+        self.game_id = bytes(data[CartridgeHeader.TITLE:(CartridgeHeader.TITLE + 15)]).decode().split('\x00')[0]
+        self.cgb = data[CartridgeHeader.CGB_FLAG] in [0x80, 0xc0]
+        self.cartridge_type = data[CartridgeHeader.CARTRIDGE_TYPE]
+        self.rom_banks = CartridgeHeader.ROM_BANKS.get(data[CartridgeHeader.ROM_SIZE], max(size // 0x4000, 2))
+        self.ram_banks = CartridgeHeader.RAM_BANKS.get(data[CartridgeHeader.RAM_SIZE], 0)
+
 
 class Cartridge:
 
-    def __init__(self, file : str):
-        self.data = []
-        size = os.stat(file).st_size
+    def __init__(self, file : str, mapped_ram: bool = False, rtc_wall_clock: bool = True):
+        # With mapped_ram battery backed RAM is a shared mapping of the save
+        # file instead of a copy that is written back
+        self.mapped_ram = mapped_ram
+        # Without rtc_wall_clock the MBC3 clock only counts emulated time, so
+        # runs don't depend on the host time
+        self.rtc_wall_clock = rtc_wall_clock
+        # Created by the first rom() call
+        self.mbc = None
         with open(file,'rb') as f:
-            for i in range(size):
-                self.data.append(struct.unpack('<B', f.read(1))[0])
+            header = f.read(CartridgeHeader.HEADER_SIZE)
+            # The ROM is mapped read only, its pages are loaded on demand and
+            # shared by every emulator running the same file
+            try:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                f.seek(0)
+                self.data = f.read()
+        self.header = CartridgeHeader(header, len(self.data))
 
     def rom(self):
-        rom_type = self.data[CartridgeHeader.CARTRIDGE_TYPE]
+        # The memory bank controller is created once, it owns the battery RAM
+        if self.mbc is None:
+            self.mbc = self.create_rom()
+        return self.mbc
+
+    def create_rom(self):
+        rom_type = self.header.cartridge_type
         if rom_type == 0x00:
-            return ROM(self.data, False, False)
+            return ROM(self.data, False, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x01:
-            return MBC1(self.data, False, False)
+            return MBC1(self.data, False, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x02:
-            return MBC1(self.data, True, False)
+            return MBC1(self.data, True, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x03:
-            return MBC1(self.data, True, True)
+            return MBC1(self.data, True, True, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x05:
-            return MBC2(self.data, False)
+            return MBC2(self.data, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x06:
-            return MBC2(self.data, True)
+            return MBC2(self.data, True, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x08:
-            return ROM(self.data, True, False)
+            return ROM(self.data, True, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x09:
-            return ROM(self.data, True, True)
+            return ROM(self.data, True, True, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x0f:
-            return MBC3(self.data, False, True, True)
+            return MBC3(self.data, False, True, True, mapped_ram=self.mapped_ram, header=self.header, rtc_wall_clock=self.rtc_wall_clock)
         if rom_type == 0x10:
-            return MBC3(self.data, True, True, True)
+            return MBC3(self.data, True, True, True, mapped_ram=self.mapped_ram, header=self.header, rtc_wall_clock=self.rtc_wall_clock)
         if rom_type == 0x11:
-            return MBC3(self.data, False, False, False)
+            return MBC3(self.data, False, False, False, mapped_ram=self.mapped_ram, header=self.header, rtc_wall_clock=self.rtc_wall_clock)
         if rom_type == 0x12:
-            return MBC3(self.data, True, False, False)
+            return MBC3(self.data, True, False, False, mapped_ram=self.mapped_ram, header=self.header, rtc_wall_clock=self.rtc_wall_clock)
         if rom_type == 0x13:
-            return MBC3(self.data, True, True, False)
+            return MBC3(self.data, True, True, False, mapped_ram=self.mapped_ram, header=self.header, rtc_wall_clock=self.rtc_wall_clock)
         if rom_type == 0x19:
-            return MBC5(self.data, False, False)
+            return MBC5(self.data, False, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x1a:
-            return MBC5(self.data, True, False)
+            return MBC5(self.data, True, False, mapped_ram=self.mapped_ram, header=self.header)
         if rom_type == 0x1b:
-            return MBC5(self.data, True, True)
+            return MBC5(self.data, True, True, mapped_ram=self.mapped_ram, header=self.header)
         return None
 
-    def __getstate__(self):
-        state = self.__dict__.copy()
-        # Don't pickle
-        del state["data"]
-        return state
-
 class Battery:
 
-    def __init__(self, save_file: str):
-        self.save_file = save_file
+    # Saves are written behind the emulation: save_ram() only marks the RAM
+    # dirty and a saver thread writes it SAVE_DELAY seconds later, so games
+    # toggling RAM enable many times a second cause a single write. Pending
+    # saves are written on close() and at exit. RAM mapped with map_ram() is
+    # the save file itself, saving it only flushes the mapping.
+    # Cartridges with more state than the RAM (the MBC3 clock) store it in a
+    # footer_size bytes footer after the RAM, footer() returns its contents.
+    SAVE_DELAY = 1.0 # seconds
 
-    def load_ram(self, ram: list):
+    def __init__(self, save_file: str, footer_size: int = 0):
+        self.save_file = save_file
+        self.footer_size = footer_size
+        self.footer = None
+        self.start()
+
+    def start(self):
+        self.ram = None
+        # Footer read by load_ram() or map_ram(), empty if there was none
+        self.footer_data = b''
+        self.dirty = False
+        self.closed = False
+        self.condition = threading.Condition()
+        # Serializes writes so an older snapshot never replaces a newer one
+        self.write_lock = threading.Lock()
+        self.thread = None
+
+    def load_ram(self, ram: bytearray):
         try:
             size = os.stat(self.save_file).st_size
             
             # Check if Savefile is not corrupted, if it is corrupted then try restore bkp
-            if len(ram) != size:
+            if size not in (len(ram), len(ram) + self.footer_size):
                 if os.path.exists(self.save_file+'.bkp'):
                     copyfile(self.save_file  + '.bkp' ,self.save_file)
                     size = os.stat(self.save_file).st_size
 
             with open(self.save_file,'rb') as f:
-                for i in range(size):
-                    ram[i] = struct.unpack('<B', f.read(1))[0]
-            return ram
+                f.readinto(memoryview(ram)[:size])
+                self.read_footer(f, len(ram))
         except FileNotFoundError:
             # File will be generated when saving
-            return ram
-
-
-    def save_ram(self, ram: list):
-        # Lets make a backup save
-        if os.path.exists(self.save_file):
-            copyfile(self.save_file,self.save_file + '.bkp')
-
-        with open(self.save_file,'wb') as f:
-            f.write(bytes(ram))
-            f.flush()
+            pass
+        self.ram = ram
+        return ram
+
+    def map_ram(self, ram: bytearray) -> mmap.mmap:
+        # The save file itself becomes the RAM, writes land in the page cache
+        # and the OS persists them. A new or short file is filled up with the
+        # initial RAM contents.
+        with open(self.save_file,'a+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(ram):
+                f.write(ram[size:])
+                f.flush()
+            self.read_footer(f, len(ram))
+            self.ram = mmap.mmap(f.fileno(), len(ram))
+            return self.ram
+
+    def read_footer(self, f, offset: int):
+        if self.footer_size:
+            f.seek(offset)
+            footer = f.read(self.footer_size)
+            if len(footer) == self.footer_size:
+                self.footer_data = footer
+
+    def save_ram(self, ram: bytearray):
+        with self.condition:
+            self.ram = ram
+            if self.dirty:
+                return
+            self.dirty = True
+            if not self.closed:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name='battery', daemon=True)
+                    self.thread.start()
+                    atexit.register(self.close)
+                self.condition.notify()
+                return
+        # Nothing writes it later once closed
+        self.flush()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.dirty and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                # Later saves within the delay are merged into this one
+                self.condition.wait(self.SAVE_DELAY)
+            self.flush()
+
+    def flush(self):
+        with self.write_lock:
+            with self.condition:
+                if not self.dirty:
+                    return
+                self.dirty = False
+                footer = self.footer() if self.footer is not None else b''
+                if isinstance(self.ram, mmap.mmap):
+                    # Mapped RAM is already the file, only the footer is written
+                    self.ram.flush()
+                    if footer:
+                        with open(self.save_file,'r+b') as f:
+                            f.seek(len(self.ram))
+                            f.write(footer)
+                    return
+                data = bytes(self.ram) + footer
+            # A crash while writing leaves the previous save untouched
+            temp_file = self.save_file + '.tmp'
+            with open(temp_file,'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.save_file)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            # The footer changes without RAM writes, it is saved on close
+            if self.footer is not None and self.ram is not None:
+                self.dirty = True
+            self.condition.notify()
+        atexit.unregister(self.close)
+        self.flush()
 
 class CartridgeType:
 
-    def __init__(self, data : list, hasRam: bool, hasBattery: bool):
+    def __init__(self, data : bytes, hasRam: bool, hasBattery: bool, mapped_ram: bool = False, header: CartridgeHeader = None):
         self.data = data
         self.hasRam = hasRam
         self.hasBattery = hasBattery
+        # Parsed once by Cartridge, only MBCs created on their own parse it
+        self.header = header if header is not None else CartridgeHeader(data, len(data))
+        self.rom_banks = self.header.rom_banks
+        self.ram_banks = self.header.ram_banks
 
-        rom_banks_reg = self.data[CartridgeHeader.ROM_SIZE]
-        self.rom_banks = {
-            0x00: 2,
-            0x01: 4,
-            0x02: 8,
-            0x03: 16,
-            0x04: 32,
-            0x05: 64,
-            0x06: 128,
-            0x07: 256,
-            0x52: 72,
-            0x53: 80,
-            0x54: 96
-        }.get(rom_banks_reg, 0)
-
-        ram_banks_reg = self.data[CartridgeHeader.RAM_SIZE]
-        self.ram_banks = {
-            0x00: 0,
-            0x01: 1,
-            0x02: 1,
-            0x03: 4,
-            0x04: 16
-        }.get(ram_banks_reg, 0)
-
-        self.ram = [0xff]*(0x2000 * self.ram_banks)
+        self.ram = bytearray([0xff])*(0x2000 * self.ram_banks)
 
         if self.hasBattery:
             save_file_name = self.get_game_id()+".sav"
-            self.battery = Battery(save_file_name)
-            self.ram = self.battery.load_ram(self.ram)
+            self.battery = Battery(save_file_name, self.save_footer_size())
+            if mapped_ram and self.ram:
+                self.ram = self.battery.map_ram(self.ram)
+            else:
+                self.ram = self.battery.load_ram(self.ram)
+
+        # Written 256 byte pages of the external RAM
+        self.ram_dirty = bytearray([1]) * (len(self.ram) >> 8)
+        self.rom_bank = 1
+        self.ram_bank = 0
+        self.map_banks()
+
+    def map_banks(self):
+        # ROM and RAM are split in per bank views once, switching banks only
+        # swaps the active view
+        rom = memoryview(self.data)
+        self.rom_views = [rom[bank * 0x4000:(bank + 1) * 0x4000] for bank in range(self.rom_banks)]
+        ram = memoryview(self.ram)
+        self.ram_views = [ram[bank * 0x2000:(bank + 1) * 0x2000] for bank in range(self.ram_banks)]
+        self.select_rom_bank()
+        self.select_ram_bank()
+
+    def select_rom_bank(self):
+        # Active bank at 4000-7FFF
+        self.rom_view = self.rom_views[self.rom_bank % self.rom_banks]
+
+    def select_ram_bank(self):
+        # Active bank at A000-BFFF, None without external RAM
+        self.ram_view = self.ram_views[self.ram_bank % self.ram_banks] if self.ram_banks else None
+        # First page of the active bank in ram_dirty
+        self.ram_page = (self.ram_bank % self.ram_banks) * 0x20 if self.ram_banks else 0
+
+    def save_footer_size(self) -> int:
+        # Bytes saved after the RAM in the save file
+        return 0
+
+    def set_scheduler(self, scheduler):
+        pass
+
+    def close(self):
+        # Writes a pending battery save
+        if self.hasBattery:
+            self.battery.close()
 
     def get_game_id(self) -> str:
-        return bytes(self.data[CartridgeHeader.TITLE:(CartridgeHeader.TITLE + 15)]).decode().split('\x00')[0]
+        return self.header.game_id
 
     def is_cgb(self) -> bool:
-        return self.data[CartridgeHeader.CGB_FLAG] in [0x80, 0xc0]
+        return self.header.cgb
 
     def read_rom_byte(self, address : int) -> int:
         return self.data[address]
 
+    def read_rom_bank(self, address : int) -> int:
+        # 4000-7FFF
+        return self.rom_view[address - 0x4000]
+
     def write_rom_byte(self, address : int, value : int):
         pass
 
@@ -290,6 +461,7 @@ class CartridgeType:
     def write_external_ram_byte(self, address : int, value : int):
         if self.hasRam:
             self.ram[address - 0xa000] = value & 0xff
+            self.ram_dirty[(address - 0xa000) >> 8] = 1
 
 # None (32KByte ROM only)
 # Small games of not more than 32KBytes ROM do not require a MBC chip 
@@ -299,8 +471,8 @@ class CartridgeType:
 # chip. 
 class ROM(CartridgeType):
 
-    def __init__(self, data: list, hasRam: bool, hasBattery: bool):
-        super().__init__(data, hasRam, hasBattery)
+    def __init__(self, data: bytes, hasRam: bool, hasBattery: bool, mapped_ram: bool = False, header: CartridgeHeader = None):
+        super().__init__(data, hasRam, hasBattery, mapped_ram, header)
 
 
 # MBC1 (max 2MByte ROM and/or 32KByte RAM)
@@ -315,11 +487,9 @@ class MBC1(CartridgeType):
     ROM_BANKING_MODE = 0x00
     RAM_BANKING_MODE = 0x01
 
-    def __init__(self, data: list, hasRam: bool, hasBattery: bool):
-        super().__init__(data, hasRam, hasBattery)
-        self.ram_bank = 0
-        self.rom_bank = 1
+    def __init__(self, data: bytes, hasRam: bool, hasBattery: bool, mapped_ram: bool = False, header: CartridgeHeader = None):
         self.memory_mode = 0
+        super().__init__(data, hasRam, hasBattery, mapped_ram, header)
         self.ram_enabled = False
       
     def read_rom_byte(self, address : int) -> int:
@@ -331,11 +501,14 @@ class MBC1(CartridgeType):
         # This area may contain any of the further 16KByte banks of the ROM, allowing to 
         # address up to 125 ROM Banks (almost 2MByte). As described below, bank numbers 
         # 20h, 40h, and 60h cannot be used, resulting in the odd amount of 125 banks. 
+        return self.rom_view[address - 0x4000]
+
+    def select_rom_bank(self):
         if self.rom_bank == 0:
             self.rom_bank += 1
         if self.memory_mode == MBC1.ROM_BANKING_MODE and self.rom_bank in [0x20, 0x40, 0x60]:
             self.rom_bank += 1
-        return self.data[(0x4000 * (self.rom_bank % self.rom_banks)) + (address - 0x4000)]
+        super().select_rom_bank()
 
     def write_rom_byte(self, address : int, value : int):
         # 0000-1FFF - RAM Enable (Write Only)
@@ -392,6 +565,10 @@ class MBC1(CartridgeType):
                 else:
                     self.rom_bank = self.rom_bank | ((self.ram_bank & 0b00000011) << 5)
                     self.ram_bank = 0
+
+        if 0x2000 <= address <= 0x7fff:
+            self.select_rom_bank()
+            self.select_ram_bank()
         
     def read_external_ram_byte(self, address : int) -> int:
         # A000-BFFF - RAM Bank 00-03, if any (Read/Write)
@@ -399,8 +576,8 @@ class MBC1(CartridgeType):
         # buffered, allowing to store game positions or high score tables, even if the gameboy is turned off, 
         # or if the cartridge is removed from the gameboy. Available RAM sizes are: 2KByte (at A000-A7FF), 
         # 8KByte (at A000-BFFF), and 32KByte (in form of four 8K banks at A000-BFFF). 
-        if self.ram_enabled:
-            return self.ram[((self.ram_bank % self.ram_banks) * 0x2000) + (address - 0xa000)]
+        if self.ram_enabled and self.ram_view is not None:
+            return self.ram_view[address - 0xa000]
         return 0xff
 
     def write_external_ram_byte(self, address : int, value : int):
@@ -409,31 +586,161 @@ class MBC1(CartridgeType):
         # buffered, allowing to store game positions or high score tables, even if the gameboy is turned off, 
         # or if the cartridge is removed from the gameboy. Available RAM sizes are: 2KByte (at A000-A7FF), 
         # 8KByte (at A000-BFFF), and 32KByte (in form of four 8K banks at A000-BFFF). 
-        if self.ram_enabled:
-            self.ram[((self.ram_bank % self.ram_banks) * 0x2000) + (address - 0xa000)] = value
+        if self.ram_enabled and self.ram_view is not None:
+            self.ram_view[address - 0xa000] = value
+            self.ram_dirty[self.ram_page | ((address - 0xa000) >> 8)] = 1
         
 # MBC2 (max 256KByte ROM and 512x4 bits RAM)
 class MBC2(CartridgeType):
 
-    def __init__(self, data: list, hasBattery: bool):
-        super().__init__(data, False, hasBattery)
+    def __init__(self, data: bytes, hasBattery: bool, mapped_ram: bool = False, header: CartridgeHeader = None):
+        super().__init__(data, False, hasBattery, mapped_ram, header)
         logging.warning('MBC2 is not implemented')
 
 # MBC3 (max 2MByte ROM and/or 64KByte RAM and Timer)
 # Beside for the ability to access up to 2MB ROM (128 banks), and 64KB RAM (8 banks), the MBC3 also includes 
 # a built-in Real Time Clock (RTC). The RTC requires an external 32.768 kHz Quartz Oscillator, and an external 
 # battery (if it should continue to tick when the gameboy is turned off).
+# The clock counts emulated time: it is advanced from the scheduler timestamps
+# when it is latched or written, so it stops while the emulator is paused and
+# runs faster with it. With rtc_wall_clock the time the emulator was not
+# running is added when the clock is loaded from the save file.
 class MBC3(CartridgeType):
 
-    def __init__(self, data: list, hasRam: bool, hasBattery: bool, hasTimer: bool):
-        super().__init__(data, hasRam, hasBattery)
-        self.ram_bank = 0
-        self.rom_bank = 1
-        self.ram_enabled = False
+    RTC_CLOCK = 4194304 # scheduler timestamps per second
+    # Footer after the RAM in the save file (the format used by VBA-M and
+    # BGB): the clock and the latched registers as 32 bit values and the unix
+    # time it was saved at
+    RTC_FOOTER = struct.Struct('<10IQ')
+
+    def __init__(self, data: bytes, hasRam: bool, hasBattery: bool, hasTimer: bool, mapped_ram: bool = False, rtc_wall_clock: bool = True, header: CartridgeHeader = None):
         self.has_timer = hasTimer
+        super().__init__(data, hasRam, hasBattery, mapped_ram, header)
+        self.ram_enabled = False
         self.rtc_register_mode = False
         self.rtc_register_selected = 0
-      
+        self.rtc_wall_clock = rtc_wall_clock
+        self.rtc_seconds = 0
+        self.rtc_minutes = 0
+        self.rtc_hours = 0
+        self.rtc_days = 0
+        self.rtc_halt = False
+        self.rtc_carry = False
+        # S, M, H, DL, DH as read by the game
+        self.rtc_latched = [0, 0, 0, 0, 0]
+        self.rtc_latch = 0xff
+        # Timestamp the clock was advanced to, the part of a second since the
+        # last tick is kept by not moving it further than the last tick
+        self.rtc_time = 0
+        self.rtc_saved_time = 0
+        self.scheduler = None
+        if self.has_timer and self.hasBattery:
+            self.battery.footer = self.rtc_footer
+            if self.battery.footer_data:
+                self.load_rtc(self.battery.footer_data)
+
+    def save_footer_size(self) -> int:
+        return self.RTC_FOOTER.size if self.has_timer else 0
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
+        self.rtc_time = scheduler.now
+        if self.rtc_wall_clock and self.rtc_saved_time and not self.rtc_halt:
+            self.tick_rtc(max(int(time.time()) - self.rtc_saved_time, 0))
+
+    def load_rtc(self, footer: bytes):
+        values = self.RTC_FOOTER.unpack(footer)
+        self.rtc_seconds = values[0] & 0x3f
+        self.rtc_minutes = values[1] & 0x3f
+        self.rtc_hours = values[2] & 0x1f
+        self.rtc_days = (values[3] & 0xff) | ((values[4] & 0x01) << 8)
+        self.rtc_halt = values[4] & 0b01000000 != 0
+        self.rtc_carry = values[4] & 0b10000000 != 0
+        self.rtc_latched = [value & 0xff for value in values[5:10]]
+        self.rtc_saved_time = values[10]
+
+    def rtc_footer(self) -> bytes:
+        self.sync_rtc()
+        return self.RTC_FOOTER.pack(*self.rtc_registers(), *self.rtc_latched, int(time.time()))
+
+    def rtc_registers(self) -> list:
+        return [
+            self.rtc_seconds,
+            self.rtc_minutes,
+            self.rtc_hours,
+            self.rtc_days & 0xff,
+            (self.rtc_days >> 8) | (self.rtc_halt << 6) | (self.rtc_carry << 7)
+        ]
+
+    def sync_rtc(self):
+        # Applies the seconds elapsed since the clock was last advanced
+        if self.scheduler is None:
+            return
+        now = self.scheduler.now
+        if self.rtc_halt:
+            self.rtc_time = now
+            return
+        seconds = (now - self.rtc_time) // MBC3.RTC_CLOCK
+        if seconds > 0:
+            self.rtc_time += seconds * MBC3.RTC_CLOCK
+            self.tick_rtc(seconds)
+
+    def tick_rtc(self, seconds: int):
+        # Counters written out of range count up to 63 (31 for hours) and
+        # wrap to 0 without a carry, like the real chip
+        while seconds and not (self.rtc_seconds < 60 and self.rtc_minutes < 60 and self.rtc_hours < 24):
+            seconds -= 1
+            self.rtc_seconds = (self.rtc_seconds + 1) & 0x3f
+            if self.rtc_seconds != 60:
+                continue
+            self.rtc_seconds = 0
+            self.rtc_minutes = (self.rtc_minutes + 1) & 0x3f
+            if self.rtc_minutes != 60:
+                continue
+            self.rtc_minutes = 0
+            self.rtc_hours = (self.rtc_hours + 1) & 0x1f
+            if self.rtc_hours == 24:
+                self.rtc_hours = 0
+                self.tick_days(1)
+        if seconds:
+            total = self.rtc_seconds + self.rtc_minutes * 60 + self.rtc_hours * 3600 + seconds
+            self.rtc_seconds = total % 60
+            self.rtc_minutes = total // 60 % 60
+            self.rtc_hours = total // 3600 % 24
+            if total >= 86400:
+                self.tick_days(total // 86400)
+
+    def tick_days(self, days: int):
+        self.rtc_days += days
+        if self.rtc_days > 0x1ff:
+            # The carry stays set until the game clears it
+            self.rtc_days &= 0x1ff
+            self.rtc_carry = True
+
+    def latch_rtc(self):
+        self.sync_rtc()
+        self.rtc_latched = self.rtc_registers()
+
+    def write_rtc(self, register: int, value: int):
+        self.sync_rtc()
+        if register == 0x08:
+            self.rtc_seconds = value & 0x3f
+            # Writing the seconds resets the part of a second counted
+            if self.scheduler is not None:
+                self.rtc_time = self.scheduler.now
+        elif register == 0x09:
+            self.rtc_minutes = value & 0x3f
+        elif register == 0x0a:
+            self.rtc_hours = value & 0x1f
+        elif register == 0x0b:
+            self.rtc_days = (self.rtc_days & 0x100) | value
+        else:
+            self.rtc_days = (self.rtc_days & 0xff) | ((value & 0x01) << 8)
+            self.rtc_halt = value & 0b01000000 != 0
+            self.rtc_carry = value & 0b10000000 != 0
+        # Writes are seen by reads without latching again
+        self.rtc_latched[register - 0x08] = self.rtc_registers()[register - 0x08]
+
     def read_rom_byte(self, address : int) -> int:
         # 0000-3FFF - ROM Bank 00 (Read Only)
         # Same as for MBC1. 
@@ -441,9 +748,7 @@ class MBC3(CartridgeType):
             return self.data[address]
         # 4000-7FFF - ROM Bank 01-7F (Read Only)
         # Same as for MBC1, except that accessing banks 20h, 40h, and 60h is supported now
-        if self.rom_bank == 0:
-            self.rom_bank += 1
-        return self.data[(0x4000 * (self.rom_bank % self.rom_banks)) + (address - 0x4000)]
+        return self.rom_view[address - 0x4000]
 
     def write_rom_byte(self, address : int, value : int):
         # 0000-1FFF - RAM and Timer Enable (Write Only)
@@ -462,6 +767,7 @@ class MBC3(CartridgeType):
             self.rom_bank = value & 0b01111111
             if self.rom_bank == 0:
                 self.rom_bank += 1
+            self.select_rom_bank()
 
         # 4000-5FFF - RAM Bank Number - or - RTC Register Select (Write Only)
         # As for the MBC1s RAM Banking Mode, writing a value in range for 00h-07h maps the corresponding external 
@@ -475,6 +781,7 @@ class MBC3(CartridgeType):
             elif 0x00 <= value <= 0x07:
                 self.rtc_register_mode = False
                 self.ram_bank = value
+                self.select_ram_bank()
 
         
         # 6000-7FFF - Latch Clock Data (Write Only)
@@ -483,7 +790,9 @@ class MBC3(CartridgeType):
         # This is supposed for <reading> from the RTC registers. This can be proven by reading the latched (frozen) time 
         # from the RTC registers, and then unlatch the registers to show the clock itself continues to tick in background. 
         if 0x6000 <= address <= 0x7fff:
-            pass #unimplemented latch clock
+            if self.has_timer and self.rtc_latch == 0x00 and value == 0x01:
+                self.latch_rtc()
+            self.rtc_latch = value
         
     def read_external_ram_byte(self, address : int) -> int:
         # A000-BFFF - RAM Bank 00-07, if any (Read/Write)
@@ -491,7 +800,6 @@ class MBC3(CartridgeType):
         # Depending on the current Bank Number/RTC Register selection (see below), this memory space is used to access 
         # an 8KByte external RAM Bank, or a single RTC Register.
         if self.has_timer and self.rtc_register_mode:
-            now = datetime.datetime.now()
             # The Clock Counter Registers
             # 08h  RTC S   Seconds   0-59 (0-3Bh)
             # 09h  RTC M   Minutes   0-59 (0-3Bh)
@@ -501,21 +809,11 @@ class MBC3(CartridgeType):
             #       Bit 0  Most significant bit of Day Counter (Bit 8)
             #       Bit 6  Halt (0=Active, 1=Stop Timer)
             #       Bit 7  Day Counter Carry Bit (1=Counter Overflow)
-            if self.rtc_register_selected == 0x08:
-                return now.second & 0xff
-            if self.rtc_register_selected == 0x09:
-                return now.minute & 0xff
-            if self.rtc_register_selected == 0x0a:
-                return now.hour & 0xff
-            if self.rtc_register_selected == 0x0b:
-                return now.timetuple().tm_yday & 0xff
-            if self.rtc_register_selected == 0x0c:
-                if now.timetuple().tm_yday > 0xff:
-                    return 0x01
-                return 0x00 
-
-        if self.ram_enabled:
-            return self.ram[((self.ram_bank % self.ram_banks) * 0x2000) + (address - 0xa000)]
+            # Reads return the latched registers
+            return self.rtc_latched[self.rtc_register_selected - 0x08]
+
+        if self.ram_enabled and self.ram_view is not None:
+            return self.ram_view[address - 0xa000]
         return 0xff
 
     def write_external_ram_byte(self, address : int, value : int):
@@ -524,18 +822,17 @@ class MBC3(CartridgeType):
         # Depending on the current Bank Number/RTC Register selection (see below), this memory space is used to access 
         # an 8KByte external RAM Bank, or a single RTC Register.
         if self.has_timer and self.rtc_register_mode:
-            pass #unimplemented
-        elif self.ram_enabled:
-            self.ram[((self.ram_bank % self.ram_banks) * 0x2000) + (address - 0xa000)] = value
+            self.write_rtc(self.rtc_register_selected, value)
+        elif self.ram_enabled and self.ram_view is not None:
+            self.ram_view[address - 0xa000] = value
+            self.ram_dirty[self.ram_page | ((address - 0xa000) >> 8)] = 1
 
 
 # MBC5 (max 8MByte ROM and/or 128KByte RAM)
 class MBC5(CartridgeType):
 
-    def __init__(self, data: list, hasRam: bool, hasBattery: bool):
-        super().__init__(data, hasRam, hasBattery)
-        self.ram_bank = 0
-        self.rom_bank = 1
+    def __init__(self, data: bytes, hasRam: bool, hasBattery: bool, mapped_ram: bool = False, header: CartridgeHeader = None):
+        super().__init__(data, hasRam, hasBattery, mapped_ram, header)
         self.ram_enabled = False
 
     def read_rom_byte(self, address : int) -> int:
@@ -545,7 +842,7 @@ class MBC5(CartridgeType):
             return self.data[address]
         # 4000-7FFF - ROM Bank 01-7F (Read Only)
         # Same as for MBC1, except that accessing up to bank 1E0h is supported now. Also, bank 0 is actually bank 0
-        return self.data[(0x4000 * (self.rom_bank % self.rom_banks)) + (address - 0x4000)]
+        return self.rom_view[address - 0x4000]
 
     def write_rom_byte(self, address : int, value : int):
         # 0000-1FFF - RAM Enable (Write Only)
@@ -559,26 +856,30 @@ class MBC5(CartridgeType):
         # The lower 8 bits of the ROM bank number goes here. Writing 0 will indeed give bank 0 on MBC5, unlike other MBCs. 
         if 0x2000 <= address <= 0x2fff:
             self.rom_bank = (self.rom_bank & 0x0100) | ( value & 0xff )
+            self.select_rom_bank()
 
         # 3000-3FFF - High bit of ROM Bank Number (Write Only)
         # The 9th bit of the ROM bank number goes here. 
         if 0x3000 <= address <= 0x3fff:
             self.rom_bank = (self.rom_bank & 0x00ff) | (( value & 1 ) << 8)
+            self.select_rom_bank()
 
 
         # 4000-5FFF - RAM Bank Number (Write Only)
         # As for the MBC1s RAM Banking Mode, writing a value in range for 00h-0Fh maps the corresponding external RAM Bank (if any) into memory at A000-BFFF.
         if 0x4000 <= address <= 0x5fff:
             self.ram_bank = value & 0x0f
+            self.select_ram_bank()
         
     def read_external_ram_byte(self, address : int) -> int:
         # A000-BFFF - RAM Bank 00-07, if any (Read/Write)
         # Same as for MBC1, except RAM sizes are 8KiB, 32KiB and 128KiB
-        if self.ram_enabled:
-            return self.ram[((self.ram_bank % self.ram_banks) * 0x2000) + (address - 0xa000)]
+        if self.ram_enabled and self.ram_view is not None:
+            return self.ram_view[address - 0xa000]
         return 0xff
 
     def write_external_ram_byte(self, address : int, value : int):
         # A000-BFFF - RAM Bank 00-07, if any (Read/Write)
-        if self.ram_enabled:
-            self.ram[((self.ram_bank % self.ram_banks) * 0x2000) + (address - 0xa000)] = value
\ No newline at end of file
+        if self.ram_enabled and self.ram_view is not None:
+            self.ram_view[address - 0xa000] = value
+            self.ram_dirty[self.ram_page | ((address - 0xa000) >> 8)] = 1
\ No newline at end of file
@@ -21,6 +21,8 @@ class CGB_Palette:
             Color(0x7fff),Color(0x421f),Color(0x1cf2),Color(0x0000)  #BGP7
         ]
         self.bgpi = PaletteIndex()
+        # RGB555 colors of each palette, rebuilt when the palette is written
+        self.bg_rgba = [self.palette_rgba(self.bg_palettes, palette) for palette in range(8)]
 
         # FF68 - BCPS/BGPI - CGB Mode Only - Background Palette Index
         self.ob_palettes = [
@@ -34,6 +36,7 @@ class CGB_Palette:
             Color(0x7fff),Color(0x1bef),Color(0x0200),Color(0x0000)  #OBP7
         ]
         self.obpi = PaletteIndex()
+        self.ob_rgba = [self.palette_rgba(self.ob_palettes, palette) for palette in range(8)]
 
 
     def set_bgpi(self, value):
@@ -48,6 +51,7 @@ class CGB_Palette:
             self.bg_palettes[address].set_low_byte(value)
         else: # Set high byte
             self.bg_palettes[address].set_high_byte(value)
+        self.bg_rgba[self.bgpi.get_palette()] = self.palette_rgba(self.bg_palettes, self.bgpi.get_palette())
         if self.bgpi.is_autoincrement():
             self.set_bgpi(self.bgpi.get_value() + 1)
 
@@ -73,6 +77,7 @@ class CGB_Palette:
             self.ob_palettes[address].set_low_byte(value)
         else: # Set high byte
             self.ob_palettes[address].set_high_byte(value)
+        self.ob_rgba[self.obpi.get_palette()] = self.palette_rgba(self.ob_palettes, self.obpi.get_palette())
         if self.obpi.is_autoincrement():
             self.set_obpi(self.obpi.get_value() + 1)
 
@@ -88,12 +93,14 @@ class CGB_Palette:
 
             
     def get_bg_rgba_palette_color(self, palette, color):
-        address = (palette * 4) + color
-        return self.bg_palettes[address].get_rgba()
+        return self.bg_rgba[palette][color]
 
     def get_ob_rgba_palette_color(self, palette, color):
-        address = (palette * 4) + color
-        return self.ob_palettes[address].get_rgba()
+        return self.ob_rgba[palette][color]
+
+    @staticmethod
+    def palette_rgba(palettes, palette):
+        return tuple(color.get_rgba() for color in palettes[palette * 4:palette * 4 + 4])
 
 class PaletteIndex:
 
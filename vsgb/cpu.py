@@ -3,7 +3,8 @@
 
 import logging
 
-from vsgb.interrupt_manager import InterruptManager, Interrupt
+from vsgb.interrupt_manager import Interrupt
+from vsgb.block_translator import BlockTranslator
 from vsgb.instruction_performer import InstructionPerformer
 from vsgb.io_registers import IO_Registers
 from vsgb.mmu import MMU
@@ -15,68 +16,172 @@ class CPU:
 
     def __init__(self, mmu: MMU):
         self.mmu = mmu        
+        self.registers = Registers()
+        self.interrupt_manager = mmu.interrupt_manager
+        self.stack_manager = StackManager(self.registers, mmu)
         self.instructionPerformer = InstructionPerformer(self)
         self.ticks = 0
         self.ime = False
         self.halted = False
         self.stop = False
+        # Set by illegal opcodes, only a reset gets the cpu out of it
+        self.locked = False
         self.pending_interrupts_before_halt = 0x00
         self.last_pc = 0
         self.last_instruction = 0
+        self.scheduler = None
+        self.translator = BlockTranslator(self)
 
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
     
     def step(self):
         self.ticks = 0
-        if self.stop:
+        if self.stop or self.locked:
+            # keep the clock running so scheduled events still happen
+            self.ticks = self.idle_ticks()
             return None
         self.check_halted()
         if self.ime or 0 != self.pending_interrupts_before_halt:
             self.serve_interrupt()
         if self.halted:
-            self.ticks += 4
+            self.ticks += self.idle_ticks()
+            return None
+        block = self.translator.block(self.registers.pc)
+        if block is not None:
+            # run as much of the block as fits before the next event
+            scheduler = self.scheduler
+            limit = ((scheduler.deadline - scheduler.now) << scheduler.speed_shift) - self.ticks
+            if block.idle:
+                self.run_idle_loop(block, limit)
+            else:
+                self.ticks += block.run(limit)
         else:
-            self.last_pc = Registers.pc
+            self.last_pc = self.registers.pc
             instruction = self.fetch_instruction()
             self.last_instruction = instruction
             self.perform_instruction(instruction)
         return None
     
+    def execute(self, cycles: int) -> int:
+        # Runs until cycles cycles have passed or the next scheduler event is
+        # due, whichever comes first. The last instruction may go past either.
+        # Same as calling step() in a loop with the common case (no halt, stop
+        # or interrupt) inlined. Returns the cycles run.
+        scheduler = self.scheduler
+        registers = self.registers
+        interrupt_manager = self.interrupt_manager
+        read_byte = self.mmu.read_byte
+        dispatch = self.instructionPerformer.instrs
+        block_at = self.translator.block
+        end = scheduler.now + (cycles >> scheduler.speed_shift)
+        executed = 0
+        while scheduler.now < scheduler.deadline and scheduler.now < end:
+            if self.halted or self.stop or self.locked:
+                self.step()
+            else:
+                self.ticks = 0
+                if (self.ime or 0 != self.pending_interrupts_before_halt) \
+                    and interrupt_manager.ie_register & interrupt_manager.if_register & 0x1f:
+                    self.serve_interrupt()
+                pc = registers.pc
+                block = block_at(pc)
+                if block is None:
+                    self.last_pc = pc
+                    opcode = read_byte(pc)
+                    if 0xcb == opcode:
+                        opcode = 0x100 | read_byte(pc + 1)
+                        registers.pc = pc + 2
+                    else:
+                        registers.pc = pc + 1
+                    self.last_instruction = opcode
+                    self.ticks += dispatch[opcode]()
+                else:
+                    limit = ((scheduler.deadline - scheduler.now) << scheduler.speed_shift) - self.ticks
+                    if block.idle:
+                        self.run_idle_loop(block, limit)
+                    else:
+                        self.ticks += block.run(limit)
+            executed += self.ticks
+            scheduler.now += self.ticks >> scheduler.speed_shift
+        return executed
+
+    def run_idle_loop(self, block, limit: int):
+        # The loop only reads values that change through scheduler events
+        # (and DIV). Once an iteration leaves the registers as they were,
+        # the next ones do the same until then and are skipped.
+        registers = self.registers
+        before = (registers.a, registers.f, registers.b, registers.c, registers.d, registers.e, registers.h, registers.l, registers.sp)
+        start = self.ticks
+        cycles = block.run(limit)
+        self.ticks += cycles
+        if cycles != block.loop_cycles or registers.pc != block.start \
+            or before != (registers.a, registers.f, registers.b, registers.c, registers.d, registers.e, registers.h, registers.l, registers.sp):
+            return
+        # Cycles left after this iteration
+        window = limit - cycles
+        if block.reads_div:
+            # DIV has to stay the same as read by this iteration
+            timer = self.mmu.timer
+            time = self.scheduler.cpu_time() + start
+            next_div = time + timer.DIV_INC_TIME - (time - timer.div_start) % timer.DIV_INC_TIME
+            window = min(window, next_div - time - cycles)
+        # An iteration runs whole when it starts with more than loop_last
+        # cycles left
+        if window > block.loop_last:
+            skipped = -((block.loop_last - window) // cycles) * cycles
+            self.ticks += skipped
+            self.translator.idle_loops[block.start] += skipped
+
+    def idle_ticks(self) -> int:
+        # Halted or stopped CPUs only wake up when IF changes, which only
+        # scheduler events do. The 4 cycle steps up to the next event are
+        # taken at once.
+        scheduler = self.scheduler
+        if scheduler.deadline == scheduler.NEVER:
+            return 4
+        step = 4 >> scheduler.speed_shift
+        return max(-((scheduler.now - scheduler.deadline) // step), 1) * 4
+
     def check_halted(self):
-        if self.halted and self.pending_interrupts_before_halt != InterruptManager.if_register:
+        if self.halted and self.pending_interrupts_before_halt != self.interrupt_manager.if_register:
             self.ticks += 4
             self.halted = False
 
     def serve_interrupt(self):
-        interrupt = InterruptManager.pending_interrupt()
+        interrupt = self.interrupt_manager.pending_interrupt()
         if interrupt == Interrupt.INTERRUPT_NONE:
             return None
         self.ime = False
         if self.halted:
             self.halted = False
-        StackManager.push_word(Registers.pc)
+        self.stack_manager.push_word(self.registers.pc)
         if interrupt == Interrupt.INTERRUPT_VBLANK:
-            Registers.pc = 0x40 #RST 40H
-            InterruptManager.if_register &= 0b11111110
+            self.registers.pc = 0x40 #RST 40H
+            self.interrupt_manager.if_register &= 0b11111110
         elif interrupt == Interrupt.INTERRUPT_LCDSTAT:
-            Registers.pc = 0x48 #RST 48H
-            InterruptManager.if_register &= 0b11111101
+            self.registers.pc = 0x48 #RST 48H
+            self.interrupt_manager.if_register &= 0b11111101
         elif interrupt == Interrupt.INTERRUPT_TIMER:
-            Registers.pc = 0x50 #RST 50H
-            InterruptManager.if_register &= 0b11111011
+            self.registers.pc = 0x50 #RST 50H
+            self.interrupt_manager.if_register &= 0b11111011
         elif interrupt == Interrupt.INTERRUPT_SERIAL:
-            Registers.pc = 0x58 #RST 58H
-            InterruptManager.if_register &= 0b11110111
+            self.registers.pc = 0x58 #RST 58H
+            self.interrupt_manager.if_register &= 0b11110111
         elif interrupt == Interrupt.INTERRUPT_JOYPAD:
-            Registers.pc = 0x60 #RST 60H
-            InterruptManager.if_register &= 0b11101111
+            self.registers.pc = 0x60 #RST 60H
+            self.interrupt_manager.if_register &= 0b11101111
         self.ticks += 20
         return None
 
-    def fetch_instruction(self, prefix: bool = False) -> int:
-        instruction = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        if 0xcb == instruction and not prefix:
-            return 0xcb00 + self.fetch_instruction(True)
+    def fetch_instruction(self) -> int:
+        # CB prefixed instructions are returned as 0x100 + opcode, the index
+        # of their handler in the dispatch table
+        instruction = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        if 0xcb == instruction:
+            instruction = 0x100 | self.mmu.read_byte(self.registers.pc)
+            self.registers.pc += 1
         return instruction
 
     def perform_instruction(self, instruction : int):
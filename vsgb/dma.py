@@ -26,32 +26,40 @@ class DMA:
 
     def __init__(self, mmu: MMU):
         self.mmu = mmu
-        self.ticks = 0
         self.in_progress = False
         self.page = 0x0000
         self.counter = 0x00
         self.mmu.set_dma(self)
-        self.wait_set_delay = False
+        self.scheduler = None
+        self.event = None
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
 
     def request_dma_transfer(self, page: int):
         self.page = (page << 8)
         self.in_progress = True
         self.counter = 0x00
-        self.ticks = 0
-        self.wait_set_delay = True
+        self.scheduler.cancel(self.event)
+        # The CPU is stalled from the end of the current instruction
+        self.event = self.scheduler.schedule(self.scheduler.now, self.start)
+
+    def start(self):
+        self.event = self.scheduler.schedule_cpu(8, self.step)
 
     def step(self):
-        if self.wait_set_delay:
-            self.ticks = 8
-            self.wait_set_delay = False
+        source_address = self.page + self.counter
+        destination_address = 0xfe00 + self.counter
+        self.mmu.write_byte(destination_address, self.mmu.read_byte(source_address))
+        self.counter += 1
+        if 0xa0 == self.counter:
+            self.event = self.scheduler.schedule_cpu(20, self.finish)
         else:
-            source_address = self.page + self.counter
-            destination_address = 0xfe00 + self.counter
-            self.mmu.write_byte(destination_address, self.mmu.read_byte(source_address))
-            self.counter += 1
-            self.ticks = 20
-            if 0xa0 == self.counter:
-                self.in_progress = False
+            self.event = self.scheduler.schedule_cpu(20, self.step)
+
+    def finish(self):
+        self.in_progress = False
+        self.event = None
 
 """
 LCD VRAM DMA Transfers (CGB only)
@@ -91,7 +99,19 @@ class HDMA:
         self.mmu.set_hdma(self)
         self.ticks = 0
         self.in_progress = False
+        self.stalled = False
         self.type = HDMA.TYPE_GDMA
+        self.length = 0
+        self.msb_source_address = 0
+        self.lsb_source_address = 0
+        self.msb_destination_address = 0
+        self.lsb_destination_address = 0
+        self.counter = 0
+        self.scheduler = None
+        self.event = None
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
 
     def request_hdma_transfer(self, request: int):
         if self.in_progress:
@@ -117,6 +137,29 @@ class HDMA:
         self.mmu.write_byte(IO_Registers.HDMA5, request & 0b01111111, True) #DMA in progress
         logging.debug('DMA REQUEST (type:{} from:{:02x}{:02x} to:{:02x}{:02x} len:{:04x})'.format(self.type, self.msb_source_address, 
         self.lsb_source_address, self.msb_destination_address + 0x80, self.lsb_destination_address, self.length))
+        if self.type == HDMA.TYPE_GDMA and self.mmu.cgb_mode:
+            # General purpose DMA halts the CPU until everything is copied
+            self.stalled = True
+            self.scheduler.cancel(self.event)
+            self.event = self.scheduler.schedule(self.scheduler.now, self.step_gdma)
+
+    def step_gdma(self):
+        self.step()
+        if self.in_progress:
+            self.event = self.scheduler.schedule_in(self.ticks, self.step_gdma)
+        else:
+            self.event = self.scheduler.schedule_in(self.ticks, self.resume)
+
+    def hblank(self, ly: int):
+        # H-Blank DMA copies one block at the start of each H-Blank
+        if self.in_progress and self.type == HDMA.TYPE_HDMA and ly < 143 and self.mmu.cgb_mode:
+            self.step()
+            self.stalled = True
+            self.event = self.scheduler.schedule_in(self.ticks, self.resume)
+
+    def resume(self):
+        self.stalled = False
+        self.event = None
 
     
     def step(self):
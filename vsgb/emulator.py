@@ -7,72 +7,193 @@ from vsgb.cpu import CPU
 from vsgb.dma import DMA, HDMA
 from vsgb.io_registers import IO_Registers
 from vsgb.mmu import MMU
-from vsgb.ppu import PPU
-from vsgb.timer import Timer
-from vsgb.window import Window
+from vsgb.rewind import Rewind
 from vsgb.instructions import instructions
-from vsgb.registers import Registers
 from vsgb.save_state_manager import SaveStateManager
+from vsgb.scheduler import Scheduler
+from concurrent.futures import Future
 import threading
 
+# Default video and audio outputs: the OpenGL window and simpleaudio. They are
+# imported only when used so headless runs need neither of them.
+DEFAULT_OUTPUT = 'default'
 
 class Emulator:
 
-    def __init__(self, file : str, cgb_mode: bool):
+    def __init__(self, file : str, cgb_mode: bool, video = DEFAULT_OUTPUT, audio = DEFAULT_OUTPUT, mapped_ram: bool = False, rtc_wall_clock: bool = True):
         self.cgb_mode = cgb_mode
-        self.cartridge = Cartridge(file)
-        self.apu = APU(cgb_mode)
+        self.scheduler = Scheduler()
+        self.cartridge = Cartridge(file, mapped_ram, rtc_wall_clock)
+        if audio == DEFAULT_OUTPUT:
+            from vsgb.audio.sound_driver import SoundDriver
+            audio = SoundDriver()
+        self.apu = APU(cgb_mode, audio)
         self.apu.start()
         self.mmu = MMU(self.cartridge.rom(), self.apu, cgb_mode) 
         self.cpu = CPU(self.mmu)
-        PPU.cgb_mode = cgb_mode
+        self.registers = self.cpu.registers
+        self.interrupt_manager = self.mmu.interrupt_manager
+        self.timer = self.mmu.timer
+        self.serial = self.mmu.serial
+        self.input = self.mmu.input
+        self.ppu = self.mmu.ppu
         self.dma = DMA(self.mmu)
         self.hdma = HDMA(self.mmu)
-        self.window = Window()
-        self.window.start()
-        self.changing_state = False
-        self.serialize_ok = False
+        self.ppu.hdma = self.hdma
+        self.cpu.set_scheduler(self.scheduler)
+        self.timer.set_scheduler(self.scheduler)
+        self.ppu.set_scheduler(self.scheduler)
+        self.serial.set_scheduler(self.scheduler)
+        self.apu.set_scheduler(self.scheduler)
+        self.dma.set_scheduler(self.scheduler)
+        self.hdma.set_scheduler(self.scheduler)
+        self.mmu.rom.set_scheduler(self.scheduler)
+        # With video=None frames are only rendered to ppu.framebuffer
+        if video == DEFAULT_OUTPUT:
+            from vsgb.window import Window
+            video = Window(self)
+        self.window = video
+        if self.window is not None:
+            self.window.start()
+        # Control requests (save states, rewind, ...) from other threads are
+        # queued and run by the emulation thread between two batches of
+        # instructions, see request()
+        self.control = threading.Condition()
+        self.requests = []
+        self.paused = False
+        self.emulation_thread = None
+        self.stop_requested = False
         self.save_state_manager = SaveStateManager()
+        # Snapshots for rewind(), kept once enable_rewind() is called
+        self.rewind_buffer = None
 
     def run(self):
+        self.run_until(None)
+
+    def run_frames(self, frames: int) -> tuple:
+        # Returns at the VBlank that completes the last frame
+        target = self.ppu.frames + frames
+        return self.run_until(lambda: self.ppu.frames >= target)
+
+    def run_cycles(self, cycles: int) -> tuple:
+        # Returns after the instruction that reaches the cycle budget
+        event = self.scheduler.schedule_in(cycles, self.stop)
         try:
-            can_exec_hdma = False
-            last_ppu_mode = None
-            while True:
-                while self.changing_state:
-                    self.serialize_ok = True
-                if last_ppu_mode != PPU.mode:
-                    last_ppu_mode = PPU.mode
-                    can_exec_hdma = PPU.H_BLANK_STATE == last_ppu_mode and PPU.ly < 143
-                ticks = 0
-                if self.cgb_mode: 
-                    if self.hdma.in_progress:
-                        if ( self.hdma.type == HDMA.TYPE_GDMA ):
-                            self.hdma.step()
-                            ticks = self.hdma.ticks
-                        if  (self.hdma.type == HDMA.TYPE_HDMA ) :
-                                if ( can_exec_hdma ):
-                                    self.hdma.step()
-                                    ticks = self.hdma.ticks
-                                    can_exec_hdma = False
-                if self.dma.in_progress:
-                    self.dma.step()
-                    ticks += self.dma.ticks
-                if 0 == ticks:
-                    self.cpu.step()
-                    ticks = self.cpu.ticks
-                Timer.tick(ticks)
-                PPU.step(ticks)
-
-                for i in range(0,self.cpu.ticks,4):
-                    self.apu.step(4)
-
-                
+            return self.run_until(None)
+        finally:
+            self.scheduler.cancel(event)
+
+    def run_until(self, predicate) -> tuple:
+        # The predicate is checked after every batch of scheduler events (PPU
+        # mode changes, timer overflows, ...), not after every instruction.
+        # Returns the frames and cycles executed.
+        scheduler = self.scheduler
+        cpu = self.cpu
+        start_frames = self.ppu.frames
+        start = scheduler.now
+        with self.control:
+            self.emulation_thread = threading.current_thread()
+        try:
+            while not self.stop_requested:
+                if self.requests or self.paused:
+                    self.run_requests()
+                # The CPU runs until the next pending event, the PPU, timer,
+                # APU and DMA units are only touched when one of their events
+                # is due
+                if self.dma.in_progress or self.hdma.stalled:
+                    # CPU is stalled during OAM DMA and HDMA blocks
+                    scheduler.now = scheduler.deadline
+                else:
+                    cpu.execute((scheduler.deadline - scheduler.now) << scheduler.speed_shift)
+                scheduler.run_due_events()
+                if self.rewind_buffer is not None and self.ppu.frames >= self.rewind_buffer.next_frame:
+                    self.rewind_buffer.capture()
+                if predicate is not None and predicate():
+                    break
         except Exception as e:
             print('An error occurred:')
             print(self.get_last_instruction())
             raise e
+        finally:
+            with self.control:
+                self.emulation_thread = None
+                # A stop() only ends the run it was called for, one made
+                # before the run started still ends it right away
+                self.stop_requested = False
+                # Requests queued after the last check
+                self.run_pending()
+        return self.ppu.frames - start_frames, scheduler.now - start
+
+    def stop(self):
+        # Also wakes up a paused emulation thread, the next run starts
+        # unpaused
+        with self.control:
+            self.stop_requested = True
+            self.paused = False
+            self.control.notify_all()
+
+    def request(self, function, *args):
+        # Runs function(*args) on the emulation thread at the next
+        # instruction boundary and returns its result once done. It runs
+        # right away when called from the emulation thread or when the
+        # emulator isn't running.
+        with self.control:
+            if self.emulation_thread is None or self.emulation_thread is threading.current_thread():
+                return function(*args)
+            future = Future()
+            self.requests.append((future, function, args))
+            self.control.notify_all()
+        return future.result()
+
+    def run_requests(self):
+        # Emulation thread, parks it while paused
+        with self.control:
+            while True:
+                self.run_pending()
+                if not self.paused or self.stop_requested:
+                    return
+                self.control.wait()
+
+    def run_pending(self):
+        while self.requests:
+            future, function, args = self.requests.pop(0)
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def pause(self):
+        # Returns once the emulation thread is parked between two
+        # instructions, requests are still run while paused
+        self.request(self.set_paused, True)
+
+    def resume(self):
+        self.set_paused(False)
+
+    def set_paused(self, paused: bool):
+        with self.control:
+            self.paused = paused
+            self.control.notify_all()
+
+    def enable_rewind(self, interval: int = 1, keyframe_interval: int = 60, memory_limit: int = 32 * 1024 * 1024):
+        # A snapshot is kept every interval frames, see Rewind
+        self.rewind_buffer = Rewind(self, interval, keyframe_interval, memory_limit)
+
+    def rewind(self, frames: int) -> int:
+        # Goes back at least frames frames if there are snapshots that old,
+        # returns the frames rewound
+        if self.rewind_buffer is None:
+            return 0
+        return self.request(self.rewind_buffer.rewind, frames)
+
+    def close(self):
+        self.stop()
+        self.mmu.rom.close()
 
+    @property
+    def framebuffer(self) -> list:
+        self.ppu.flush()
+        return self.ppu.framebuffer
 
     def get_last_instruction(self):
         last_instruction = instructions[self.cpu.last_instruction][0]
@@ -85,20 +206,20 @@ class Emulator:
 
 
     def skip_boot_rom(self):
-        Registers.pc = 0x0100
+        self.registers.pc = 0x0100
         if self.mmu.rom.is_cgb() and self.cgb_mode:
-            Registers.set_af(0x1180)
-            Registers.set_bc(0x0000)
-            Registers.set_de(0xff56)
-            Registers.set_hl(0x000d)
-            Registers.sp = 0xfffe
+            self.registers.af = 0x1180
+            self.registers.bc = 0x0000
+            self.registers.de = 0xff56
+            self.registers.hl = 0x000d
+            self.registers.sp = 0xfffe
             self.mmu.write_byte(IO_Registers.KEY1, 0x81)            
         else:
-            Registers.set_af(0x01b0)
-            Registers.set_bc(0x0013)
-            Registers.set_de(0x00d8)
-            Registers.set_hl(0x014d)
-            Registers.sp = 0xfffe
+            self.registers.af = 0x01b0
+            self.registers.bc = 0x0013
+            self.registers.de = 0x00d8
+            self.registers.hl = 0x014d
+            self.registers.sp = 0xfffe
         self.mmu.write_byte(IO_Registers.NR_10, 0x80)
         self.mmu.write_byte(IO_Registers.NR_11, 0xbf)
         self.mmu.write_byte(IO_Registers.NR_12, 0xf3)
@@ -123,15 +244,7 @@ class Emulator:
         self.mmu.write_byte(0xFF50, 0x01)
 
     def save_state(self):
-        self.changing_state = True
-        while not self.serialize_ok:
-            self.serialize_ok = False
-        self.save_state_manager.create(self)
-        self.changing_state = False
+        self.request(self.save_state_manager.create, self)
 
     def load_state(self):
-        self.changing_state = True
-        while not self.serialize_ok:
-            self.serialize_ok = False
-        self.save_state_manager.restore(self)
-        self.changing_state = False
+        self.request(self.save_state_manager.restore, self)
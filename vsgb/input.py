@@ -20,50 +20,53 @@
 # and only the value from the last read actually used).
 
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
 from vsgb.io_registers import IO_Registers
 
-class Input(AddressSpace):
+class Input(AddressSpace, metaclass=InstanceProxy):
 
-    
-    BUTTON_A: bool = False
-    BUTTON_B: bool = False
-    BUTTON_START: bool = False
-    BUTTON_SELECT: bool = False
-    BUTTON_UP: bool = False
-    BUTTON_DOWN: bool = False
-    BUTTON_LEFT: bool = False
-    BUTTON_RIGHT: bool = False
-    P1: int = 0
+    __slots__ = (
+        'BUTTON_A', 'BUTTON_B', 'BUTTON_START', 'BUTTON_SELECT',
+        'BUTTON_UP', 'BUTTON_DOWN', 'BUTTON_LEFT', 'BUTTON_RIGHT', 'P1'
+    )
 
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    def __init__(self):
+        self.BUTTON_A = False
+        self.BUTTON_B = False
+        self.BUTTON_START = False
+        self.BUTTON_SELECT = False
+        self.BUTTON_UP = False
+        self.BUTTON_DOWN = False
+        self.BUTTON_LEFT = False
+        self.BUTTON_RIGHT = False
+        self.P1 = 0
+
+    def accept(self, address: int) -> bool:
         return address == IO_Registers.P1
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
         if address == IO_Registers.P1:
-            cls.P1 = value
+            self.P1 = value
 
-    @classmethod
-    def read(cls, address : int) -> int:
+    def read(self, address : int) -> int:
         _input = 0x0f
-        if 0 == cls.P1 & 0b00100000:
-            if cls.BUTTON_START:
+        if 0 == self.P1 & 0b00100000:
+            if self.BUTTON_START:
                 _input ^= 0b1000
-            if cls.BUTTON_SELECT:
+            if self.BUTTON_SELECT:
                 _input ^= 0b0100
-            if cls.BUTTON_B:
+            if self.BUTTON_B:
                 _input ^= 0b0010
-            if cls.BUTTON_A:
+            if self.BUTTON_A:
                 _input ^= 0b0001
-        elif 0 == cls.P1 & 0b00010000:
-            if cls.BUTTON_DOWN:
+        elif 0 == self.P1 & 0b00010000:
+            if self.BUTTON_DOWN:
                 _input ^= 0b1000
-            if cls.BUTTON_UP:
+            if self.BUTTON_UP:
                 _input ^= 0b0100
-            if cls.BUTTON_LEFT:
+            if self.BUTTON_LEFT:
                 _input ^= 0b0010
-            if cls.BUTTON_RIGHT:
+            if self.BUTTON_RIGHT:
                 _input ^= 0b0001
 
-        return ((0b00110000 & cls.P1) | _input)
+        return ((0b00110000 & self.P1) | _input)
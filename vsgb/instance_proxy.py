@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+class InstanceProxy(type):
+
+    # Machine state lives in instances so several emulators can run in one
+    # process. Class level access (Registers.pc, InterruptManager.request_interrupt,
+    # ...) is forwarded to the most recently created instance, which keeps code
+    # written against the old class attributes working.
+
+    def __call__(cls, *args, **kwargs):
+        instance = super().__call__(*args, **kwargs)
+        type.__setattr__(cls, '_instance', instance)
+        return instance
+
+    def __getattribute__(cls, name: str):
+        if name[0] != '_':
+            instance = type.__getattribute__(cls, '__dict__').get('_instance')
+            if instance is not None:
+                return getattr(instance, name)
+        return type.__getattribute__(cls, name)
+
+    def __setattr__(cls, name: str, value):
+        if name[0] != '_':
+            instance = type.__getattribute__(cls, '__dict__').get('_instance')
+            if instance is not None:
+                setattr(instance, name, value)
+                return
+        type.__setattr__(cls, name, value)
@@ -2,10 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from vsgb.alu_tables import ADD, SUB, INC, DEC, DECIMAL_ADJUST, RLC, RRC, RL, RR, SLA, SRA, SRL, SWAP
 from vsgb.byte_operations import signed_value, set_bit
-from vsgb.registers import Registers
-from vsgb.stack_manager import StackManager
-from vsgb.interrupt_manager import InterruptManager
+from vsgb.registers import Z_FLAG, N_FLAG, H_FLAG, C_FLAG
 
 class InstructionPerformer:
     
@@ -13,6 +12,8 @@ class InstructionPerformer:
     def __init__(self, cpu):
         self.cpu = cpu
         self.mmu = cpu.mmu
+        self.registers = cpu.registers
+        self.stack_manager = cpu.stack_manager
         self.instrs = (
             self.NOP, self.LD_BC_d16, self.LD_REF_BC_A, self.INC_BC, self.INC_B, self.DEC_B, self.LD_B_d8, self.RLCA, self.LD_REF_a16_SP, self.ADD_HL_BC, self.LD_A_REF_BC, self.DEC_BC, self.INC_C, self.DEC_C, self.LD_C_d8, self.RRCA, 
             self.STOP, self.LD_DE_d16, self.LD_REF_DE_A, self.INC_DE, self.INC_D, self.DEC_D, self.LD_D_d8, self.RLA, self.JR_r8, self.ADD_HL_DE, self.LD_A_REF_DE, self.DEC_DE, self.INC_E, self.DEC_E, self.LD_E_d8, self.RRA, 
@@ -26,10 +27,10 @@ class InstructionPerformer:
             self.SUB_B, self.SUB_C, self.SUB_D, self.SUB_E, self.SUB_H, self.SUB_L, self.SUB_REF_HL, self.SUB_A, self.SBC_B, self.SBC_C, self.SBC_D, self.SBC_E, self.SBC_H, self.SBC_L, self.SBC_REF_HL, self.SBC_A, 
             self.AND_B, self.AND_C, self.AND_D, self.AND_E, self.AND_H, self.AND_L, self.AND_REF_HL, self.AND_A, self.XOR_B, self.XOR_C, self.XOR_D, self.XOR_E, self.XOR_H, self.XOR_L, self.XOR_REF_HL, self.XOR_A, 
             self.OR_B, self.OR_C, self.OR_D, self.OR_E, self.OR_H, self.OR_L, self.OR_REF_HL, self.OR_A, self.CP_B, self.CP_C, self.CP_D, self.CP_E, self.CP_H, self.CP_L, self.CP_REF_HL, self.CP_A, 
-            self.RET_NZ, self.POP_BC, self.JP_NZ_a16, self.JP_a16, self.CALL_NZ_a16, self.PUSH_BC, self.ADD_d8, self.RST_00H, self.RET_Z, self.RET, self.JP_Z_a16, None, self.CALL_Z_a16, self.CALL_a16, self.ADC_d8, self.RST_08H, 
-            self.RET_NC, self.POP_DE, self.JP_NC_a16, None, self.CALL_NC_a16, self.PUSH_DE, self.SUB_d8, self.RST_10H, self.RET_C, self.RETI, self.JP_C_a16, None, self.CALL_C_a16, None, self.SBC_d8, self.RST_18H, 
-            self.LDH_REF_a8_A, self.POP_HL, self.LD_REF_C_A, None, None, self.PUSH_HL, self.AND_d8, self.RST_20H, self.ADD_SP_r8, self.JP_HL, self.LD_REF_a16_A, None, None, None, self.XOR_d8, self.RST_28H, 
-            self.LDH_A_REF_a8, self.POP_AF, self.LD_A_REF_C, self.DI, None, self.PUSH_AF, self.OR_d8, self.RST_30H, self.LD_HL_SP_r8, self.LD_SP_HL, self.LD_A_a16, self.EI, None, None, self.CP_d8, self.RST_38H, 
+            self.RET_NZ, self.POP_BC, self.JP_NZ_a16, self.JP_a16, self.CALL_NZ_a16, self.PUSH_BC, self.ADD_d8, self.RST_00H, self.RET_Z, self.RET, self.JP_Z_a16, self.PREFIX_CB, self.CALL_Z_a16, self.CALL_a16, self.ADC_d8, self.RST_08H, 
+            self.RET_NC, self.POP_DE, self.JP_NC_a16, self.ILLEGAL, self.CALL_NC_a16, self.PUSH_DE, self.SUB_d8, self.RST_10H, self.RET_C, self.RETI, self.JP_C_a16, self.ILLEGAL, self.CALL_C_a16, self.ILLEGAL, self.SBC_d8, self.RST_18H, 
+            self.LDH_REF_a8_A, self.POP_HL, self.LD_REF_C_A, self.ILLEGAL, self.ILLEGAL, self.PUSH_HL, self.AND_d8, self.RST_20H, self.ADD_SP_r8, self.JP_HL, self.LD_REF_a16_A, self.ILLEGAL, self.ILLEGAL, self.ILLEGAL, self.XOR_d8, self.RST_28H, 
+            self.LDH_A_REF_a8, self.POP_AF, self.LD_A_REF_C, self.DI, self.ILLEGAL, self.PUSH_AF, self.OR_d8, self.RST_30H, self.LD_HL_SP_r8, self.LD_SP_HL, self.LD_A_a16, self.EI, self.ILLEGAL, self.ILLEGAL, self.CP_d8, self.RST_38H, 
             self.RLC_B, self.RLC_C, self.RLC_D, self.RLC_E, self.RLC_H, self.RLC_L, self.RLC_REF_HL, self.RLC_A, self.RRC_B, self.RRC_C, self.RRC_D, self.RRC_E, self.RRC_H, self.RRC_L, self.RRC_REF_HL, self.RRC_A, 
             self.RL_B, self.RL_C, self.RL_D, self.RL_E, self.RL_H, self.RL_L, self.RL_REF_HL, self.RL_A, self.RR_B, self.RR_C, self.RR_D, self.RR_E, self.RR_H, self.RR_L, self.RR_REF_HL, self.RR_A, 
             self.SLA_B, self.SLA_C, self.SLA_D, self.SLA_E, self.SLA_H, self.SLA_L, self.SLA_REF_HL, self.SLA_A, self.SRA_B, self.SRA_C, self.SRA_D, self.SRA_E, self.SRA_H, self.SRA_L, self.SRA_REF_HL, self.SRA_A, 
@@ -49,1119 +50,1101 @@ class InstructionPerformer:
         )
 
     def perform_instruction(self, opcode: int) -> int:
-        if 0xcb00 <= opcode :
-            return self.instrs[opcode - 0xca00]()
+        # CB prefixed instructions are at 0x100 + opcode
         return self.instrs[opcode]()
+
+    def PREFIX_CB(self) -> int:
+        # Only reached when 0xcb was dispatched on its own, fetch_instruction
+        # already folds the prefix into the opcode
+        opcode = 0x100 | self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.cpu.last_instruction = opcode
+        return self.instrs[opcode]()
+
+    def ILLEGAL(self) -> int:
+        # The hardware locks up until it is reset, no more instructions and
+        # no interrupts
+        logging.warning('Illegal instruction {:02x} at {:04x}, cpu locked'.format(self.cpu.last_instruction, self.cpu.last_pc))
+        self.cpu.locked = True
+        return 4
     
     def NOP(self) -> int:
         return 4
     
     def LD_BC_d16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        Registers.set_bc(word) 
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.registers.set_bc(word)
         return 12
     
     def LD_REF_BC_A(self) -> int:
-        self.mmu.write_byte(Registers.get_bc(), Registers.a)
+        self.mmu.write_byte(self.registers.get_bc(), self.registers.a)
         return 8
 
     def INC_BC(self) -> int:
-        Registers.set_bc((Registers.get_bc() + 1) & 0xffff )
+        self.registers.set_bc((self.registers.get_bc() + 1) & 0xffff)
         return 8
 
     def INC_B(self) -> int:
-        Registers.b = self.inc_byte(Registers.b)
+        self.registers.b = self.inc_byte(self.registers.b)
         return 4
 
     def DEC_B(self) -> int:
-        Registers.b = self.dec_byte(Registers.b)
+        self.registers.b = self.dec_byte(self.registers.b)
         return 4
     
     def LD_B_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.b = byte 
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.b = byte 
         return 8
 
     def RLCA(self) -> int:
-        Registers.a = self.rlc(Registers.a)
-        Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
+        # Same as RLC A but Z is always reset
+        packed = RLC[self.registers.a]
+        self.registers.a = packed >> 8
+        self.registers.f = packed & C_FLAG
         return 4
-    
+
     def LD_REF_a16_SP(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        self.mmu.write_word(word, Registers.sp)
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.mmu.write_word(word, self.registers.sp)
         return 20
 
     def ADD_HL_BC(self) -> int:
-        Registers.set_hl(self.add_word(Registers.get_hl(), Registers.get_bc()))
+        self.registers.set_hl(self.add_word(self.registers.get_hl(), self.registers.get_bc()))
         return 8
     
     def LD_A_REF_BC(self) -> int:
-        Registers.a = self.mmu.read_byte(Registers.get_bc())
+        self.registers.a = self.mmu.read_byte(self.registers.get_bc())
         return 8
 
     def DEC_BC(self) -> int:
-        Registers.set_bc((Registers.get_bc() - 1) & 0xffff )
+        self.registers.set_bc((self.registers.get_bc() - 1) & 0xffff)
         return 8
 
     def INC_C(self) -> int:
-        Registers.c = self.inc_byte(Registers.c)
+        self.registers.c = self.inc_byte(self.registers.c)
         return 4
 
     def DEC_C(self) -> int:
-        Registers.c = self.dec_byte(Registers.c)
+        self.registers.c = self.dec_byte(self.registers.c)
         return 4
     
     def LD_C_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.c = byte 
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.c = byte 
         return 8
 
     def RRCA(self) -> int:
-        Registers.a = self.rrc(Registers.a)
-        Registers.reset_h_flag()
-        Registers.reset_n_flag()
-        Registers.reset_z_flag()
-        return 4  
+        packed = RRC[self.registers.a]
+        self.registers.a = packed >> 8
+        self.registers.f = packed & C_FLAG
+        return 4
 
     def STOP(self) -> int:
+        # CGB speed switch when prepared through KEY1
+        if self.mmu.timer.KEY1 & 0b00000001:
+            self.mmu.timer.switch_speed()
+            return 4
         self.cpu.stop = True
         return 4       
     
     def LD_DE_d16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        Registers.set_de(word) 
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.registers.set_de(word)
         return 12
     
     def LD_REF_DE_A(self) -> int:
-        self.mmu.write_byte(Registers.get_de(), Registers.a)
+        self.mmu.write_byte(self.registers.get_de(), self.registers.a)
         return 8
 
     def INC_DE(self) -> int:
-        Registers.set_de((Registers.get_de() + 1) & 0xffff )
+        self.registers.set_de((self.registers.get_de() + 1) & 0xffff)
         return 8
 
     def INC_D(self) -> int:
-        Registers.d = self.inc_byte(Registers.d)
+        self.registers.d = self.inc_byte(self.registers.d)
         return 4
 
     def DEC_D(self) -> int:
-        Registers.d = self.dec_byte(Registers.d)
+        self.registers.d = self.dec_byte(self.registers.d)
         return 4
     
     def LD_D_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.d = byte 
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.d = byte 
         return 8
 
     def RLA(self) -> int:
-        Registers.a = self.rl(Registers.a)
-        Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
+        packed = RL[((self.registers.f & C_FLAG) << 4) | self.registers.a]
+        self.registers.a = packed >> 8
+        self.registers.f = packed & C_FLAG
         return 4
 
     def JR_r8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.pc += signed_value(byte)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.pc = (self.registers.pc + signed_value(byte)) & 0xffff
         return 12
 
     def ADD_HL_DE(self) -> int:
-        Registers.set_hl(self.add_word(Registers.get_hl(), Registers.get_de()))
+        self.registers.set_hl(self.add_word(self.registers.get_hl(), self.registers.get_de()))
         return 8
     
     def LD_A_REF_DE(self) -> int:
-        Registers.a = self.mmu.read_byte(Registers.get_de())
+        self.registers.a = self.mmu.read_byte(self.registers.get_de())
         return 8
 
     def DEC_DE(self) -> int:
-        Registers.set_de((Registers.get_de() - 1) & 0xffff )
+        self.registers.set_de((self.registers.get_de() - 1) & 0xffff)
         return 8
 
     def INC_E(self) -> int:
-        Registers.e = self.inc_byte(Registers.e)
+        self.registers.e = self.inc_byte(self.registers.e)
         return 4
 
     def DEC_E(self) -> int:
-        Registers.e = self.dec_byte(Registers.e)
+        self.registers.e = self.dec_byte(self.registers.e)
         return 4
     
     def LD_E_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.e = byte 
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.e = byte 
         return 8
 
     def RRA(self) -> int:
-        Registers.a = self.rr(Registers.a)
-        Registers.reset_h_flag()
-        Registers.reset_n_flag()
-        Registers.reset_z_flag()
-        return 4  
+        packed = RR[((self.registers.f & C_FLAG) << 4) | self.registers.a]
+        self.registers.a = packed >> 8
+        self.registers.f = packed & C_FLAG
+        return 4
 
     def JR_NZ_r8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        if not Registers.is_z_flag():
-            Registers.pc += signed_value(byte)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        if not self.registers.f & Z_FLAG:
+            self.registers.pc = (self.registers.pc + signed_value(byte)) & 0xffff
             return 12
         return 8
     
     def LD_HL_d16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        Registers.set_hl(word) 
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.registers.set_hl(word)
         return 12
     
     def LDI_HL_A(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), Registers.a)
-        Registers.set_hl(Registers.get_hl()+1)
+        self.mmu.write_byte(self.registers.get_hl(), self.registers.a)
+        self.registers.set_hl(self.registers.get_hl()+1)
         return 8
 
     def INC_HL(self) -> int:
-        Registers.set_hl((Registers.get_hl() + 1) & 0xffff )
+        self.registers.set_hl((self.registers.get_hl() + 1) & 0xffff)
         return 8
 
     def INC_H(self) -> int:
-        Registers.h = self.inc_byte(Registers.h)
+        self.registers.h = self.inc_byte(self.registers.h)
         return 4
 
     def DEC_H(self) -> int:
-        Registers.h = self.dec_byte(Registers.h)
+        self.registers.h = self.dec_byte(self.registers.h)
         return 4
     
     def LD_H_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.h = byte 
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.h = byte 
         return 8
 
     def DAA(self) -> int:
-        temp = Registers.a 
-        if Registers.is_n_flag():
-            if Registers.is_h_flag():
-                temp = (temp - 0x06) & 0xff
-            if Registers.is_c_flag():
-                temp = (temp - 0x60) & 0xff
-        else:
-            if Registers.is_h_flag() or (temp & 0x0f) > 0x09:
-                temp += 0x06
-            if Registers.is_c_flag() or temp > 0x9f:
-                temp += 0x60
-        Registers.reset_h_flag()
-        if temp > 0xff:
-            Registers.set_c_flag()
-        temp &= 0xff
-        if temp == 0:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        Registers.a = temp
+        packed = DECIMAL_ADJUST[((self.registers.f & 0xf0) << 4) | self.registers.a]
+        self.registers.a = packed >> 8
+        self.registers.f = packed & 0xff
         return 4
 
     def JR_Z_r8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        if Registers.is_z_flag():
-            Registers.pc += signed_value(byte)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        if self.registers.f & Z_FLAG:
+            self.registers.pc = (self.registers.pc + signed_value(byte)) & 0xffff
             return 12
         return 8
 
     def ADD_HL_HL(self) -> int:
-        Registers.set_hl(self.add_word(Registers.get_hl(), Registers.get_hl()))
+        self.registers.set_hl(self.add_word(self.registers.get_hl(), self.registers.get_hl()))
         return 8
     
     def LDI_A_HL(self) -> int:
-        Registers.a = self.mmu.read_byte(Registers.get_hl())
-        Registers.set_hl(Registers.get_hl()+1)
+        self.registers.a = self.mmu.read_byte(self.registers.get_hl())
+        self.registers.set_hl(self.registers.get_hl()+1)
         return 8
 
     def DEC_HL(self) -> int:
-        Registers.set_hl((Registers.get_hl() - 1) & 0xffff )
+        self.registers.set_hl((self.registers.get_hl() - 1) & 0xffff)
         return 8
 
     def INC_L(self) -> int:
-        Registers.l = self.inc_byte(Registers.l)
+        self.registers.l = self.inc_byte(self.registers.l)
         return 4
 
     def DEC_L(self) -> int:
-        Registers.l = self.dec_byte(Registers.l)
+        self.registers.l = self.dec_byte(self.registers.l)
         return 4
     
     def LD_L_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.l = byte 
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.l = byte 
         return 8
 
     def CPL(self) -> int:
-        Registers.a = Registers.a ^ 0xff
-        Registers.set_n_flag()
-        Registers.set_h_flag()
+        self.registers.a = self.registers.a ^ 0xff
+        self.registers.f |= N_FLAG | H_FLAG
         return 4
 
     def JR_NC_r8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        if not Registers.is_c_flag():
-            Registers.pc += signed_value(byte)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        if not self.registers.f & C_FLAG:
+            self.registers.pc = (self.registers.pc + signed_value(byte)) & 0xffff
             return 12
         return 8
     
     def LD_SP_d16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        Registers.sp = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.registers.sp = word
         return 12
     
     def LDD_HL_A(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), Registers.a)
-        Registers.set_hl(Registers.get_hl()-1)
+        self.mmu.write_byte(self.registers.get_hl(), self.registers.a)
+        self.registers.set_hl(self.registers.get_hl()-1)
         return 8
 
     def INC_SP(self) -> int:
-        Registers.sp = ((Registers.sp + 1) & 0xffff )
+        self.registers.sp = ((self.registers.sp + 1) & 0xffff )
         return 8
 
     def INC_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),self.inc_byte(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(),self.inc_byte(self.mmu.read_byte(self.registers.get_hl())))
         return 12
 
     def DEC_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.dec_byte(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.dec_byte(self.mmu.read_byte(self.registers.get_hl())))
         return 12
     
     def LD_REF_HL_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        self.mmu.write_byte(Registers.get_hl(),byte)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.mmu.write_byte(self.registers.get_hl(),byte)
         return 12
 
     def SCF(self) -> int:
-        Registers.set_c_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
+        self.registers.f = (self.registers.f & Z_FLAG) | C_FLAG
         return 4
 
     def JR_C_r8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        if Registers.is_c_flag():
-            Registers.pc += signed_value(byte)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        if self.registers.f & C_FLAG:
+            self.registers.pc = (self.registers.pc + signed_value(byte)) & 0xffff
             return 12
         return 8
 
     def ADD_HL_SP(self) -> int:
-        Registers.set_hl(self.add_word(Registers.get_hl(), Registers.sp))
+        self.registers.set_hl(self.add_word(self.registers.get_hl(), self.registers.sp))
         return 8
     
     def LDD_A_HL(self) -> int:
-        Registers.a = self.mmu.read_byte(Registers.get_hl())
-        Registers.set_hl(Registers.get_hl()-1)
+        self.registers.a = self.mmu.read_byte(self.registers.get_hl())
+        self.registers.set_hl(self.registers.get_hl()-1)
         return 8
 
     def DEC_SP(self) -> int:
-        Registers.sp = ((Registers.sp - 1) & 0xffff )
+        self.registers.sp = ((self.registers.sp - 1) & 0xffff )
         return 8
 
     def INC_A(self) -> int:
-        Registers.a = self.inc_byte(Registers.a)
+        self.registers.a = self.inc_byte(self.registers.a)
         return 4
 
     def DEC_A(self) -> int:
-        Registers.a = self.dec_byte(Registers.a)
+        self.registers.a = self.dec_byte(self.registers.a)
         return 4
     
     def LD_A_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.a = byte
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.a = byte
         return 8
 
     def CCF(self) -> int:
-        if Registers.is_c_flag():
-            Registers.reset_c_flag()
-        else:
-            Registers.set_c_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
+        self.registers.f = (self.registers.f & (Z_FLAG | C_FLAG)) ^ C_FLAG
         return 4
-    
+
     def LD_B_B(self) -> int:
         return 4
     
     def LD_B_C(self) -> int:
-        Registers.b = Registers.c
+        self.registers.b = self.registers.c
         return 4
     
     def LD_B_D(self) -> int:
-        Registers.b = Registers.d
+        self.registers.b = self.registers.d
         return 4
     
     def LD_B_E(self) -> int:
-        Registers.b = Registers.e
+        self.registers.b = self.registers.e
         return 4
     
     def LD_B_H(self) -> int:
-        Registers.b = Registers.h
+        self.registers.b = self.registers.h
         return 4
     
     def LD_B_L(self) -> int:
-        Registers.b = Registers.l
+        self.registers.b = self.registers.l
         return 4
     
     def LD_B_REF_HL(self) -> int:
-        Registers.b = self.mmu.read_byte(Registers.get_hl())
+        self.registers.b = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_B_A(self) -> int:
-        Registers.b = Registers.a
+        self.registers.b = self.registers.a
         return 4
     
     def LD_C_B(self) -> int:
-        Registers.c = Registers.b
+        self.registers.c = self.registers.b
         return 4
     
     def LD_C_C(self) -> int:
         return 4
     
     def LD_C_D(self) -> int:
-        Registers.c = Registers.d
+        self.registers.c = self.registers.d
         return 4
     
     def LD_C_E(self) -> int:
-        Registers.c = Registers.e
+        self.registers.c = self.registers.e
         return 4
     
     def LD_C_H(self) -> int:
-        Registers.c = Registers.h
+        self.registers.c = self.registers.h
         return 4
     
     def LD_C_L(self) -> int:
-        Registers.c = Registers.l
+        self.registers.c = self.registers.l
         return 4
     
     def LD_C_REF_HL(self) -> int:
-        Registers.c = self.mmu.read_byte(Registers.get_hl())
+        self.registers.c = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_C_A(self) -> int:
-        Registers.c = Registers.a
+        self.registers.c = self.registers.a
         return 4
     
     def LD_D_B(self) -> int:
-        Registers.d = Registers.b
+        self.registers.d = self.registers.b
         return 4
     
     def LD_D_C(self) -> int:
-        Registers.d = Registers.c
+        self.registers.d = self.registers.c
         return 4
     
     def LD_D_D(self) -> int:
         return 4
     
     def LD_D_E(self) -> int:
-        Registers.d = Registers.e
+        self.registers.d = self.registers.e
         return 4
     
     def LD_D_H(self) -> int:
-        Registers.d = Registers.h
+        self.registers.d = self.registers.h
         return 4
     
     def LD_D_L(self) -> int:
-        Registers.d = Registers.l
+        self.registers.d = self.registers.l
         return 4
     
     def LD_D_REF_HL(self) -> int:
-        Registers.d = self.mmu.read_byte(Registers.get_hl())
+        self.registers.d = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_D_A(self) -> int:
-        Registers.d = Registers.a
+        self.registers.d = self.registers.a
         return 4
     
     def LD_E_B(self) -> int:
-        Registers.e = Registers.b
+        self.registers.e = self.registers.b
         return 4
     
     def LD_E_C(self) -> int:
-        Registers.e = Registers.c
+        self.registers.e = self.registers.c
         return 4
     
     def LD_E_D(self) -> int:
-        Registers.e = Registers.d
+        self.registers.e = self.registers.d
         return 4
     
     def LD_E_E(self) -> int:
         return 4
     
     def LD_E_H(self) -> int:
-        Registers.e = Registers.h
+        self.registers.e = self.registers.h
         return 4
     
     def LD_E_L(self) -> int:
-        Registers.e = Registers.l
+        self.registers.e = self.registers.l
         return 4
     
     def LD_E_REF_HL(self) -> int:
-        Registers.e = self.mmu.read_byte(Registers.get_hl())
+        self.registers.e = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_E_A(self) -> int:
-        Registers.e = Registers.a
+        self.registers.e = self.registers.a
         return 4
     
     def LD_H_B(self) -> int:
-        Registers.h = Registers.b
+        self.registers.h = self.registers.b
         return 4
     
     def LD_H_C(self) -> int:
-        Registers.h = Registers.c
+        self.registers.h = self.registers.c
         return 4
     
     def LD_H_D(self) -> int:
-        Registers.h = Registers.d
+        self.registers.h = self.registers.d
         return 4
     
     def LD_H_E(self) -> int:
-        Registers.h = Registers.e
+        self.registers.h = self.registers.e
         return 4
     
     def LD_H_H(self) -> int:
         return 4
     
     def LD_H_L(self) -> int:
-        Registers.h = Registers.l
+        self.registers.h = self.registers.l
         return 4
     
     def LD_H_REF_HL(self) -> int:
-        Registers.h = self.mmu.read_byte(Registers.get_hl())
+        self.registers.h = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_H_A(self) -> int:
-        Registers.h = Registers.a
+        self.registers.h = self.registers.a
         return 4
     
     def LD_L_B(self) -> int:
-        Registers.l = Registers.b
+        self.registers.l = self.registers.b
         return 4
     
     def LD_L_C(self) -> int:
-        Registers.l = Registers.c
+        self.registers.l = self.registers.c
         return 4
     
     def LD_L_D(self) -> int:
-        Registers.l = Registers.d
+        self.registers.l = self.registers.d
         return 4
     
     def LD_L_E(self) -> int:
-        Registers.l = Registers.e
+        self.registers.l = self.registers.e
         return 4
     
     def LD_L_H(self) -> int:
-        Registers.l = Registers.h
+        self.registers.l = self.registers.h
         return 4
     
     def LD_L_L(self) -> int:
         return 4
     
     def LD_L_REF_HL(self) -> int:
-        Registers.l = self.mmu.read_byte(Registers.get_hl())
+        self.registers.l = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_L_A(self) -> int:
-        Registers.l = Registers.a
+        self.registers.l = self.registers.a
         return 4
     
     def LD_REF_HL_B(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),Registers.b)
+        self.mmu.write_byte(self.registers.get_hl(),self.registers.b)
         return 8
     
     def LD_REF_HL_C(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),Registers.c)
+        self.mmu.write_byte(self.registers.get_hl(),self.registers.c)
         return 8
     
     def LD_REF_HL_D(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),Registers.d)
+        self.mmu.write_byte(self.registers.get_hl(),self.registers.d)
         return 8
     
     def LD_REF_HL_E(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),Registers.e)
+        self.mmu.write_byte(self.registers.get_hl(),self.registers.e)
         return 8
     
     def LD_REF_HL_H(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),Registers.h)
+        self.mmu.write_byte(self.registers.get_hl(),self.registers.h)
         return 8
     
     def LD_REF_HL_L(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(),Registers.l)
+        self.mmu.write_byte(self.registers.get_hl(),self.registers.l)
         return 8
 
     def HALT(self) -> int:
         self.cpu.halted = True
-        self.cpu.pending_interrupts_before_halt = InterruptManager.if_register
+        self.cpu.pending_interrupts_before_halt = self.cpu.interrupt_manager.if_register
         return 4
     
     def LD_REF_HL_A(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), Registers.a)
+        self.mmu.write_byte(self.registers.get_hl(), self.registers.a)
         return 8
     
     def LD_A_B(self) -> int:
-        Registers.a = Registers.b
+        self.registers.a = self.registers.b
         return 4
     
     def LD_A_C(self) -> int:
-        Registers.a = Registers.c
+        self.registers.a = self.registers.c
         return 4
     
     def LD_A_D(self) -> int:
-        Registers.a = Registers.d
+        self.registers.a = self.registers.d
         return 4
     
     def LD_A_E(self) -> int:
-        Registers.a = Registers.e
+        self.registers.a = self.registers.e
         return 4
     
     def LD_A_H(self) -> int:
-        Registers.a = Registers.h
+        self.registers.a = self.registers.h
         return 4
     
     def LD_A_L(self) -> int:
-        Registers.a = Registers.l
+        self.registers.a = self.registers.l
         return 4
     
     def LD_A_REF_HL(self) -> int:
-        Registers.a = self.mmu.read_byte(Registers.get_hl())
+        self.registers.a = self.mmu.read_byte(self.registers.get_hl())
         return 8
     
     def LD_A_A(self) -> int:
         return 4
     
     def ADD_B(self) -> int:
-        self.add_byte(Registers.b)
+        self.add_byte(self.registers.b)
         return 4
     
     def ADD_C(self) -> int:
-        self.add_byte(Registers.c)
+        self.add_byte(self.registers.c)
         return 4
     
     def ADD_D(self) -> int:
-        self.add_byte(Registers.d)
+        self.add_byte(self.registers.d)
         return 4
     
     def ADD_E(self) -> int:
-        self.add_byte(Registers.e)
+        self.add_byte(self.registers.e)
         return 4
     
     def ADD_H(self) -> int:
-        self.add_byte(Registers.h)
+        self.add_byte(self.registers.h)
         return 4
     
     def ADD_L(self) -> int:
-        self.add_byte(Registers.l)
+        self.add_byte(self.registers.l)
         return 4
     
     def ADD_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self.add_byte(byte)
         return 8
     
     def ADD_A(self) -> int:
-        self.add_byte(Registers.a)
+        self.add_byte(self.registers.a)
         return 4
     
     def ADC_B(self) -> int:
-        self.adc(Registers.b)
+        self.adc(self.registers.b)
         return 4
     
     def ADC_C(self) -> int:
-        self.adc(Registers.c)
+        self.adc(self.registers.c)
         return 4
     
     def ADC_D(self) -> int:
-        self.adc(Registers.d)
+        self.adc(self.registers.d)
         return 4
     
     def ADC_E(self) -> int:
-        self.adc(Registers.e)
+        self.adc(self.registers.e)
         return 4
     
     def ADC_H(self) -> int:
-        self.adc(Registers.h)
+        self.adc(self.registers.h)
         return 4
     
     def ADC_L(self) -> int:
-        self.adc(Registers.l)
+        self.adc(self.registers.l)
         return 4
     
     def ADC_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self.adc(byte)
         return 8
     
     def ADC_A(self) -> int:
-        self.adc(Registers.a)
+        self.adc(self.registers.a)
         return 4
 
     def SUB_B(self) -> int:
-        self.sub(Registers.b)
+        self.sub(self.registers.b)
         return 4
 
     def SUB_C(self) -> int:
-        self.sub(Registers.c)
+        self.sub(self.registers.c)
         return 4
 
     def SUB_D(self) -> int:
-        self.sub(Registers.d)
+        self.sub(self.registers.d)
         return 4
 
     def SUB_E(self) -> int:
-        self.sub(Registers.e)
+        self.sub(self.registers.e)
         return 4
 
     def SUB_H(self) -> int:
-        self.sub(Registers.h)
+        self.sub(self.registers.h)
         return 4
 
     def SUB_L(self) -> int:
-        self.sub(Registers.l)
+        self.sub(self.registers.l)
         return 4
 
     def SUB_REF_HL(self) -> int:
-        self.sub(self.mmu.read_byte(Registers.get_hl()))
+        self.sub(self.mmu.read_byte(self.registers.get_hl()))
         return 8
 
     def SUB_A(self) -> int:
-        self.sub(Registers.a)
+        self.sub(self.registers.a)
         return 4
 
     def SBC_B(self) -> int:
-        self.sbc(Registers.b)
+        self.sbc(self.registers.b)
         return 4
 
     def SBC_C(self) -> int:
-        self.sbc(Registers.c)
+        self.sbc(self.registers.c)
         return 4
 
     def SBC_D(self) -> int:
-        self.sbc(Registers.d)
+        self.sbc(self.registers.d)
         return 4
 
     def SBC_E(self) -> int:
-        self.sbc(Registers.e)
+        self.sbc(self.registers.e)
         return 4
 
     def SBC_H(self) -> int:
-        self.sbc(Registers.h)
+        self.sbc(self.registers.h)
         return 4
 
     def SBC_L(self) -> int:
-        self.sbc(Registers.l)
+        self.sbc(self.registers.l)
         return 4
 
     def SBC_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self.sbc(byte)
         return 8
 
     def SBC_A(self) -> int:
-        self.sbc(Registers.a)
+        self.sbc(self.registers.a)
         return 4
 
     def AND_B(self) -> int:
-        self._and(Registers.b)
+        self._and(self.registers.b)
         return 4
 
     def AND_C(self) -> int:
-        self._and(Registers.c)
+        self._and(self.registers.c)
         return 4
 
     def AND_D(self) -> int:
-        self._and(Registers.d)
+        self._and(self.registers.d)
         return 4
 
     def AND_E(self) -> int:
-        self._and(Registers.e)
+        self._and(self.registers.e)
         return 4
 
     def AND_H(self) -> int:
-        self._and(Registers.h)
+        self._and(self.registers.h)
         return 4
 
     def AND_L(self) -> int:
-        self._and(Registers.l)
+        self._and(self.registers.l)
         return 4
 
     def AND_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self._and(byte)
         return 8
 
     def AND_A(self) -> int:
-        self._and(Registers.a)
+        self._and(self.registers.a)
         return 4
 
     def XOR_B(self) -> int:
-        self.xor(Registers.b)
+        self.xor(self.registers.b)
         return 4
 
     def XOR_C(self) -> int:
-        self.xor(Registers.c)
+        self.xor(self.registers.c)
         return 4
 
     def XOR_D(self) -> int:
-        self.xor(Registers.d)
+        self.xor(self.registers.d)
         return 4
 
     def XOR_E(self) -> int:
-        self.xor(Registers.e)
+        self.xor(self.registers.e)
         return 4
 
     def XOR_H(self) -> int:
-        self.xor(Registers.h)
+        self.xor(self.registers.h)
         return 4
 
     def XOR_L(self) -> int:
-        self.xor(Registers.l)
+        self.xor(self.registers.l)
         return 4
 
     def XOR_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self.xor(byte)
         return 8
 
     def XOR_A(self) -> int:
-        self.xor(Registers.a)
+        self.xor(self.registers.a)
         return 4
 
     def OR_B(self) -> int:
-        self._or(Registers.b)
+        self._or(self.registers.b)
         return 4
 
     def OR_C(self) -> int:
-        self._or(Registers.c)
+        self._or(self.registers.c)
         return 4
 
     def OR_D(self) -> int:
-        self._or(Registers.d)
+        self._or(self.registers.d)
         return 4
 
     def OR_E(self) -> int:
-        self._or(Registers.e)
+        self._or(self.registers.e)
         return 4
 
     def OR_H(self) -> int:
-        self._or(Registers.h)
+        self._or(self.registers.h)
         return 4
 
     def OR_L(self) -> int:
-        self._or(Registers.l)
+        self._or(self.registers.l)
         return 4
 
     def OR_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self._or(byte)
         return 8
 
     def OR_A(self) -> int:
-        self._or(Registers.a)
+        self._or(self.registers.a)
         return 4
 
     def CP_B(self) -> int:
-        self.cp(Registers.b)
+        self.cp(self.registers.b)
         return 4
 
     def CP_C(self) -> int:
-        self.cp(Registers.c)
+        self.cp(self.registers.c)
         return 4
 
     def CP_D(self) -> int:
-        self.cp(Registers.d)
+        self.cp(self.registers.d)
         return 4
 
     def CP_E(self) -> int:
-        self.cp(Registers.e)
+        self.cp(self.registers.e)
         return 4
 
     def CP_H(self) -> int:
-        self.cp(Registers.h)
+        self.cp(self.registers.h)
         return 4
 
     def CP_L(self) -> int:
-        self.cp(Registers.l)
+        self.cp(self.registers.l)
         return 4
 
     def CP_REF_HL(self) -> int:
-        byte = self.mmu.read_byte(Registers.get_hl())
+        byte = self.mmu.read_byte(self.registers.get_hl())
         self.cp(byte)
         return 8
 
     def CP_A(self) -> int:
-        self.cp(Registers.a)
+        self.cp(self.registers.a)
         return 4
 
     def RET_NZ(self) -> int:
-        if not Registers.is_z_flag():
-            Registers.pc = StackManager.pop_word()
+        if not self.registers.f & Z_FLAG:
+            self.registers.pc = self.stack_manager.pop_word()
             return 20
         return 8
     
     def POP_BC(self) -> int:
-        Registers.set_bc(StackManager.pop_word())
+        self.registers.set_bc(self.stack_manager.pop_word())
         return 12
 
     def JP_NZ_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if not Registers.is_z_flag():
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if not self.registers.f & Z_FLAG:
+            self.registers.pc = word
             return 16
         return 12
 
     def JP_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc = word
         return 16
 
     def CALL_NZ_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if not Registers.is_z_flag():
-            StackManager.push_word(Registers.pc)
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if not self.registers.f & Z_FLAG:
+            self.stack_manager.push_word(self.registers.pc)
+            self.registers.pc = word
             return 24
         return 12
     
     def PUSH_BC(self) -> int:
-        StackManager.push_word(Registers.get_bc())
+        self.stack_manager.push_word(self.registers.get_bc())
         return 16
     
     def ADD_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self.add_byte(byte)
         return 8
 
     def RST_00H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x00
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x00
         return 16
 
     def RET_Z(self) -> int:
-        if Registers.is_z_flag():
-            Registers.pc = StackManager.pop_word()
+        if self.registers.f & Z_FLAG:
+            self.registers.pc = self.stack_manager.pop_word()
             return 20
         return 8
 
     def RET(self) -> int:
-        Registers.pc = StackManager.pop_word()
+        self.registers.pc = self.stack_manager.pop_word()
         return 16
 
     def JP_Z_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if Registers.is_z_flag():
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if self.registers.f & Z_FLAG:
+            self.registers.pc = word
             return 16
         return 12
 
     def CALL_Z_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if Registers.is_z_flag():
-            StackManager.push_word(Registers.pc)
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if self.registers.f & Z_FLAG:
+            self.stack_manager.push_word(self.registers.pc)
+            self.registers.pc = word
             return 24
         return 12
 
     def CALL_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        StackManager.push_word(Registers.pc)
-        Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = word
         return 24
     
     def ADC_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self.adc(byte)
         return 8
 
     def RST_08H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x08
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x08
         return 16
 
     def RET_NC(self) -> int:
-        if not Registers.is_c_flag():
-            Registers.pc = StackManager.pop_word()
+        if not self.registers.f & C_FLAG:
+            self.registers.pc = self.stack_manager.pop_word()
             return 20
         return 8
     
     def POP_DE(self) -> int:
-        Registers.set_de(StackManager.pop_word())
+        self.registers.set_de(self.stack_manager.pop_word())
         return 12
 
     def JP_NC_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if not Registers.is_c_flag():
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if not self.registers.f & C_FLAG:
+            self.registers.pc = word
             return 16
         return 12
 
     def CALL_NC_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if not Registers.is_c_flag():
-            StackManager.push_word(Registers.pc)
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if not self.registers.f & C_FLAG:
+            self.stack_manager.push_word(self.registers.pc)
+            self.registers.pc = word
             return 24
         return 12
     
     def PUSH_DE(self) -> int:
-        StackManager.push_word(Registers.get_de())
+        self.stack_manager.push_word(self.registers.get_de())
         return 16
 
     def SUB_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self.sub(byte)
         return 8
 
     def RST_10H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x10
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x10
         return 16
 
     def RET_C(self) -> int:
-        if Registers.is_c_flag():
-            Registers.pc = StackManager.pop_word()
+        if self.registers.f & C_FLAG:
+            self.registers.pc = self.stack_manager.pop_word()
             return 20
         return 8
 
     def RETI(self) -> int:
-        Registers.pc = StackManager.pop_word()
+        self.registers.pc = self.stack_manager.pop_word()
         self.cpu.ime = True
         return 16
 
     def JP_C_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if Registers.is_c_flag():
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if self.registers.f & C_FLAG:
+            self.registers.pc = word
             return 16
         return 12
 
     def CALL_C_a16(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        if Registers.is_c_flag():
-            StackManager.push_word(Registers.pc)
-            Registers.pc = word
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        if self.registers.f & C_FLAG:
+            self.stack_manager.push_word(self.registers.pc)
+            self.registers.pc = word
             return 24
         return 12
 
     def SBC_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self.sbc(byte)
         return 8
 
     def RST_18H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x18
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x18
         return 16
 
     def LDH_REF_a8_A(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        self.mmu.write_byte((byte + 0xff00), Registers.a)
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.mmu.write_byte((byte + 0xff00), self.registers.a)
         return 12
     
     def POP_HL(self) -> int:
-        Registers.set_hl(StackManager.pop_word())
+        self.registers.set_hl(self.stack_manager.pop_word())
         return 12
 
     def LD_REF_C_A(self) -> int:
-        self.mmu.write_byte((Registers.c + 0xff00), Registers.a)
+        self.mmu.write_byte((self.registers.c + 0xff00), self.registers.a)
         return 8
     
     def PUSH_HL(self) -> int:
-        StackManager.push_word(Registers.get_hl())
+        self.stack_manager.push_word(self.registers.get_hl())
         return 16
 
     def AND_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self._and(byte)
         return 8
 
     def RST_20H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x20
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x20
         return 16
 
     def ADD_SP_r8(self) -> int:
-        byte = signed_value(self.mmu.read_byte(Registers.pc))
-        temp = Registers.sp + byte
-        Registers.pc += 1
-        Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        if ( Registers.sp ^ byte ^ temp ) & 0x100 == 0x100:
-            Registers.set_c_flag()
-        else:
-            Registers.reset_c_flag()
-        if ( Registers.sp ^ byte ^ temp ) & 0x10 == 0x10:
-            Registers.set_h_flag()
-        else:
-            Registers.reset_h_flag()
-        Registers.sp = temp
+        byte = signed_value(self.mmu.read_byte(self.registers.pc))
+        temp = self.registers.sp + byte
+        self.registers.pc += 1
+        carries = self.registers.sp ^ byte ^ temp
+        self.registers.f = ((carries & 0x10) << 1) | ((carries & 0x100) >> 4)
+        self.registers.sp = temp
         return 16
 
     def JP_HL(self) -> int:
-        word = Registers.get_hl()
-        Registers.pc = word
+        word = self.registers.get_hl()
+        self.registers.pc = word
         return 4
     
     def LD_REF_a16_A(self) -> int:
-        word = self.mmu.read_word(Registers.pc)
-        Registers.pc += 2
-        self.mmu.write_byte(word, Registers.a)
+        word = self.mmu.read_word(self.registers.pc)
+        self.registers.pc += 2
+        self.mmu.write_byte(word, self.registers.a)
         return 16
 
     def XOR_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self.xor(byte)
         return 8
 
     def RST_28H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x28
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x28
         return 16
     
     def LDH_A_REF_a8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        Registers.a = self.mmu.read_byte((byte + 0xff00))
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
+        self.registers.a = self.mmu.read_byte((byte + 0xff00))
         return 12
     
     def POP_AF(self) -> int:
-        Registers.set_af(StackManager.pop_word())
+        self.registers.set_af(self.stack_manager.pop_word())
         return 12
     
     def LD_A_REF_C(self) -> int:
-        Registers.a = self.mmu.read_byte(Registers.c + 0xff00)
+        self.registers.a = self.mmu.read_byte(self.registers.c + 0xff00)
         return 8
 
     def DI(self) -> int:
@@ -1169,45 +1152,37 @@ class InstructionPerformer:
         return 4
     
     def PUSH_AF(self) -> int:
-        StackManager.push_word(Registers.get_af())
+        self.stack_manager.push_word(self.registers.get_af())
         return 16
 
     def OR_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self._or(byte)
         return 8
 
     def RST_30H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x30
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x30
         return 16
     
     def LD_HL_SP_r8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
-        hl = Registers.sp + signed_value(byte)
-        Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        if (Registers.sp ^ signed_value(byte) ^ hl) & 0x100 == 0x100:
-            Registers.set_c_flag()
-        else: 
-            Registers.reset_c_flag()
-        if (Registers.sp ^ signed_value(byte) ^ hl) & 0x10 == 0x10:
-            Registers.set_h_flag()
-        else: 
-            Registers.reset_h_flag()
-        Registers.set_hl(hl)
+        byte = signed_value(self.mmu.read_byte(self.registers.pc))
+        self.registers.pc += 1
+        hl = self.registers.sp + byte
+        carries = self.registers.sp ^ byte ^ hl
+        self.registers.f = ((carries & 0x10) << 1) | ((carries & 0x100) >> 4)
+        self.registers.set_hl(hl)
         return 12
-    
+
     def LD_SP_HL(self) -> int:
-        Registers.sp = Registers.get_hl()
+        self.registers.sp = self.registers.get_hl()
         return 8
     
     def LD_A_a16(self) -> int:
-        byte = self.mmu.read_byte(self.mmu.read_word(Registers.pc))
-        Registers.pc += 2
-        Registers.a = byte
+        byte = self.mmu.read_byte(self.mmu.read_word(self.registers.pc))
+        self.registers.pc += 2
+        self.registers.a = byte
         return 16
 
     def EI(self) -> int:
@@ -1215,1319 +1190,1140 @@ class InstructionPerformer:
         return 4
 
     def CP_d8(self) -> int:
-        byte = self.mmu.read_byte(Registers.pc)
-        Registers.pc += 1
+        byte = self.mmu.read_byte(self.registers.pc)
+        self.registers.pc += 1
         self.cp(byte)
         return 8
 
     def RST_38H(self) -> int:
-        StackManager.push_word(Registers.pc)
-        Registers.pc = 0x38
+        self.stack_manager.push_word(self.registers.pc)
+        self.registers.pc = 0x38
         return 16
 
     def RLC_B(self) -> int:
-        Registers.b = self.rlc(Registers.b)
+        self.registers.b = self.rlc(self.registers.b)
         return 8
 
     def RLC_C(self) -> int:
-        Registers.c = self.rlc(Registers.c)
+        self.registers.c = self.rlc(self.registers.c)
         return 8
 
     def RLC_D(self) -> int:
-        Registers.d = self.rlc(Registers.d)
+        self.registers.d = self.rlc(self.registers.d)
         return 8
 
     def RLC_E(self) -> int:
-        Registers.e = self.rlc(Registers.e)
+        self.registers.e = self.rlc(self.registers.e)
         return 8
 
     def RLC_H(self) -> int:
-        Registers.h = self.rlc(Registers.h)
+        self.registers.h = self.rlc(self.registers.h)
         return 8
 
     def RLC_L(self) -> int:
-        Registers.l = self.rlc(Registers.l)
+        self.registers.l = self.rlc(self.registers.l)
         return 8
 
     def RLC_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.rlc(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.rlc(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RLC_A(self) -> int:
-        Registers.a = self.rlc(Registers.a)
+        self.registers.a = self.rlc(self.registers.a)
         return 8
 
     def RRC_B(self) -> int:
-        Registers.b = self.rrc(Registers.b)
+        self.registers.b = self.rrc(self.registers.b)
         return 8
 
     def RRC_C(self) -> int:
-        Registers.c = self.rrc(Registers.c)
+        self.registers.c = self.rrc(self.registers.c)
         return 8
 
     def RRC_D(self) -> int:
-        Registers.d = self.rrc(Registers.d)
+        self.registers.d = self.rrc(self.registers.d)
         return 8
 
     def RRC_E(self) -> int:
-        Registers.e = self.rrc(Registers.e)
+        self.registers.e = self.rrc(self.registers.e)
         return 8
 
     def RRC_H(self) -> int:
-        Registers.h = self.rrc(Registers.h)
+        self.registers.h = self.rrc(self.registers.h)
         return 8
 
     def RRC_L(self) -> int:
-        Registers.l = self.rrc(Registers.l)
+        self.registers.l = self.rrc(self.registers.l)
         return 8
 
     def RRC_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.rrc(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.rrc(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RRC_A(self) -> int:
-        Registers.a = self.rrc(Registers.a)
+        self.registers.a = self.rrc(self.registers.a)
         return 8
 
     def RL_B(self) -> int:
-        Registers.b = self.rl(Registers.b)
+        self.registers.b = self.rl(self.registers.b)
         return 8
 
     def RL_C(self) -> int:
-        Registers.c = self.rl(Registers.c)
+        self.registers.c = self.rl(self.registers.c)
         return 8
 
     def RL_D(self) -> int:
-        Registers.d = self.rl(Registers.d)
+        self.registers.d = self.rl(self.registers.d)
         return 8
 
     def RL_E(self) -> int:
-        Registers.e = self.rl(Registers.e)
+        self.registers.e = self.rl(self.registers.e)
         return 8
 
     def RL_H(self) -> int:
-        Registers.h = self.rl(Registers.h)
+        self.registers.h = self.rl(self.registers.h)
         return 8
 
     def RL_L(self) -> int:
-        Registers.l = self.rl(Registers.l)
+        self.registers.l = self.rl(self.registers.l)
         return 8
 
     def RL_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.rl(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.rl(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RL_A(self) -> int:
-        Registers.a = self.rl(Registers.a)
+        self.registers.a = self.rl(self.registers.a)
         return 8
 
     def RR_B(self) -> int:
-        Registers.b = self.rr(Registers.b)
+        self.registers.b = self.rr(self.registers.b)
         return 8
 
     def RR_C(self) -> int:
-        Registers.c = self.rr(Registers.c)
+        self.registers.c = self.rr(self.registers.c)
         return 8
 
     def RR_D(self) -> int:
-        Registers.d = self.rr(Registers.d)
+        self.registers.d = self.rr(self.registers.d)
         return 8
 
     def RR_E(self) -> int:
-        Registers.e = self.rr(Registers.e)
+        self.registers.e = self.rr(self.registers.e)
         return 8
 
     def RR_H(self) -> int:
-        Registers.h = self.rr(Registers.h)
+        self.registers.h = self.rr(self.registers.h)
         return 8
 
     def RR_L(self) -> int:
-        Registers.l = self.rr(Registers.l)
+        self.registers.l = self.rr(self.registers.l)
         return 8
 
     def RR_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.rr(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.rr(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RR_A(self) -> int:
-        Registers.a = self.rr(Registers.a)
+        self.registers.a = self.rr(self.registers.a)
         return 8
 
     def SLA_B(self) -> int:
-        Registers.b = self.sla(Registers.b)
+        self.registers.b = self.sla(self.registers.b)
         return 8
 
     def SLA_C(self) -> int:
-        Registers.c = self.sla(Registers.c)
+        self.registers.c = self.sla(self.registers.c)
         return 8
 
     def SLA_D(self) -> int:
-        Registers.d = self.sla(Registers.d)
+        self.registers.d = self.sla(self.registers.d)
         return 8
 
     def SLA_E(self) -> int:
-        Registers.e = self.sla(Registers.e)
+        self.registers.e = self.sla(self.registers.e)
         return 8
 
     def SLA_H(self) -> int:
-        Registers.h = self.sla(Registers.h)
+        self.registers.h = self.sla(self.registers.h)
         return 8
 
     def SLA_L(self) -> int:
-        Registers.l = self.sla(Registers.l)
+        self.registers.l = self.sla(self.registers.l)
         return 8
 
     def SLA_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.sla(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.sla(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SLA_A(self) -> int:
-        Registers.a = self.sla(Registers.a)
+        self.registers.a = self.sla(self.registers.a)
         return 8
 
     def SRA_B(self) -> int:
-        Registers.b = self.sra(Registers.b)
+        self.registers.b = self.sra(self.registers.b)
         return 8
 
     def SRA_C(self) -> int:
-        Registers.c = self.sra(Registers.c)
+        self.registers.c = self.sra(self.registers.c)
         return 8
 
     def SRA_D(self) -> int:
-        Registers.d = self.sra(Registers.d)
+        self.registers.d = self.sra(self.registers.d)
         return 8
 
     def SRA_E(self) -> int:
-        Registers.e = self.sra(Registers.e)
+        self.registers.e = self.sra(self.registers.e)
         return 8
 
     def SRA_H(self) -> int:
-        Registers.h = self.sra(Registers.h)
+        self.registers.h = self.sra(self.registers.h)
         return 8
 
     def SRA_L(self) -> int:
-        Registers.l = self.sra(Registers.l)
+        self.registers.l = self.sra(self.registers.l)
         return 8
 
     def SRA_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.sra(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.sra(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SRA_A(self) -> int:
-        Registers.a = self.sra(Registers.a)
+        self.registers.a = self.sra(self.registers.a)
         return 8
 
     def SWAP_B(self) -> int:
-        Registers.b = self.swap(Registers.b)
+        self.registers.b = self.swap(self.registers.b)
         return 8
 
     def SWAP_C(self) -> int:
-        Registers.c = self.swap(Registers.c)
+        self.registers.c = self.swap(self.registers.c)
         return 8
 
     def SWAP_D(self) -> int:
-        Registers.d = self.swap(Registers.d)
+        self.registers.d = self.swap(self.registers.d)
         return 8
 
     def SWAP_E(self) -> int:
-        Registers.e = self.swap(Registers.e)
+        self.registers.e = self.swap(self.registers.e)
         return 8
 
     def SWAP_H(self) -> int:
-        Registers.h = self.swap(Registers.h)
+        self.registers.h = self.swap(self.registers.h)
         return 8
 
     def SWAP_L(self) -> int:
-        Registers.l = self.swap(Registers.l)
+        self.registers.l = self.swap(self.registers.l)
         return 8
 
     def SWAP_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.swap(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.swap(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SWAP_A(self) -> int:
-        Registers.a = self.swap(Registers.a)
+        self.registers.a = self.swap(self.registers.a)
         return 8
 
     def SRL_B(self) -> int:
-        Registers.b = self.srl(Registers.b)
+        self.registers.b = self.srl(self.registers.b)
         return 8
 
     def SRL_C(self) -> int:
-        Registers.c = self.srl(Registers.c)
+        self.registers.c = self.srl(self.registers.c)
         return 8
 
     def SRL_D(self) -> int:
-        Registers.d = self.srl(Registers.d)
+        self.registers.d = self.srl(self.registers.d)
         return 8
 
     def SRL_E(self) -> int:
-        Registers.e = self.srl(Registers.e)
+        self.registers.e = self.srl(self.registers.e)
         return 8
 
     def SRL_H(self) -> int:
-        Registers.h = self.srl(Registers.h)
+        self.registers.h = self.srl(self.registers.h)
         return 8
 
     def SRL_L(self) -> int:
-        Registers.l = self.srl(Registers.l)
+        self.registers.l = self.srl(self.registers.l)
         return 8
 
     def SRL_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.srl(self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.srl(self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SRL_A(self) -> int:
-        Registers.a = self.srl(Registers.a)
+        self.registers.a = self.srl(self.registers.a)
         return 8
 
     def BIT_0_B(self) -> int:
-        self.bit(0, Registers.b)
+        self.bit(0, self.registers.b)
         return 8
 
     def BIT_0_C(self) -> int:
-        self.bit(0, Registers.c)
+        self.bit(0, self.registers.c)
         return 8
 
     def BIT_0_D(self) -> int:
-        self.bit(0, Registers.d)
+        self.bit(0, self.registers.d)
         return 8
 
     def BIT_0_E(self) -> int:
-        self.bit(0, Registers.e)
+        self.bit(0, self.registers.e)
         return 8
 
     def BIT_0_H(self) -> int:
-        self.bit(0, Registers.h)
+        self.bit(0, self.registers.h)
         return 8
 
     def BIT_0_L(self) -> int:
-        self.bit(0, Registers.l)
+        self.bit(0, self.registers.l)
         return 8
 
     def BIT_0_REF_HL(self) -> int:
-        self.bit(0, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(0, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_0_A(self) -> int:
-        self.bit(0, Registers.a)
+        self.bit(0, self.registers.a)
         return 8
 
     def BIT_1_B(self) -> int:
-        self.bit(1, Registers.b)
+        self.bit(1, self.registers.b)
         return 8
 
     def BIT_1_C(self) -> int:
-        self.bit(1, Registers.c)
+        self.bit(1, self.registers.c)
         return 8
 
     def BIT_1_D(self) -> int:
-        self.bit(1, Registers.d)
+        self.bit(1, self.registers.d)
         return 8
 
     def BIT_1_E(self) -> int:
-        self.bit(1, Registers.e)
+        self.bit(1, self.registers.e)
         return 8
 
     def BIT_1_H(self) -> int:
-        self.bit(1, Registers.h)
+        self.bit(1, self.registers.h)
         return 8
 
     def BIT_1_L(self) -> int:
-        self.bit(1, Registers.l)
+        self.bit(1, self.registers.l)
         return 8
 
     def BIT_1_REF_HL(self) -> int:
-        self.bit(1, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(1, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_1_A(self) -> int:
-        self.bit(1, Registers.a)
+        self.bit(1, self.registers.a)
         return 8
 
     def BIT_2_B(self) -> int:
-        self.bit(2, Registers.b)
+        self.bit(2, self.registers.b)
         return 8
 
     def BIT_2_C(self) -> int:
-        self.bit(2, Registers.c)
+        self.bit(2, self.registers.c)
         return 8
 
     def BIT_2_D(self) -> int:
-        self.bit(2, Registers.d)
+        self.bit(2, self.registers.d)
         return 8
 
     def BIT_2_E(self) -> int:
-        self.bit(2, Registers.e)
+        self.bit(2, self.registers.e)
         return 8
 
     def BIT_2_H(self) -> int:
-        self.bit(2, Registers.h)
+        self.bit(2, self.registers.h)
         return 8
 
     def BIT_2_L(self) -> int:
-        self.bit(2, Registers.l)
+        self.bit(2, self.registers.l)
         return 8
 
     def BIT_2_REF_HL(self) -> int:
-        self.bit(2, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(2, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_2_A(self) -> int:
-        self.bit(2, Registers.a)
+        self.bit(2, self.registers.a)
         return 8
 
     def BIT_3_B(self) -> int:
-        self.bit(3, Registers.b)
+        self.bit(3, self.registers.b)
         return 8
 
     def BIT_3_C(self) -> int:
-        self.bit(3, Registers.c)
+        self.bit(3, self.registers.c)
         return 8
 
     def BIT_3_D(self) -> int:
-        self.bit(3, Registers.d)
+        self.bit(3, self.registers.d)
         return 8
 
     def BIT_3_E(self) -> int:
-        self.bit(3, Registers.e)
+        self.bit(3, self.registers.e)
         return 8
 
     def BIT_3_H(self) -> int:
-        self.bit(3, Registers.h)
+        self.bit(3, self.registers.h)
         return 8
 
     def BIT_3_L(self) -> int:
-        self.bit(3, Registers.l)
+        self.bit(3, self.registers.l)
         return 8
 
     def BIT_3_REF_HL(self) -> int:
-        self.bit(3, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(3, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_3_A(self) -> int:
-        self.bit(3, Registers.a)
+        self.bit(3, self.registers.a)
         return 8
 
     def BIT_4_B(self) -> int:
-        self.bit(4, Registers.b)
+        self.bit(4, self.registers.b)
         return 8
 
     def BIT_4_C(self) -> int:
-        self.bit(4, Registers.c)
+        self.bit(4, self.registers.c)
         return 8
 
     def BIT_4_D(self) -> int:
-        self.bit(4, Registers.d)
+        self.bit(4, self.registers.d)
         return 8
 
     def BIT_4_E(self) -> int:
-        self.bit(4, Registers.e)
+        self.bit(4, self.registers.e)
         return 8
 
     def BIT_4_H(self) -> int:
-        self.bit(4, Registers.h)
+        self.bit(4, self.registers.h)
         return 8
 
     def BIT_4_L(self) -> int:
-        self.bit(4, Registers.l)
+        self.bit(4, self.registers.l)
         return 8
 
     def BIT_4_REF_HL(self) -> int:
-        self.bit(4, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(4, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_4_A(self) -> int:
-        self.bit(4, Registers.a)
+        self.bit(4, self.registers.a)
         return 8
 
     def BIT_5_B(self) -> int:
-        self.bit(5, Registers.b)
+        self.bit(5, self.registers.b)
         return 8
 
     def BIT_5_C(self) -> int:
-        self.bit(5, Registers.c)
+        self.bit(5, self.registers.c)
         return 8
 
     def BIT_5_D(self) -> int:
-        self.bit(5, Registers.d)
+        self.bit(5, self.registers.d)
         return 8
 
     def BIT_5_E(self) -> int:
-        self.bit(5, Registers.e)
+        self.bit(5, self.registers.e)
         return 8
 
     def BIT_5_H(self) -> int:
-        self.bit(5, Registers.h)
+        self.bit(5, self.registers.h)
         return 8
 
     def BIT_5_L(self) -> int:
-        self.bit(5, Registers.l)
+        self.bit(5, self.registers.l)
         return 8
 
     def BIT_5_REF_HL(self) -> int:
-        self.bit(5, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(5, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_5_A(self) -> int:
-        self.bit(5, Registers.a)
+        self.bit(5, self.registers.a)
         return 8
 
     def BIT_6_B(self) -> int:
-        self.bit(6, Registers.b)
+        self.bit(6, self.registers.b)
         return 8
 
     def BIT_6_C(self) -> int:
-        self.bit(6, Registers.c)
+        self.bit(6, self.registers.c)
         return 8
 
     def BIT_6_D(self) -> int:
-        self.bit(6, Registers.d)
+        self.bit(6, self.registers.d)
         return 8
 
     def BIT_6_E(self) -> int:
-        self.bit(6, Registers.e)
+        self.bit(6, self.registers.e)
         return 8
 
     def BIT_6_H(self) -> int:
-        self.bit(6, Registers.h)
+        self.bit(6, self.registers.h)
         return 8
 
     def BIT_6_L(self) -> int:
-        self.bit(6, Registers.l)
+        self.bit(6, self.registers.l)
         return 8
 
     def BIT_6_REF_HL(self) -> int:
-        self.bit(6, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(6, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_6_A(self) -> int:
-        self.bit(6, Registers.a)
+        self.bit(6, self.registers.a)
         return 8
 
     def BIT_7_B(self) -> int:
-        self.bit(7, Registers.b)
+        self.bit(7, self.registers.b)
         return 8
 
     def BIT_7_C(self) -> int:
-        self.bit(7, Registers.c)
+        self.bit(7, self.registers.c)
         return 8
 
     def BIT_7_D(self) -> int:
-        self.bit(7, Registers.d)
+        self.bit(7, self.registers.d)
         return 8
 
     def BIT_7_E(self) -> int:
-        self.bit(7, Registers.e)
+        self.bit(7, self.registers.e)
         return 8
 
     def BIT_7_H(self) -> int:
-        self.bit(7, Registers.h)
+        self.bit(7, self.registers.h)
         return 8
 
     def BIT_7_L(self) -> int:
-        self.bit(7, Registers.l)
+        self.bit(7, self.registers.l)
         return 8
 
     def BIT_7_REF_HL(self) -> int:
-        self.bit(7, self.mmu.read_byte(Registers.get_hl()))
+        self.bit(7, self.mmu.read_byte(self.registers.get_hl()))
         return 12
 
     def BIT_7_A(self) -> int:
-        self.bit(7, Registers.a)
+        self.bit(7, self.registers.a)
         return 8
 
     def RES_0_B(self) -> int:
-        Registers.b = self.res(0, Registers.b)
+        self.registers.b = self.res(0, self.registers.b)
         return 8
 
     def RES_0_C(self) -> int:
-        Registers.c = self.res(0, Registers.c)
+        self.registers.c = self.res(0, self.registers.c)
         return 8
 
     def RES_0_D(self) -> int:
-        Registers.d = self.res(0, Registers.d)
+        self.registers.d = self.res(0, self.registers.d)
         return 8
 
     def RES_0_E(self) -> int:
-        Registers.e = self.res(0, Registers.e)
+        self.registers.e = self.res(0, self.registers.e)
         return 8
 
     def RES_0_H(self) -> int:
-        Registers.h = self.res(0, Registers.h)
+        self.registers.h = self.res(0, self.registers.h)
         return 8
 
     def RES_0_L(self) -> int:
-        Registers.l = self.res(0, Registers.l)
+        self.registers.l = self.res(0, self.registers.l)
         return 8
 
     def RES_0_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(0, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(0, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_0_A(self) -> int:
-        Registers.a = self.res(0, Registers.a)
+        self.registers.a = self.res(0, self.registers.a)
         return 8
 
     def RES_1_B(self) -> int:
-        Registers.b = self.res(1, Registers.b)
+        self.registers.b = self.res(1, self.registers.b)
         return 8
 
     def RES_1_C(self) -> int:
-        Registers.c = self.res(1, Registers.c)
+        self.registers.c = self.res(1, self.registers.c)
         return 8
 
     def RES_1_D(self) -> int:
-        Registers.d = self.res(1, Registers.d)
+        self.registers.d = self.res(1, self.registers.d)
         return 8
 
     def RES_1_E(self) -> int:
-        Registers.e = self.res(1, Registers.e)
+        self.registers.e = self.res(1, self.registers.e)
         return 8
 
     def RES_1_H(self) -> int:
-        Registers.h = self.res(1, Registers.h)
+        self.registers.h = self.res(1, self.registers.h)
         return 8
 
     def RES_1_L(self) -> int:
-        Registers.l = self.res(1, Registers.l)
+        self.registers.l = self.res(1, self.registers.l)
         return 8
 
     def RES_1_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(1, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(1, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_1_A(self) -> int:
-        Registers.a = self.res(1, Registers.a)
+        self.registers.a = self.res(1, self.registers.a)
         return 8
 
     def RES_2_B(self) -> int:
-        Registers.b = self.res(2, Registers.b)
+        self.registers.b = self.res(2, self.registers.b)
         return 8
 
     def RES_2_C(self) -> int:
-        Registers.c = self.res(2, Registers.c)
+        self.registers.c = self.res(2, self.registers.c)
         return 8
 
     def RES_2_D(self) -> int:
-        Registers.d = self.res(2, Registers.d)
+        self.registers.d = self.res(2, self.registers.d)
         return 8
 
     def RES_2_E(self) -> int:
-        Registers.e = self.res(2, Registers.e)
+        self.registers.e = self.res(2, self.registers.e)
         return 8
 
     def RES_2_H(self) -> int:
-        Registers.h = self.res(2, Registers.h)
+        self.registers.h = self.res(2, self.registers.h)
         return 8
 
     def RES_2_L(self) -> int:
-        Registers.l = self.res(2, Registers.l)
+        self.registers.l = self.res(2, self.registers.l)
         return 8
 
     def RES_2_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(2, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(2, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_2_A(self) -> int:
-        Registers.a = self.res(2, Registers.a)
+        self.registers.a = self.res(2, self.registers.a)
         return 8
 
     def RES_3_B(self) -> int:
-        Registers.b = self.res(3, Registers.b)
+        self.registers.b = self.res(3, self.registers.b)
         return 8
 
     def RES_3_C(self) -> int:
-        Registers.c = self.res(3, Registers.c)
+        self.registers.c = self.res(3, self.registers.c)
         return 8
 
     def RES_3_D(self) -> int:
-        Registers.d = self.res(3, Registers.d)
+        self.registers.d = self.res(3, self.registers.d)
         return 8
 
     def RES_3_E(self) -> int:
-        Registers.e = self.res(3, Registers.e)
+        self.registers.e = self.res(3, self.registers.e)
         return 8
 
     def RES_3_H(self) -> int:
-        Registers.h = self.res(3, Registers.h)
+        self.registers.h = self.res(3, self.registers.h)
         return 8
 
     def RES_3_L(self) -> int:
-        Registers.l = self.res(3, Registers.l)
+        self.registers.l = self.res(3, self.registers.l)
         return 8
 
     def RES_3_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(3, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(3, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_3_A(self) -> int:
-        Registers.a = self.res(3, Registers.a)
+        self.registers.a = self.res(3, self.registers.a)
         return 8
 
     def RES_4_B(self) -> int:
-        Registers.b = self.res(4, Registers.b)
+        self.registers.b = self.res(4, self.registers.b)
         return 8
 
     def RES_4_C(self) -> int:
-        Registers.c = self.res(4, Registers.c)
+        self.registers.c = self.res(4, self.registers.c)
         return 8
 
     def RES_4_D(self) -> int:
-        Registers.d = self.res(4, Registers.d)
+        self.registers.d = self.res(4, self.registers.d)
         return 8
 
     def RES_4_E(self) -> int:
-        Registers.e = self.res(4, Registers.e)
+        self.registers.e = self.res(4, self.registers.e)
         return 8
 
     def RES_4_H(self) -> int:
-        Registers.h = self.res(4, Registers.h)
+        self.registers.h = self.res(4, self.registers.h)
         return 8
 
     def RES_4_L(self) -> int:
-        Registers.l = self.res(4, Registers.l)
+        self.registers.l = self.res(4, self.registers.l)
         return 8
 
     def RES_4_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(4, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(4, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_4_A(self) -> int:
-        Registers.a = self.res(4, Registers.a)
+        self.registers.a = self.res(4, self.registers.a)
         return 8
 
     def RES_5_B(self) -> int:
-        Registers.b = self.res(5, Registers.b)
+        self.registers.b = self.res(5, self.registers.b)
         return 8
 
     def RES_5_C(self) -> int:
-        Registers.c = self.res(5, Registers.c)
+        self.registers.c = self.res(5, self.registers.c)
         return 8
 
     def RES_5_D(self) -> int:
-        Registers.d = self.res(5, Registers.d)
+        self.registers.d = self.res(5, self.registers.d)
         return 8
 
     def RES_5_E(self) -> int:
-        Registers.e = self.res(5, Registers.e)
+        self.registers.e = self.res(5, self.registers.e)
         return 8
 
     def RES_5_H(self) -> int:
-        Registers.h = self.res(5, Registers.h)
+        self.registers.h = self.res(5, self.registers.h)
         return 8
 
     def RES_5_L(self) -> int:
-        Registers.l = self.res(5, Registers.l)
+        self.registers.l = self.res(5, self.registers.l)
         return 8
 
     def RES_5_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(5, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(5, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_5_A(self) -> int:
-        Registers.a = self.res(5, Registers.a)
+        self.registers.a = self.res(5, self.registers.a)
         return 8
 
     def RES_6_B(self) -> int:
-        Registers.b = self.res(6, Registers.b)
+        self.registers.b = self.res(6, self.registers.b)
         return 8
 
     def RES_6_C(self) -> int:
-        Registers.c = self.res(6, Registers.c)
+        self.registers.c = self.res(6, self.registers.c)
         return 8
 
     def RES_6_D(self) -> int:
-        Registers.d = self.res(6, Registers.d)
+        self.registers.d = self.res(6, self.registers.d)
         return 8
 
     def RES_6_E(self) -> int:
-        Registers.e = self.res(6, Registers.e)
+        self.registers.e = self.res(6, self.registers.e)
         return 8
 
     def RES_6_H(self) -> int:
-        Registers.h = self.res(6, Registers.h)
+        self.registers.h = self.res(6, self.registers.h)
         return 8
 
     def RES_6_L(self) -> int:
-        Registers.l = self.res(6, Registers.l)
+        self.registers.l = self.res(6, self.registers.l)
         return 8
 
     def RES_6_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(6, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(6, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_6_A(self) -> int:
-        Registers.a = self.res(6, Registers.a)
+        self.registers.a = self.res(6, self.registers.a)
         return 8
 
     def RES_7_B(self) -> int:
-        Registers.b = self.res(7, Registers.b)
+        self.registers.b = self.res(7, self.registers.b)
         return 8
 
     def RES_7_C(self) -> int:
-        Registers.c = self.res(7, Registers.c)
+        self.registers.c = self.res(7, self.registers.c)
         return 8
 
     def RES_7_D(self) -> int:
-        Registers.d = self.res(7, Registers.d)
+        self.registers.d = self.res(7, self.registers.d)
         return 8
 
     def RES_7_E(self) -> int:
-        Registers.e = self.res(7, Registers.e)
+        self.registers.e = self.res(7, self.registers.e)
         return 8
 
     def RES_7_H(self) -> int:
-        Registers.h = self.res(7, Registers.h)
+        self.registers.h = self.res(7, self.registers.h)
         return 8
 
     def RES_7_L(self) -> int:
-        Registers.l = self.res(7, Registers.l)
+        self.registers.l = self.res(7, self.registers.l)
         return 8
 
     def RES_7_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), self.res(7, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), self.res(7, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def RES_7_A(self) -> int:
-        Registers.a = self.res(7, Registers.a)
+        self.registers.a = self.res(7, self.registers.a)
         return 8
 
     def SET_0_B(self) -> int:
-        Registers.b = set_bit(0, Registers.b)
+        self.registers.b = set_bit(0, self.registers.b)
         return 8
 
     def SET_0_C(self) -> int:
-        Registers.c = set_bit(0, Registers.c)
+        self.registers.c = set_bit(0, self.registers.c)
         return 8
 
     def SET_0_D(self) -> int:
-        Registers.d = set_bit(0, Registers.d)
+        self.registers.d = set_bit(0, self.registers.d)
         return 8
 
     def SET_0_E(self) -> int:
-        Registers.e = set_bit(0, Registers.e)
+        self.registers.e = set_bit(0, self.registers.e)
         return 8
 
     def SET_0_H(self) -> int:
-        Registers.h = set_bit(0, Registers.h)
+        self.registers.h = set_bit(0, self.registers.h)
         return 8
 
     def SET_0_L(self) -> int:
-        Registers.l = set_bit(0, Registers.l)
+        self.registers.l = set_bit(0, self.registers.l)
         return 8
 
     def SET_0_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(0, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(0, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_0_A(self) -> int:
-        Registers.a = set_bit(0, Registers.a)
+        self.registers.a = set_bit(0, self.registers.a)
         return 8
 
     def SET_1_B(self) -> int:
-        Registers.b = set_bit(1, Registers.b)
+        self.registers.b = set_bit(1, self.registers.b)
         return 8
 
     def SET_1_C(self) -> int:
-        Registers.c = set_bit(1, Registers.c)
+        self.registers.c = set_bit(1, self.registers.c)
         return 8
 
     def SET_1_D(self) -> int:
-        Registers.d = set_bit(1, Registers.d)
+        self.registers.d = set_bit(1, self.registers.d)
         return 8
 
     def SET_1_E(self) -> int:
-        Registers.e = set_bit(1, Registers.e)
+        self.registers.e = set_bit(1, self.registers.e)
         return 8
 
     def SET_1_H(self) -> int:
-        Registers.h = set_bit(1, Registers.h)
+        self.registers.h = set_bit(1, self.registers.h)
         return 8
 
     def SET_1_L(self) -> int:
-        Registers.l = set_bit(1, Registers.l)
+        self.registers.l = set_bit(1, self.registers.l)
         return 8
 
     def SET_1_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(1, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(1, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_1_A(self) -> int:
-        Registers.a = set_bit(1, Registers.a)
+        self.registers.a = set_bit(1, self.registers.a)
         return 8
 
     def SET_2_B(self) -> int:
-        Registers.b = set_bit(2, Registers.b)
+        self.registers.b = set_bit(2, self.registers.b)
         return 8
 
     def SET_2_C(self) -> int:
-        Registers.c = set_bit(2, Registers.c)
+        self.registers.c = set_bit(2, self.registers.c)
         return 8
 
     def SET_2_D(self) -> int:
-        Registers.d = set_bit(2, Registers.d)
+        self.registers.d = set_bit(2, self.registers.d)
         return 8
 
     def SET_2_E(self) -> int:
-        Registers.e = set_bit(2, Registers.e)
+        self.registers.e = set_bit(2, self.registers.e)
         return 8
 
     def SET_2_H(self) -> int:
-        Registers.h = set_bit(2, Registers.h)
+        self.registers.h = set_bit(2, self.registers.h)
         return 8
 
     def SET_2_L(self) -> int:
-        Registers.l = set_bit(2, Registers.l)
+        self.registers.l = set_bit(2, self.registers.l)
         return 8
 
     def SET_2_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(2, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(2, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_2_A(self) -> int:
-        Registers.a = set_bit(2, Registers.a)
+        self.registers.a = set_bit(2, self.registers.a)
         return 8
 
     def SET_3_B(self) -> int:
-        Registers.b = set_bit(3, Registers.b)
+        self.registers.b = set_bit(3, self.registers.b)
         return 8
 
     def SET_3_C(self) -> int:
-        Registers.c = set_bit(3, Registers.c)
+        self.registers.c = set_bit(3, self.registers.c)
         return 8
 
     def SET_3_D(self) -> int:
-        Registers.d = set_bit(3, Registers.d)
+        self.registers.d = set_bit(3, self.registers.d)
         return 8
 
     def SET_3_E(self) -> int:
-        Registers.e = set_bit(3, Registers.e)
+        self.registers.e = set_bit(3, self.registers.e)
         return 8
 
     def SET_3_H(self) -> int:
-        Registers.h = set_bit(3, Registers.h)
+        self.registers.h = set_bit(3, self.registers.h)
         return 8
 
     def SET_3_L(self) -> int:
-        Registers.l = set_bit(3, Registers.l)
+        self.registers.l = set_bit(3, self.registers.l)
         return 8
 
     def SET_3_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(3, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(3, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_3_A(self) -> int:
-        Registers.a = set_bit(3, Registers.a)
+        self.registers.a = set_bit(3, self.registers.a)
         return 8
 
     def SET_4_B(self) -> int:
-        Registers.b = set_bit(4, Registers.b)
+        self.registers.b = set_bit(4, self.registers.b)
         return 8
 
     def SET_4_C(self) -> int:
-        Registers.c = set_bit(4, Registers.c)
+        self.registers.c = set_bit(4, self.registers.c)
         return 8
 
     def SET_4_D(self) -> int:
-        Registers.d = set_bit(4, Registers.d)
+        self.registers.d = set_bit(4, self.registers.d)
         return 8
 
     def SET_4_E(self) -> int:
-        Registers.e = set_bit(4, Registers.e)
+        self.registers.e = set_bit(4, self.registers.e)
         return 8
 
     def SET_4_H(self) -> int:
-        Registers.h = set_bit(4, Registers.h)
+        self.registers.h = set_bit(4, self.registers.h)
         return 8
 
     def SET_4_L(self) -> int:
-        Registers.l = set_bit(4, Registers.l)
+        self.registers.l = set_bit(4, self.registers.l)
         return 8
 
     def SET_4_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(4, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(4, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_4_A(self) -> int:
-        Registers.a = set_bit(4, Registers.a)
+        self.registers.a = set_bit(4, self.registers.a)
         return 8
 
     def SET_5_B(self) -> int:
-        Registers.b = set_bit(5, Registers.b)
+        self.registers.b = set_bit(5, self.registers.b)
         return 8
 
     def SET_5_C(self) -> int:
-        Registers.c = set_bit(5, Registers.c)
+        self.registers.c = set_bit(5, self.registers.c)
         return 8
 
     def SET_5_D(self) -> int:
-        Registers.d = set_bit(5, Registers.d)
+        self.registers.d = set_bit(5, self.registers.d)
         return 8
 
     def SET_5_E(self) -> int:
-        Registers.e = set_bit(5, Registers.e)
+        self.registers.e = set_bit(5, self.registers.e)
         return 8
 
     def SET_5_H(self) -> int:
-        Registers.h = set_bit(5, Registers.h)
+        self.registers.h = set_bit(5, self.registers.h)
         return 8
 
     def SET_5_L(self) -> int:
-        Registers.l = set_bit(5, Registers.l)
+        self.registers.l = set_bit(5, self.registers.l)
         return 8
 
     def SET_5_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(5, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(5, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_5_A(self) -> int:
-        Registers.a = set_bit(5, Registers.a)
+        self.registers.a = set_bit(5, self.registers.a)
         return 8
 
     def SET_6_B(self) -> int:
-        Registers.b = set_bit(6, Registers.b)
+        self.registers.b = set_bit(6, self.registers.b)
         return 8
 
     def SET_6_C(self) -> int:
-        Registers.c = set_bit(6, Registers.c)
+        self.registers.c = set_bit(6, self.registers.c)
         return 8
 
     def SET_6_D(self) -> int:
-        Registers.d = set_bit(6, Registers.d)
+        self.registers.d = set_bit(6, self.registers.d)
         return 8
 
     def SET_6_E(self) -> int:
-        Registers.e = set_bit(6, Registers.e)
+        self.registers.e = set_bit(6, self.registers.e)
         return 8
 
     def SET_6_H(self) -> int:
-        Registers.h = set_bit(6, Registers.h)
+        self.registers.h = set_bit(6, self.registers.h)
         return 8
 
     def SET_6_L(self) -> int:
-        Registers.l = set_bit(6, Registers.l)
+        self.registers.l = set_bit(6, self.registers.l)
         return 8
 
     def SET_6_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(6, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(6, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_6_A(self) -> int:
-        Registers.a = set_bit(6, Registers.a)
+        self.registers.a = set_bit(6, self.registers.a)
         return 8
 
     def SET_7_B(self) -> int:
-        Registers.b = set_bit(7, Registers.b)
+        self.registers.b = set_bit(7, self.registers.b)
         return 8
 
     def SET_7_C(self) -> int:
-        Registers.c = set_bit(7, Registers.c)
+        self.registers.c = set_bit(7, self.registers.c)
         return 8
 
     def SET_7_D(self) -> int:
-        Registers.d = set_bit(7, Registers.d)
+        self.registers.d = set_bit(7, self.registers.d)
         return 8
 
     def SET_7_E(self) -> int:
-        Registers.e = set_bit(7, Registers.e)
+        self.registers.e = set_bit(7, self.registers.e)
         return 8
 
     def SET_7_H(self) -> int:
-        Registers.h = set_bit(7, Registers.h)
+        self.registers.h = set_bit(7, self.registers.h)
         return 8
 
     def SET_7_L(self) -> int:
-        Registers.l = set_bit(7, Registers.l)
+        self.registers.l = set_bit(7, self.registers.l)
         return 8
 
     def SET_7_REF_HL(self) -> int:
-        self.mmu.write_byte(Registers.get_hl(), set_bit(7, self.mmu.read_byte(Registers.get_hl())))
+        self.mmu.write_byte(self.registers.get_hl(), set_bit(7, self.mmu.read_byte(self.registers.get_hl())))
         return 16
 
     def SET_7_A(self) -> int:
-        Registers.a = set_bit(7, Registers.a)
+        self.registers.a = set_bit(7, self.registers.a)
         return 8
     
     def add_byte(self, value : int) -> int:
-        byte = Registers.a + value
-        if (byte & 0xff) == 0x00:
-            Registers.set_z_flag()
-        else:
-                Registers.reset_z_flag()
-        if (Registers.a ^ value ^ byte) & 0x100 == 0x100:
-            Registers.set_c_flag()
-        else: 
-            Registers.reset_c_flag()
-        if (Registers.a ^ value ^ byte) & 0x10 == 0x10: 
-            Registers.set_h_flag() 
-        else: 
-            Registers.reset_h_flag()
-        Registers.reset_n_flag()
-        Registers.a = byte & 0xff
+        registers = self.registers
+        packed = ADD[(registers.a << 8) | value]
+        registers.a = packed >> 8
+        registers.f = packed & 0xff
 
     def add_word(self, value1 : int, value2 : int) -> int:
         result = value1 + value2
-
-        Registers.reset_n_flag()
-        if result & 0x10000 == 0x10000: 
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        if (value1 ^ value2 ^ (result & 0xFFFF)) & 0x1000 == 0x1000: 
-            Registers.set_h_flag() 
-        else: 
-            Registers.reset_h_flag()
-
-        return result & 0xFFFF
+        carries = value1 ^ value2 ^ (result & 0xffff)
+        self.registers.f = (self.registers.f & Z_FLAG) | ((carries & 0x1000) >> 7) | ((result & 0x10000) >> 12)
+        return result & 0xffff
 
     def adc(self, value : int) -> int:
-        carry = 1 if Registers.is_c_flag() else 0
-        result = Registers.a + value + carry
-        if result & 0xff == 0x0: 
-            Registers.set_z_flag()
-        else: 
-            Registers.reset_z_flag()
-        if result > 0xff: 
-            Registers.set_c_flag()
-        else: 
-            Registers.reset_c_flag()
-        if (Registers.a & 0xf) + (value & 0xf) + carry > 0xf: 
-            Registers.set_h_flag()
-        else: 
-            Registers.reset_h_flag()
-        Registers.reset_n_flag()
-        Registers.a = result & 0xff
-        
+        registers = self.registers
+        packed = ADD[((registers.f & C_FLAG) << 12) | (registers.a << 8) | value]
+        registers.a = packed >> 8
+        registers.f = packed & 0xff
+
     def sub(self, value : int) -> int:
-        result = Registers.a - value
-        if result & 0xff == 0x0:
-            Registers.set_z_flag()
-        else: 
-            Registers.reset_z_flag()
-        if (Registers.a ^ value ^ result) & 0x100 == 0x100:
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        if (Registers.a ^ value ^ result) & 0x10 == 0x10:
-            Registers.set_h_flag() 
-        else: 
-            Registers.reset_h_flag()
-        Registers.set_n_flag()
-        Registers.a = result & 0xff
+        registers = self.registers
+        packed = SUB[(registers.a << 8) | value]
+        registers.a = packed >> 8
+        registers.f = packed & 0xff
 
     def sbc(self, value : int) -> int:
-        carry = 1 if Registers.is_c_flag() else 0
-        result = Registers.a - value - carry
-        if result & 0xff == 0x0:
-            Registers.set_z_flag() 
-        else: 
-            Registers.reset_z_flag()
-        if result < 0x0:
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        if (Registers.a & 0xF) - (value & 0xF) - carry < 0: 
-            Registers.set_h_flag() 
-        else: 
-            Registers.reset_h_flag()
-        Registers.set_n_flag()
-        Registers.a = result & 0xff
+        registers = self.registers
+        packed = SUB[((registers.f & C_FLAG) << 12) | (registers.a << 8) | value]
+        registers.a = packed >> 8
+        registers.f = packed & 0xff
 
     def _and(self, value: int) -> int:
-        result = Registers.a & value
-        if result & 0xff == 0x0:
-            Registers.set_z_flag()
-        else: 
-            Registers.reset_z_flag()
-        Registers.reset_c_flag()
-        Registers.reset_n_flag()
-        Registers.set_h_flag()
-        Registers.a = result & 0xff
+        result = self.registers.a & value
+        self.registers.f = (0 if result else Z_FLAG) | H_FLAG
+        self.registers.a = result
 
     def _or(self, value : int) -> int:
-        result = Registers.a | value
-        if result & 0xff == 0x0:
-            Registers.set_z_flag()
-        else: 
-            Registers.reset_z_flag()
-        Registers.reset_c_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        Registers.a = result & 0xff
+        result = self.registers.a | value
+        self.registers.f = 0 if result else Z_FLAG
+        self.registers.a = result
 
     def xor(self, value: int) -> int:
-        result = Registers.a ^ value
-        if result & 0xff == 0x0:
-            Registers.set_z_flag()
-        else: 
-            Registers.reset_z_flag()
-        Registers.reset_c_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        Registers.a = result & 0xff
+        result = self.registers.a ^ value
+        self.registers.f = 0 if result else Z_FLAG
+        self.registers.a = result
 
     def cp(self, value: int):
-        result = Registers.a - value
-        if result & 0xff == 0x0:
-            Registers.set_z_flag()
-        else: 
-            Registers.reset_z_flag()
-        if Registers.a < value:
-            Registers.set_c_flag()
-        else: 
-            Registers.reset_c_flag()
-        if (result & 0xf) > (Registers.a & 0xf):
-            Registers.set_h_flag()
-        else: 
-            Registers.reset_h_flag()
-        Registers.set_n_flag()
+        self.registers.f = SUB[(self.registers.a << 8) | value] & 0xff
 
     def bit(self, pos : int, value : int) -> int:
-        bit = 1 if value & (1 << pos) else 0
-        if bit & 0xff == 0x0:
-            Registers.set_z_flag() 
-        else: 
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.set_h_flag()
+        self.registers.f = (self.registers.f & C_FLAG) | (0 if value & (1 << pos) else Z_FLAG) | H_FLAG
 
     def res(self, pos : int, value : int) -> int:
         return value & ((1 << pos) ^ 0xff)
 
     def swap(self, value : int) -> int:
-        value = ((value << 4) & 0xff) | (value >> 4)
-        if value & 0xff == 0x00:
-            Registers.set_z_flag() 
-        else: 
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        Registers.reset_c_flag()
-        return value
-
+        packed = SWAP[value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def inc_byte(self, value : int) -> int:
-        result = value + 1
-        if result & 0xff == 0x0:
-            Registers.set_z_flag() 
-        else: 
-            Registers.reset_z_flag()
-        if result & 0xf == 0x0:
-            Registers.set_h_flag() 
-        else: 
-            Registers.reset_h_flag()
-        Registers.reset_n_flag()
-        return result & 0xff
+        packed = INC[value]
+        self.registers.f = (self.registers.f & C_FLAG) | (packed & 0xff)
+        return packed >> 8
 
     def dec_byte(self, value : int) -> int:
-        result = value - 1
-        if result & 0xff == 0x0:
-            Registers.set_z_flag() 
-        else: 
-            Registers.reset_z_flag()
-        if result & 0xf == 0xf:
-            Registers.set_h_flag() 
-        else: 
-            Registers.reset_h_flag()
-        Registers.set_n_flag()
-        return result & 0xff
+        packed = DEC[value]
+        self.registers.f = (self.registers.f & C_FLAG) | (packed & 0xff)
+        return packed >> 8
 
     def rl(self, value : int) -> int:
-        carry = 1 if Registers.is_c_flag() else 0
-        if value & 0x80 == 0x80:
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        result = ((value << 1) & 0xff) + carry
-        if result & 0xFF == 0x0:
-            Registers.set_z_flag() 
-        else: 
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        return result
+        packed = RL[((self.registers.f & C_FLAG) << 4) | value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def rlc(self, value : int) -> int:
-        bit_out = 0x1 if value & 0x80 == 0x80 else 0x0
-        if bit_out == 0x1:
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        if ((value << 1) & 0xff) + bit_out == 0x00:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        return ((value << 1) & 0xff) + bit_out
+        packed = RLC[value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def rr(self, value : int) -> int:
-        carry = 0x80 if Registers.is_c_flag() else 0x0
-        if value & 0x1 == 0x1:
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        if (value >> 1) + carry == 0:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        return (value >> 1) + carry
+        packed = RR[((self.registers.f & C_FLAG) << 4) | value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def rrc(self, value : int) -> int:
-        bit_out = 0x80 if value & 0x1 == 0x1 else 0x0
-        if bit_out == 0x80:
-            Registers.set_c_flag() 
-        else: 
-            Registers.reset_c_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        if (value >> 1) + bit_out == 0:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        return (value >> 1) + bit_out
+        packed = RRC[value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def srl(self, value: int) -> int:
-        if value & 0x01 == 0x01:
-            Registers.set_c_flag()
-        else:
-            Registers.reset_c_flag()
-        temp = value >> 1
-        if temp == 0:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        return temp & 0xff
+        packed = SRL[value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def sra(self, value: int) -> int:
-        if value & 0x01 == 0x01:
-            Registers.set_c_flag()
-        else:
-            Registers.reset_c_flag()
-        temp = ( value >> 1 ) | ( value & 0x80 )
-        if temp == 0:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        return temp & 0xff
+        packed = SRA[value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
 
     def sla(self, value: int) -> int:
-        if value & 0x80 == 0x80:
-            Registers.set_c_flag()
-        else:
-            Registers.reset_c_flag()
-        temp = value << 1
-        if temp & 0xff == 0:
-            Registers.set_z_flag()
-        else:
-            Registers.reset_z_flag()
-        Registers.reset_n_flag()
-        Registers.reset_h_flag()
-        return temp & 0xff
+        packed = SLA[value]
+        self.registers.f = packed & 0xff
+        return packed >> 8
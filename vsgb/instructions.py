@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from vsgb.registers import Registers
+from vsgb.registers import Registers, Z_FLAG, N_FLAG, H_FLAG, C_FLAG
 from vsgb.byte_operations import signed_value, set_bit
 
 nop = lambda: 4
@@ -10,41 +10,20 @@ def invalid():
     raise RuntimeError()
 
 def inc_byte(operand: int) -> int:
-    result = getattr(Registers, operand) + 1
-    if result & 0xff == 0x0:
-        Registers.set_z_flag()
-    else:
-        Registers.reset_z_flag()
-    if result & 0xf == 0x0:
-        Registers.set_h_flag()
-    else:
-        Registers.reset_h_flag()
-    Registers.reset_n_flag()
-    setattr(Registers, operand, result & 0xff)
+    result = (getattr(Registers, operand) + 1) & 0xff
+    Registers.f = (Registers.f & C_FLAG) | (0 if result else Z_FLAG) | (0 if result & 0xf else H_FLAG)
+    setattr(Registers, operand, result)
     return 4
 
 def dec_byte(operand: int) -> int:
-    result = getattr(Registers, operand) - 1
-    if result & 0xff == 0x0:
-        Registers.set_z_flag()
-    else:
-        Registers.reset_z_flag()
-    if result & 0xf == 0xf:
-        Registers.set_h_flag()
-    else:
-        Registers.reset_h_flag()
-    Registers.set_n_flag()
-    setattr(Registers, operand, result & 0xff)
+    result = (getattr(Registers, operand) - 1) & 0xff
+    Registers.f = (Registers.f & C_FLAG) | (0 if result else Z_FLAG) | N_FLAG \
+        | (H_FLAG if result & 0xf == 0xf else 0)
+    setattr(Registers, operand, result)
     return 4
 
 def bit(pos: int, operand: int) -> int:
-    bit = 1 if getattr(Registers, operand) & (1 << pos) else 0
-    if bit & 0xff == 0x0:
-        Registers.set_z_flag()
-    else:
-        Registers.reset_z_flag()
-    Registers.reset_n_flag()
-    Registers.set_h_flag()
+    Registers.f = (Registers.f & C_FLAG) | (0 if getattr(Registers, operand) & (1 << pos) else Z_FLAG) | H_FLAG
     return 8
 
 def res(pos : int, operand : int) -> int:
@@ -56,29 +35,16 @@ def set_(pos : int, operand : int) -> int:
     return 8
 
 def ccf() -> int:
-    if Registers.is_c_flag():
-        Registers.reset_c_flag()
-    else:
-        Registers.set_c_flag()
-    Registers.reset_n_flag()
-    Registers.reset_h_flag()
+    Registers.f = (Registers.f & (Z_FLAG | C_FLAG)) ^ C_FLAG
     return 4
 
 def cp(operand: int):
-    result = Registers.a - getattr(Registers, operand)
-    if result & 0xff == 0x0:
-        Registers.set_z_flag()
-    else: 
-        Registers.reset_z_flag()
-    if Registers.a < getattr(Registers, operand):
-        Registers.set_c_flag()
-    else: 
-        Registers.reset_c_flag()
-    if (result & 0xf) > (Registers.a & 0xf):
-        Registers.set_h_flag()
-    else: 
-        Registers.reset_h_flag()
-    Registers.set_n_flag()
+    a = Registers.a
+    value = getattr(Registers, operand)
+    result = a - value
+    Registers.f = (0 if result & 0xff else Z_FLAG) | N_FLAG \
+        | (H_FLAG if (result & 0xf) > (a & 0xf) else 0) \
+        | (C_FLAG if a < value else 0)
 
 def ld_op_op(op1: int, op2: int) -> int:
     setattr(Registers, int, getattr(Registers, op2))
@@ -86,60 +52,33 @@ def ld_op_op(op1: int, op2: int) -> int:
 
 def _and(operand: int) -> int:
     result = Registers.a & getattr(Registers, operand)
-    if result & 0xff == 0x0:
-        Registers.set_z_flag()
-    else: 
-        Registers.reset_z_flag()
-    Registers.reset_c_flag()
-    Registers.reset_n_flag()
-    Registers.set_h_flag()
-    Registers.a = result & 0xff
+    Registers.f = (0 if result else Z_FLAG) | H_FLAG
+    Registers.a = result
     return 4
 
 def _or(operand : int) -> int:
     result = Registers.a | getattr(Registers, operand)
-    if result & 0xff == 0x0:
-        Registers.set_z_flag()
-    else: 
-        Registers.reset_z_flag()
-    Registers.reset_c_flag()
-    Registers.reset_n_flag()
-    Registers.reset_h_flag()
-    Registers.a = result & 0xff
+    Registers.f = 0 if result else Z_FLAG
+    Registers.a = result
     return 4
 
 def xor(operand: int) -> int:
     result = Registers.a ^ getattr(Registers, operand)
-    if result & 0xff == 0x0:
-        Registers.set_z_flag()
-    else: 
-        Registers.reset_z_flag()
-    Registers.reset_c_flag()
-    Registers.reset_n_flag()
-    Registers.reset_h_flag()
-    Registers.a = result & 0xff
+    Registers.f = 0 if result else Z_FLAG
+    Registers.a = result
     return 4
 
 def adc(operand : int) -> int:
-    carry = 1 if Registers.is_c_flag() else 0
-    result = Registers.a + getattr(Registers, operand) + carry
-    if result & 0xff == 0x0: 
-        Registers.set_z_flag()
-    else: 
-        Registers.reset_z_flag()
-    if result > 0xff: 
-        Registers.set_c_flag()
-    else: 
-        Registers.reset_c_flag()
-    if (Registers.a & 0xf) + (getattr(Registers, operand) & 0xf) + carry > 0xf: 
-        Registers.set_h_flag()
-    else: 
-        Registers.reset_h_flag()
-    Registers.reset_n_flag()
+    a = Registers.a
+    value = getattr(Registers, operand)
+    carry = (Registers.f & C_FLAG) >> 4
+    result = a + value + carry
+    Registers.f = (0 if result & 0xff else Z_FLAG) \
+        | (H_FLAG if (a & 0xf) + (value & 0xf) + carry > 0xf else 0) \
+        | (C_FLAG if result > 0xff else 0)
     Registers.a = result & 0xff
     return 4
 
-
 # 1 - mnemonic
 # 2 - extra bytes
 # 3 - function
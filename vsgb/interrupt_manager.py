@@ -3,43 +3,42 @@
 
 from enum import IntEnum
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
 from vsgb.io_registers import IO_Registers
 
-class InterruptManager:
+class InterruptManager(metaclass=InstanceProxy):
 
-    ie_register: int = 0xff
-    if_register: int = 0xff
+    __slots__ = ('ie_register', 'if_register')
 
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    def __init__(self):
+        self.ie_register = 0xff
+        self.if_register = 0xff
+
+    def accept(self, address: int) -> bool:
         return address in [
             IO_Registers.IE,
             IO_Registers.IF
         ]
 
-    @classmethod
-    def read(cls, address: int) -> int:
+    def read(self, address: int) -> int:
         if address == IO_Registers.IE:
-            return cls.ie_register
+            return self.ie_register
         if address == IO_Registers.IF:
-            return cls.if_register
+            return self.if_register
 
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
         if address == IO_Registers.IE:
-            cls.ie_register = value
+            self.ie_register = value
         elif address == IO_Registers.IF:
-            cls.if_register = value
+            self.if_register = value
 
 
-    @classmethod
-    def request_interrupt(cls, interrupt : int):
-        cls.if_register |= interrupt
+    def request_interrupt(self, interrupt : int):
+        self.if_register |= interrupt
 
-    @classmethod
-    def pending_interrupt(cls) -> int:
-        pending_interrupt = cls.ie_register & cls.if_register
+    def pending_interrupt(self) -> int:
+        pending_interrupt = self.ie_register & self.if_register
         if 0 == pending_interrupt & 0b00011111:
             return Interrupt.INTERRUPT_NONE # There are not pending interrupts skip test just leave
         if Interrupt.INTERRUPT_VBLANK & pending_interrupt:
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from vsgb.instance_proxy import InstanceProxy
+
 class IO_Registers:
 
     P1 = 0xff00 # Register for reading joy pad info and determining system type. (R/W)
@@ -76,7 +78,8 @@ class IO_Registers:
     OBPD = 0xff6b # CGB Mode Only - Sprite Palette Data
     SVBK = 0xff70 # CGB Mode Only - WRAM Bank
 
-    memory = [
+    # Power on values, every emulator works on its own copy (IO_Memory)
+    INITIAL_MEMORY = (
         #        0           1           2           3           4           5           6           7           8           9           A           B           C           D           E           F
         0b11000000, 0b01111110, 0b00000000, 0b11111111, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11100000, 
         0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 
@@ -86,12 +89,27 @@ class IO_Registers:
         0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b00000000, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 
         0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 
         0b11111000, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 0b11111111, 
-    ]
+    )
 
     @classmethod
     def read_value(cls, address: int) -> int:
-        return cls.memory[address - 0xff00]
+        return IO_Memory.read_value(address)
 
     @classmethod
     def write_value(cls,address: int, value: int):
-        cls.memory[address - 0xff00] = value
+        IO_Memory.write_value(address, value)
+
+class IO_Memory(metaclass=InstanceProxy):
+
+    # Backing store for the I/O registers that are not handled by a device
+
+    __slots__ = ('memory',)
+
+    def __init__(self):
+        self.memory = list(IO_Registers.INITIAL_MEMORY)
+
+    def read_value(self, address: int) -> int:
+        return self.memory[address - 0xff00]
+
+    def write_value(self, address: int, value: int):
+        self.memory[address - 0xff00] = value
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Guest RAM written since the last snapshot, tracked per 256 byte page.
+# The write handlers of VRAM, OAM, WRAM, HRAM and the cartridge RAM set a flag
+# for the page they write to, this gathers the flags of all of them.
+#
+# Several consumers can look at the written pages, each one through its own
+# view: a copy of the flags they collect into. Views are only updated when
+# read, the flags of the write handlers are then added to every view and
+# cleared. SaveStateManager has a view of its own, dirty(), bitmap() and
+# clear() without a view use the public one.
+
+class DirtyPages:
+
+    PAGE_SIZE = 0x100
+
+    __slots__ = ('mmu', 'views', 'public')
+
+    def __init__(self, mmu):
+        self.mmu = mmu
+        self.views = []
+        self.public = self.view()
+
+    def view(self) -> list:
+        # New view with every page marked, its flags per memory in regions()
+        # order
+        view = [bytearray(b'\x01' * len(flags)) for name, flags, banks in self.live_regions()]
+        self.views.append(view)
+        return view
+
+    def live_regions(self) -> list:
+        # (name, page flags, banks), flags are indexed by bank * pages per
+        # bank + page, in the order the memories are saved. These are the
+        # flags set by the write handlers.
+        mmu = self.mmu
+        return [
+            ('vram', mmu.ppu.vram_dirty, mmu.ppu.vram),
+            ('oam', mmu.ppu.oam_dirty, [mmu.ppu.oam]),
+            ('wram', mmu.wram.dirty, mmu.wram.ram),
+            ('hram', mmu.hram.dirty, [mmu.hram.ram]),
+            ('sram', mmu.rom.ram_dirty, [mmu.rom.ram])
+        ]
+
+    def collect(self):
+        # Adds the pages written since the last call to every view
+        for index, (name, flags, banks) in enumerate(self.live_regions()):
+            if flags.find(1) < 0:
+                continue
+            written = int.from_bytes(flags, 'little')
+            for view in self.views:
+                view[index][:] = (int.from_bytes(view[index], 'little') | written).to_bytes(len(flags), 'little')
+            flags[:] = bytes(len(flags))
+
+    def regions(self, view: list = None) -> list:
+        # Same as live_regions() with the flags of view
+        self.collect()
+        view = self.public if view is None else view
+        return [(name, flags, banks) for flags, (name, live, banks) in zip(view, self.live_regions())]
+
+    @staticmethod
+    def pages(flags) -> list:
+        # Indexes of the set flags
+        pages = []
+        page = flags.find(1)
+        while page >= 0:
+            pages.append(page)
+            page = flags.find(1, page + 1)
+        return pages
+
+    def dirty(self, view: list = None) -> list:
+        # Written pages as (memory name, bank, offset in the bank)
+        dirty = []
+        for name, flags, banks in self.regions(view):
+            bank_pages = len(flags) // len(banks)
+            for page in self.pages(flags):
+                bank, page = divmod(page, bank_pages)
+                dirty.append((name, bank, page * DirtyPages.PAGE_SIZE))
+        return dirty
+
+    def bitmap(self, view: list = None) -> int:
+        # Bit n is set when the nth page of the memories in regions() order
+        # was written
+        bitmap = 0
+        position = 0
+        for name, flags, banks in self.regions(view):
+            for page in self.pages(flags):
+                bitmap |= 1 << (position + page)
+            position += len(flags)
+        return bitmap
+
+    def clear(self, view: list = None):
+        # Only clears view, the other views keep their pages
+        self.collect()
+        for flags in self.public if view is None else view:
+            flags[:] = bytes(len(flags))
+
+    def mark_all(self):
+        # Memory was replaced as a whole, like when a save state is loaded
+        for name, flags, banks in self.live_regions():
+            flags[:] = b'\x01' * len(flags)
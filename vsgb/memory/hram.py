@@ -1,18 +1,22 @@
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
 
-class HighRam(AddressSpace):
+class HighRam(AddressSpace, metaclass=InstanceProxy):
 
-    ram = [0]*0x80
+    __slots__ = ('ram', 'dirty')
 
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    def __init__(self):
+        self.ram = bytearray(0x80)
+        # Set when written, HRAM is a single page
+        self.dirty = bytearray([1])
+
+    def accept(self, address: int) -> bool:
         return (0xff80 <= address < 0xffff)
 
-    @classmethod
-    def read(cls, address: int) -> int:
-        return cls.ram[address - 0xff80]
+    def read(self, address: int) -> int:
+        return self.ram[address - 0xff80]
 
 
-    @classmethod
-    def write(cls, address: int, value: int):
-        cls.ram[address - 0xff80] = value
\ No newline at end of file
+    def write(self, address: int, value: int):
+        self.ram[address - 0xff80] = value
+        self.dirty[0] = 1
\ No newline at end of file
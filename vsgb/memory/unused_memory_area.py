@@ -1,6 +1,7 @@
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
 
-class UnusedMemoryArea:
+class UnusedMemoryArea(metaclass=InstanceProxy):
 
     memory = (
         0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
@@ -11,19 +12,20 @@ class UnusedMemoryArea:
         0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F
     )
 
-    cgb = False
-    
+    __slots__ = ('cgb',)
+
+    def __init__(self, cgb: bool = False):
+        self.cgb = cgb
+
     @staticmethod
     def accept(address: int) -> bool:
         return (0xfea0 <= address < 0xff00)
 
-    @classmethod
-    def read(cls, address: int) -> int:
-        if cls.cgb:
-            return cls.ram[address - 0xfea0]
+    def read(self, address: int) -> int:
+        if self.cgb:
+            return self.ram[address - 0xfea0]
         return 0
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
         pass
 
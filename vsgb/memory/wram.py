@@ -1,39 +1,44 @@
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
 from vsgb.io_registers import IO_Registers
 
-class WorkRam(AddressSpace):
+class WorkRam(AddressSpace, metaclass=InstanceProxy):
 
-    ram = [[0x00]*0x1000, [0x00]*0x1000, [0x00]*0x1000, [0x00]*0x1000, [0x00]*0x1000, [0x00]*0x1000, [0x00]*0x1000, [0x00]*0x1000 ]
-    SVBK = 1
+    __slots__ = ('ram', 'SVBK', 'dirty')
 
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    def __init__(self):
+        self.ram = [bytearray(0x1000) for bank in range(8)]
+        self.SVBK = 1
+        # Written 256 byte pages, indexed by bank * 0x10 + page
+        self.dirty = bytearray([1]) * 0x80
+
+    def accept(self, address: int) -> bool:
         return (0xc000 <= address < 0xfe00) or (address == IO_Registers.SVBK)
 
-    @classmethod
-    def read(cls, address: int) -> int:
+    def read(self, address: int) -> int:
         if address == IO_Registers.SVBK:
-            return cls.SVBK
+            return self.SVBK
         if address >= 0xe000:
             address -= 0x2000
         if address < 0xd000:
-            return cls.ram[0][address - 0xc000]
-        if cls.SVBK == 0:
-            cls.SVBK = 1
-        return cls.ram[cls.SVBK][address - 0xd000]
+            return self.ram[0][address - 0xc000]
+        if self.SVBK == 0:
+            self.SVBK = 1
+        return self.ram[self.SVBK][address - 0xd000]
 
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
         if address == IO_Registers.SVBK:
-            cls.SVBK = value & 0b111
+            self.SVBK = value & 0b111
             return
         if address >= 0xe000:
             address -= 0x2000
         if address < 0xd000:
-            cls.ram[0][address - 0xc000] = value
+            self.ram[0][address - 0xc000] = value
+            self.dirty[(address - 0xc000) >> 8] = 1
         else:
-            if cls.SVBK == 0:
-                cls.SVBK = 1
-            cls.ram[cls.SVBK][address - 0xd000] = value
+            if self.SVBK == 0:
+                self.SVBK = 1
+            self.ram[self.SVBK][address - 0xd000] = value
+            self.dirty[(self.SVBK << 4) | ((address - 0xd000) >> 8)] = 1
 
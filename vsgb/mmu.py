@@ -7,15 +7,17 @@ from vsgb.apu import APU
 from vsgb.boot_rom import boot_rom, cgb_boot_rom
 from vsgb.cgb_palette import CGB_Palette
 from vsgb.input import Input
-from vsgb.io_registers import IO_Registers
+from vsgb.io_registers import IO_Memory, IO_Registers
 from vsgb.cartridge import CartridgeType
 from vsgb.game_shark import GameShark
 from vsgb.interrupt_manager import InterruptManager
 from vsgb.timer import Timer
 from vsgb.ppu import PPU
+from vsgb.serial import Serial
 from vsgb.memory.wram import WorkRam
 from vsgb.memory.unused_memory_area import UnusedMemoryArea
 from vsgb.memory.hram import HighRam
+from vsgb.memory.dirty_pages import DirtyPages
 
 from vsgb.address_space import AddressSpace
 
@@ -37,30 +39,52 @@ from vsgb.address_space import AddressSpace
 # FFFF  FFFF    Interrupts Enable Register (IE) 	
 class MMU(AddressSpace):
 
-    spaces: list = [
-        InterruptManager,
-        HighRam,
-        Timer,
-        Input,
-        WorkRam,
-        PPU,
-        UnusedMemoryArea
-    ]
-
+    # Most recently created MMU, kept for code that still uses MMU.read/MMU.write
     mmu = None
 
     def __init__(self, rom : CartridgeType, apu: APU, cgb_mode: bool):
         self.rom = rom
         self.apu = apu
+        self.dma = None
+        self.hdma = None
         self.bootstrap_enabled = True
-        UnusedMemoryArea.cgb= cgb_mode
         self.cgb_mode = cgb_mode
+        self.interrupt_manager = InterruptManager()
+        self.io_memory = IO_Memory()
+        self.hram = HighRam()
+        self.timer = Timer(self.interrupt_manager)
+        self.serial = Serial(self.interrupt_manager, cgb_mode)
+        self.input = Input()
+        self.wram = WorkRam()
+        self.ppu = PPU(self.interrupt_manager, cgb_mode)
+        self.ppu.mmu = self
+        self.unused_memory_area = UnusedMemoryArea(cgb_mode)
+        self.spaces = [
+            self.interrupt_manager,
+            self.hram,
+            self.timer,
+            self.serial,
+            self.input,
+            self.wram,
+            self.ppu,
+            self.unused_memory_area
+        ]
+        # RAM pages written since the last save state snapshot
+        self.dirty_pages = DirtyPages(self)
         self.cgb_palette = CGB_Palette()
         if self.cgb_mode:
             self.boot_rom  = cgb_boot_rom
         else:
             self.boot_rom  = boot_rom
         self.game_shark = GameShark()
+        # Handler tables indexed by the high byte of the address, the I/O page
+        # (FF00-FFFF) has its own table indexed by the low byte
+        self.read_table = [None]*0x100
+        self.write_table = [None]*0x100
+        self.io_read_table = [None]*0x100
+        self.io_write_table = [None]*0x100
+        self.cheat_read_table = [None]*0x100
+        self.build_memory_map()
         MMU.mmu = self
 
     def set_dma(self, dma):
@@ -68,54 +92,120 @@ class MMU(AddressSpace):
 
     def set_hdma(self, hdma):
         self.hdma = hdma
-        
+
+    def build_memory_map(self):
+        self.map_pages(0xa0, 0xc0, self.read_external_ram, self.rom.write_external_ram_byte)
+        self.map_pages(0x80, 0xa0, self.ppu.read, self.ppu.write)
+        self.map_pages(0xc0, 0xfe, self.wram.read, self.wram.write)
+        self.map_pages(0xfe, 0xff, self.read_oam_page, self.write_oam_page)
+        self.map_pages(0xff, 0x100, self.read_io, self.write_io)
+        self.map_io_registers()
+        self.map_rom()
+
+    def map_pages(self, start: int, end: int, read, write):
+        for page in range(start, end):
+            self.read_table[page] = read
+            self.write_table[page] = write
+
+    def map_rom(self):
+        # Must be called again whenever the boot rom gets unmapped
+        self.map_pages(0x00, 0x40, self.rom.read_rom_byte, self.rom.write_rom_byte)
+        # Switchable bank, reads go straight to the active bank view
+        self.map_pages(0x40, 0x80, self.rom.read_rom_bank, self.rom.write_rom_byte)
+        if self.bootstrap_enabled:
+            self.read_table[0x00] = self.read_boot_rom
+            if self.cgb_mode:
+                for page in range(0x02, 0x09):
+                    self.read_table[page] = self.read_boot_rom
+        self.map_cheats()
+
+    def map_cheats(self):
+        # Cheats only patch cartridge reads (ROM and external RAM)
+        if not self.game_shark.cheats_enabled:
+            return
+        for address in self.game_shark.cheats:
+            page = address >> 8
+            if page < 0x80 or 0xa0 <= page < 0xc0:
+                if self.read_table[page] != self.read_cheat:
+                    self.cheat_read_table[page] = self.read_table[page]
+                    self.read_table[page] = self.read_cheat
+
+    def map_io_registers(self):
+        for address in range(0xff00, 0x10000):
+            read = self.read_io_register
+            write = self.write_io_register
+            if address in self.apu.registers:
+                read = self.read_apu_register
+                write = self.apu.write_register
+            for space in self.spaces:
+                if space.accept(address):
+                    read = space.read
+                    write = space.write
+                    break
+            self.io_read_table[address - 0xff00] = read
+            self.io_write_table[address - 0xff00] = write
+        self.io_write_table[IO_Registers.DMA - 0xff00] = self.write_dma
+        self.io_write_table[IO_Registers.HDMA5 - 0xff00] = self.write_hdma
+        self.io_write_table[0xff50 - 0xff00] = self.write_boot_rom_disable
+
     def read_byte(self, address: int) -> int:
-        for space in MMU.spaces:
-            if space.accept(address):
-                return space.read(address)
+        address &= 0xffff
+        return self.read_table[address >> 8](address)
 
-        if self.game_shark.cheats_enabled and (address in self.game_shark.cheats):
+    def write_byte(self, address : int, value : int, hardware_operation : bool = False):
+        address &= 0xffff
+        if hardware_operation and 0xff00 <= address < 0xff80:
+            self.io_memory.write_value(address, value & 0xff)
+            return
+        self.write_table[address >> 8](address, value & 0xff)
+
+    def read_boot_rom(self, address: int) -> int:
+        return self.boot_rom[address] & 0xff
+
+    def read_cheat(self, address: int) -> int:
+        if address in self.game_shark.cheats:
             return self.game_shark.cheats[address]
+        return self.cheat_read_table[address >> 8](address)
 
-        if 0 <= address < 0x8000:
-            if self.bootstrap_enabled and ((0 <= address <= 0xff) or (0x0200 <= address <= 0x08ff)):
-                return self.boot_rom[address] & 0xff
-            return self.rom.read_rom_byte(address)
-        if 0xa000 <= address < 0xc000:
-            return self.rom.read_external_ram_byte(address) & 0xff
-        if 0xff00 <= address < 0xff80:
-            if address in self.apu.registers:
-                return self.apu.read_register(address) & 0xff
-            return IO_Registers.read_value(address) & 0xff
-        return 0xff
+    def read_external_ram(self, address: int) -> int:
+        return self.rom.read_external_ram_byte(address) & 0xff
 
-    def write_byte(self, address : int, value : int, hardware_operation : bool = False):
-        value = value & 0xff
-        for space in MMU.spaces:
-            if space.accept(address):
-                space.write(address, value)
-                break
-
-        if 0 <= address < 0x8000:
-            self.rom.write_rom_byte(address, value)
-        elif 0xa000 <= address < 0xc000:
-            self.rom.write_external_ram_byte(address, value)
-        elif 0xff00 <= address < 0xff80:
-            if not hardware_operation:
-                if address == IO_Registers.DMA: # Start dma transfer
-                    self.dma.request_dma_transfer(value)
-                elif address == IO_Registers.HDMA5: # Start hdma transfer
-                    self.hdma.request_hdma_transfer(value)
-                elif address == 0xff50:
-                    self.bootstrap_enabled = False
-                    print('Boot rom disabled. Starting rom...')
-                elif address in self.apu.registers:
-                    self.apu.write_register(address, value)
-                else:
-                    IO_Registers.write_value(address,value)
-            else:     
-                IO_Registers.write_value(address,value)
+    def read_oam_page(self, address: int) -> int:
+        if address < 0xfea0:
+            return self.ppu.read(address)
+        return self.unused_memory_area.read(address)
+
+    def write_oam_page(self, address: int, value: int):
+        if address < 0xfea0:
+            self.ppu.write(address, value)
+
+    def read_io(self, address: int) -> int:
+        return self.io_read_table[address - 0xff00](address)
+
+    def write_io(self, address: int, value: int):
+        self.io_write_table[address - 0xff00](address, value)
+
+    def read_io_register(self, address: int) -> int:
+        return self.io_memory.read_value(address) & 0xff
+
+    def write_io_register(self, address: int, value: int):
+        self.io_memory.write_value(address, value)
+
+    def read_apu_register(self, address: int) -> int:
+        return self.apu.read_register(address) & 0xff
+
+    def write_dma(self, address: int, value: int):
+        # Start dma transfer
+        self.dma.request_dma_transfer(value)
+
+    def write_hdma(self, address: int, value: int):
+        # Start hdma transfer
+        self.hdma.request_hdma_transfer(value)
 
+    def write_boot_rom_disable(self, address: int, value: int):
+        self.bootstrap_enabled = False
+        self.map_rom()
+        print('Boot rom disabled. Starting rom...')
 
     def read_word(self, address: int) -> int:
         return (self.read_byte(address) | (self.read_byte(address + 1) << 8)) & 0xffff
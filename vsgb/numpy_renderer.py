@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# NumPy backend for the PPU renderer. Scanlines are queued together with the
+# registers they are drawn with and rendered in one batch at VBlank, or as
+# soon as VRAM, OAM or the framebuffer are touched, so the pixels are the
+# same the per pixel renderer of vsgb.ppu draws.
+
+import numpy
+
+
+class NumpyRenderer:
+
+    SHADES = numpy.array((0x7fff, 0x421f, 0x1cf2, 0x0000), dtype=numpy.uint32)
+    SPRITE_SHADES = numpy.array((0x7fff, 0x1bef, 0x0200, 0x0000), dtype=numpy.uint32)
+    PIXELS = numpy.arange(8)
+
+    __slots__ = ('ppu', 'lines', 'columns', 'tiles')
+
+    def __init__(self, ppu):
+        self.ppu = ppu
+        # (line, lcdc, scx, scy, bgp, obp0, obp1, wx, window line or -1, cgb colors)
+        self.lines = []
+        self.columns = numpy.arange(ppu.SCREEN_WIDTH)
+        # Decoded tile data, None when VRAM tile data was written since
+        self.tiles = None
+        ppu.framebuffer = numpy.full(ppu.FRAMEBUFFER_SIZE, 0xffffffff, dtype=numpy.uint32)
+        ppu.original_color = numpy.zeros(ppu.FRAMEBUFFER_SIZE, dtype=numpy.uint8)
+        ppu.bg_priority = numpy.zeros(ppu.FRAMEBUFFER_SIZE, dtype=bool)
+
+    def scanline(self, line: int):
+        ppu = self.ppu
+        lcdc = ppu.lcdc
+        window_line = -1
+        if ppu.window_line <= 143 and lcdc & 0b00100000 \
+            and ppu.wx - 7 <= 159 and ppu.wy <= 143 and ppu.wy <= line:
+            window_line = ppu.window_line
+            ppu.window_line += 1
+        cgb_colors = ppu.cgb_mode and (ppu.mmu.bootstrap_enabled or ppu.mmu.rom.is_cgb())
+        self.lines.append((line, lcdc, ppu.scx, ppu.scy, ppu.bgp, ppu.obp0, ppu.obp1, ppu.wx, window_line, cgb_colors))
+
+    def flush(self):
+        if not self.lines:
+            return
+        state = numpy.array(self.lines, dtype=numpy.intp)
+        self.lines = []
+        ppu = self.ppu
+        height = ppu.SCREEN_HEIGHT
+        width = ppu.SCREEN_WIDTH
+        vram = (numpy.frombuffer(ppu.vram[0], dtype=numpy.uint8), numpy.frombuffer(ppu.vram[1], dtype=numpy.uint8))
+        if self.tiles is None:
+            self.tiles = self.decode_tiles(vram)
+        tiles = self.tiles
+        framebuffer = ppu.framebuffer.reshape(height, width)
+        original_color = ppu.original_color.reshape(height, width)
+        bg_priority = ppu.bg_priority.reshape(height, width)
+        rows = height - 1 - state[:, 0]
+        lcdc = state[:, 1]
+        if ppu.cgb_mode:
+            cgb_palette = ppu.mmu.cgb_palette
+            bg_palettes = numpy.array(cgb_palette.bg_rgba, dtype=numpy.uint32).reshape(32)
+            ob_palettes = numpy.array(cgb_palette.ob_rgba, dtype=numpy.uint32).reshape(32)
+
+        # Background
+        enabled = lcdc & 0b00000001 != 0
+        framebuffer[rows[~enabled]] = self.SHADES[0]
+        original_color[rows[~enabled]] = 0
+        lines = enabled.nonzero()[0]
+        if lines.size:
+            line_adjusted = (state[lines, 0] + state[lines, 3]) & 0xff
+            x = (self.columns + state[lines, 2, None]) & 0xff
+            map_select = numpy.where(lcdc[lines] & 0b00001000, 0x1c00, 0x1800)
+            address = (map_select + (line_adjusted >> 3) * 32)[:, None] + (x >> 3)
+            # CGB attributes are taken from bank 0 like the per pixel renderer
+            pixels, attributes = self.tile_pixels(vram, tiles, address, lcdc[lines], (line_adjusted & 7)[:, None], x & 7, 0)
+            colors = (state[lines, 4, None] >> (pixels * 2)) & 0x3
+            framebuffer[rows[lines]] = self.SHADES[colors]
+            original_color[rows[lines]] = colors
+            if ppu.cgb_mode:
+                bg_priority[rows[lines]] = attributes & 0b10000000 != 0
+
+        # Window
+        lines = (state[:, 8] >= 0).nonzero()[0]
+        if lines.size:
+            window_line = state[lines, 8]
+            x = self.columns - (state[lines, 7, None] - 7)
+            visible = x >= 0
+            x = numpy.maximum(x, 0)
+            map_select = numpy.where(lcdc[lines] & 0b01000000, 0x1c00, 0x1800)
+            address = (map_select + (window_line >> 3) * 32)[:, None] + (x >> 3)
+            pixels, attributes = self.tile_pixels(vram, tiles, address, lcdc[lines], (window_line & 7)[:, None], x & 7, 1)
+            colors = (state[lines, 4, None] >> (pixels * 2)) & 0x3
+            window_rows = rows[lines]
+            if not ppu.cgb_mode:
+                shades = self.SHADES[colors]
+            else:
+                colors = numpy.where(state[lines, 9, None] != 0, pixels, colors)
+                shades = bg_palettes[(attributes & 0b00000111) * 4 + colors]
+                bg_priority[window_rows] = numpy.where(visible, attributes & 0b10000000 != 0, bg_priority[window_rows])
+            framebuffer[window_rows] = numpy.where(visible, shades, framebuffer[window_rows])
+            original_color[window_rows] = numpy.where(visible, colors, original_color[window_rows])
+
+        # Sprites
+        lines = (lcdc & 0b00000010 != 0).nonzero()[0]
+        if not lines.size:
+            return
+        line = state[lines, 0]
+        sprite_rows = rows[lines]
+        sprite_size = numpy.where(lcdc[lines] & 0b00000100, 16, 8)
+        oam = ppu.oam
+        sprite_y = numpy.frombuffer(oam, dtype=numpy.uint8)[0::4, None].astype(numpy.intp) - 16
+        visible = (sprite_y <= line) & (line < sprite_y + sprite_size)
+        # Only the first 10 sprites of each line in OAM order are shown
+        visible &= visible.cumsum(axis=0) <= ppu.MAX_SPRITES_PER_LINE
+        sprites = visible.any(axis=1).nonzero()[0].tolist()
+        if not ppu.cgb_mode:
+            # Non CGB mode, the sprite with the smaller X is on top
+            sprites.sort(key=lambda sprite: oam[sprite * 4 + 1])
+        for sprite in reversed(sprites):
+            sprite_offset = sprite * 4
+            sprite_x = oam[sprite_offset + 1] - 8
+            if sprite_x < -7 or sprite_x >= width:
+                continue
+            sprite_y = oam[sprite_offset] - 16
+            hits = visible[sprite].nonzero()[0]
+            flags = oam[sprite_offset + 3]
+            size = sprite_size[hits]
+            pixel_y = line[hits] - sprite_y
+            if flags & 0b01000000:
+                pixel_y = size - 1 - pixel_y
+            # 8x16 sprites continue on the next tile
+            index = numpy.where(size == 16, oam[sprite_offset + 2] & 0xfe, oam[sprite_offset + 2]) * 8 + pixel_y
+            columns = sprite_x + self.PIXELS
+            pixel_x = self.PIXELS[::-1] if flags & 0b00100000 else self.PIXELS
+            on_screen = (columns >= 0) & (columns < width)
+            columns = columns[on_screen]
+            pixels = tiles[(flags >> 3) & 1, index[:, None], pixel_x[on_screen]]
+            target = (sprite_rows[hits, None], columns)
+            background = original_color[target]
+            draw = pixels != 0
+            if flags & 0b10000000:
+                draw &= background == 0
+            if ppu.cgb_mode:
+                draw &= ~bg_priority[target] | (background == 0)
+            palette = state[lines[hits], 6 if flags & 0b00010000 else 5]
+            colors = (palette[:, None] >> (pixels * 2)) & 0x3
+            if not ppu.cgb_mode:
+                shades = self.SPRITE_SHADES[colors]
+            else:
+                colors = numpy.where(state[lines[hits], 9, None] != 0, pixels, colors)
+                shades = ob_palettes[(flags & 0b00000111) * 4 + colors]
+            framebuffer[target] = numpy.where(draw, shades, framebuffer[target])
+
+    @staticmethod
+    def decode_tiles(vram: tuple):
+        # Color indices of the 384 tiles of both banks, indexed by bank, tile
+        # data address / 2 and pixel
+        data = numpy.stack((vram[0][:0x1800], vram[1][:0x1800])).reshape(2, 0xc00, 2)
+        bits = numpy.unpackbits(data, axis=2)
+        return bits[:, :, :8] | (bits[:, :, 8:] << 1)
+
+    def tile_pixels(self, vram: tuple, tiles, address, lcdc, tile_line, pixel_x, attribute_bank: int) -> tuple:
+        tile = vram[0][address].astype(numpy.intp)
+        # 0x8800 addressing uses signed tile numbers
+        index = numpy.where(lcdc[:, None] & 0b00010000, tile * 8, 0x400 + (tile ^ 0x80) * 8)
+        if not self.ppu.cgb_mode:
+            return tiles[0, index + tile_line, pixel_x], None
+        attributes = vram[attribute_bank][address]
+        index += numpy.where(attributes & 0b01000000, 7 - tile_line, tile_line)
+        pixel_x = numpy.where(attributes & 0b00100000, 7 - pixel_x, pixel_x)
+        return tiles[(attributes >> 3) & 1, index, pixel_x], attributes
@@ -4,17 +4,26 @@
 # Documentation source:
 # - https://gbdev.gg8.se/wiki/articles/Video_Display
 
-from vsgb.byte_operations import signed_value, flip_byte, check_bit
+from bisect import insort
+
+from vsgb.byte_operations import signed_value, check_bit
 from vsgb.interrupt_manager import Interrupt, InterruptManager
 from vsgb.io_registers import IO_Registers
-from vsgb.window import Window
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
+
+try:
+    from vsgb.numpy_renderer import NumpyRenderer
+except ImportError:
+    NumpyRenderer = None
 
 
-class PPU(AddressSpace):
+class PPU(AddressSpace, metaclass=InstanceProxy):
 
     #Consts
-    FRAMEBUFFER_SIZE: int    = Window.SCREEN_WIDTH * Window.SCREEN_HEIGHT
+    SCREEN_WIDTH: int        = 160
+    SCREEN_HEIGHT: int       = 144
+    FRAMEBUFFER_SIZE: int    = SCREEN_WIDTH * SCREEN_HEIGHT
     H_BLANK_STATE: int       = 0
     V_BLANK_STATE: int       = 1
     OAM_READ_STATE: int      = 2
@@ -23,39 +32,80 @@ class PPU(AddressSpace):
     VRAM_SCANLINE_TIME: int  = 172
     H_BLANK_TIME: int        = 204
     V_BLANK_TIME: int        = 4560
-
-    #Vars
-    #framebuffer: list        = [0xffffffff]*FRAMEBUFFER_SIZE
-    original_color: list     = [0]*FRAMEBUFFER_SIZE
-    bg_priority: list        = [False]*FRAMEBUFFER_SIZE
-    mode: int                = V_BLANK_STATE
-    modeclock: int           = 0
-    vblank_line: int         = 0
-    auxillary_modeclock: int = 0
-    screen_enabled: bool     = True
-    window_line: int         = 0   
-    cgb_mode: bool           = False 
-
-    # Registers
-    ly: int   = 0
-    stat: int = 0
-    lyc: int  = 0
-    scx: int  = 0
-    scy: int  = 0
-    bgp: int  = 0
-    wx: int   = 0
-    wy: int   = 0
-    lcdc: int = 0
-    obp0: int = 0
-    obp1: int = 0
-    vbk: int  = 0
-
-    # Memory
-    vram: list = [[0]*0x2000,[0]*0x2000]
-    oam: list = [0]*0xa0
-
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    FRAME_TIME: int          = 70224
+    TILE_ROW_FLIP: int       = 0x1000
+    SHADES: tuple            = (0x7fff, 0x421f, 0x1cf2, 0x0000)
+    SPRITE_SHADES: tuple     = (0x7fff, 0x1bef, 0x0200, 0x0000)
+    MAX_SPRITES_PER_LINE: int = 10
+
+    __slots__ = (
+        'interrupt_manager', 'mmu', 'framebuffer', 'refresh', 'original_color',
+        'bg_priority', 'mode', 'vblank_line', 'screen_enabled', 'window_line',
+        'cgb_mode', 'hdma', 'scheduler', 'mode_event', 'mode_event_time',
+        'lcd_event', 'frames', 'ly', 'stat', 'STAT', 'lyc', 'scx', 'scy', 'bgp', 'wx',
+        'wy', 'lcdc', 'obp0', 'obp1', 'vbk', 'vram', 'oam', 'vram_dirty', 'oam_dirty', 'tile_rows', 'renderer',
+        'bg_colors', 'bg_shades', 'ob_colors', 'ob_shades', 'sprite_size',
+        'line_sprites'
+    )
+
+    def __init__(self, interrupt_manager: InterruptManager, cgb_mode: bool = False):
+        self.interrupt_manager = interrupt_manager
+        self.mmu = None
+
+        #Vars
+        self.framebuffer = [0xffffffff]*self.FRAMEBUFFER_SIZE
+        self.refresh = False
+        self.original_color = [0]*self.FRAMEBUFFER_SIZE
+        self.bg_priority = [False]*self.FRAMEBUFFER_SIZE
+        self.mode = self.V_BLANK_STATE
+        self.vblank_line = 0
+        self.screen_enabled = True
+        self.window_line = 0
+        self.cgb_mode = cgb_mode
+        self.hdma = None
+
+        # Scheduling
+        self.scheduler = None
+        self.mode_event = None
+        self.mode_event_time = 0
+        self.lcd_event = None
+        # Completed frames, counted at VBlank or every FRAME_TIME while the
+        # LCD is off
+        self.frames = 0
+
+        # Registers
+        self.ly = 0
+        self.stat = 0
+        self.STAT = 0
+        self.lyc = 0
+        self.scx = 0
+        self.scy = 0
+        self.bgp = 0
+        self.wx = 0
+        self.wy = 0
+        self.lcdc = 0
+        self.obp0 = 0
+        self.obp1 = 0
+        self.vbk = 0
+        self.update_palettes()
+
+        # Memory
+        self.vram = [bytearray(0x2000), bytearray(0x2000)]
+        self.oam = bytearray(0xa0)
+        # Written 256 byte pages, VRAM ones indexed by bank * 0x20 + page
+        self.vram_dirty = bytearray([1]) * 0x40
+        self.oam_dirty = bytearray([1])
+        # Decoded rows of the 384 tiles of each bank, indexed by tile data
+        # address / 2. None means the row has to be decoded again.
+        self.tile_rows = [[None]*0x2000, [None]*0x2000]
+        # OAM indices of the sprites covering each line, in OAM order
+        self.sprite_size = LCDControlRegister.sprite_size(self.lcdc)
+        self.index_sprites()
+
+        # Scanlines are drawn by NumPy when it is available
+        self.renderer = NumpyRenderer(self) if NumpyRenderer is not None else None
+
+    def accept(self, address: int) -> bool:
         # 0x8000 <= address < 0xa0000 -> ((address >> 8) & 0b11100000 == 0b10000000)
         return (address  & 0b11100000_00000000 == 0b10000000_00000000) or (0xfe00 <= address < 0xfea0) or (address in [
             IO_Registers.LY,
@@ -72,169 +122,235 @@ class PPU(AddressSpace):
             IO_Registers.VBK
         ])
 
-    @classmethod
-    def read(cls, address: int) -> int:
+    def read(self, address: int) -> int:
         if 0x8000 <= address < 0xa000:
-            return cls.vram[cls.vbk][address - 0x8000]
+            return self.vram[self.vbk][address - 0x8000]
         if 0xfe00 <= address < 0xfea0:
-            return cls.oam[address - 0xfe00]
+            return self.oam[address - 0xfe00]
         if address == IO_Registers.LY:
-            return cls.ly
+            return self.ly
         if address == IO_Registers.STAT:
-            return cls.stat
+            return self.stat
         if address == IO_Registers.LYC:
-            return cls.lyc
+            return self.lyc
         if address == IO_Registers.SCX:
-            return cls.scx
+            return self.scx
         if address == IO_Registers.SCY:
-            return cls.scy
+            return self.scy
         if address == IO_Registers.BGP:
-            return cls.bgp
+            return self.bgp
         if address == IO_Registers.WX:
-            return cls.wx
+            return self.wx
         if address == IO_Registers.WY:
-            return cls.wy
+            return self.wy
         if address == IO_Registers.LCDC:
-            return cls.lcdc
+            return self.lcdc
         if address == IO_Registers.OBP0:
-            return cls.obp0
+            return self.obp0
         if address == IO_Registers.OBP1:
-            return cls.obp1
+            return self.obp1
         if address == IO_Registers.VBK:
-            return cls.vbk
+            return self.vbk
 
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
+        if self.renderer is not None and self.renderer.lines and (0x8000 <= address < 0xa000 or 0xfe00 <= address < 0xfea0):
+            self.renderer.flush()
         if 0x8000 <= address < 0xa000:
-            cls.vram[cls.vbk][address - 0x8000] = value
+            self.vram[self.vbk][address - 0x8000] = value
+            self.vram_dirty[(self.vbk << 5) | ((address - 0x8000) >> 8)] = 1
+            if address < 0x9800:
+                index = (address - 0x8000) >> 1
+                rows = self.tile_rows[self.vbk]
+                rows[index] = None
+                rows[index | self.TILE_ROW_FLIP] = None
+                if self.renderer is not None:
+                    self.renderer.tiles = None
         elif 0xfe00 <= address < 0xfea0:
-            cls.oam[address - 0xfe00] = value
+            self.oam_dirty[0] = 1
+            if address & 0b11 == 0 and self.oam[address - 0xfe00] != value:
+                # Y position, move the sprite to the lines it covers now
+                sprite = (address - 0xfe00) >> 2
+                self.remove_sprite(sprite)
+                self.oam[address - 0xfe00] = value
+                self.add_sprite(sprite)
+            else:
+                self.oam[address - 0xfe00] = value
         elif address == IO_Registers.LY:
-            cls.ly = value
+            self.ly = value
         elif address == IO_Registers.STAT:
-            cls.stat = value
+            self.stat = value
         elif address == IO_Registers.LYC:
-            cls.lyc = value
+            self.lyc = value
         elif address == IO_Registers.SCX:
-            cls.scx = value
+            self.scx = value
         elif address == IO_Registers.SCY:
-            cls.scy = value
+            self.scy = value
         elif address == IO_Registers.BGP:
-            cls.bgp = value
+            self.bgp = value
+            self.update_palettes()
         elif address == IO_Registers.WX:
-            cls.wx = value
+            self.wx = value
         elif address == IO_Registers.WY:
-            cls.wy = value
+            self.wy = value
         elif address == IO_Registers.LCDC:
-            cls.lcdc = value
+            self.lcdc = value
+            if LCDControlRegister.sprite_size(value) != self.sprite_size:
+                self.sprite_size = LCDControlRegister.sprite_size(value)
+                self.index_sprites()
+            if self.lcd_event is None and bool(LCDControlRegister.lcd_display_enable(value)) != self.screen_enabled:
+                # LCD is switched on/off once the current instruction is done
+                self.lcd_event = self.scheduler.schedule(self.scheduler.now, self.switch_lcd)
         elif address == IO_Registers.OBP0:
-            cls.obp0 = value
+            self.obp0 = value
+            self.update_palettes()
         elif address == IO_Registers.OBP1:
-            cls.obp1 = value
+            self.obp1 = value
+            self.update_palettes()
         elif address == IO_Registers.VBK:
-            cls.vbk = value & 1
-
-    @staticmethod
-    def check_stat(old: int, new: int):
+            self.vbk = value & 1
+
+    def index_sprites(self):
+        self.line_sprites = [[] for line in range(0x100)]
+        for sprite in range(40):
+            self.add_sprite(sprite)
+
+    def sprite_lines(self, sprite: int) -> range:
+        sprite_y = self.oam[sprite * 4] - 16
+        return range(max(sprite_y, 0), sprite_y + self.sprite_size)
+
+    def add_sprite(self, sprite: int):
+        for line in self.sprite_lines(sprite):
+            insort(self.line_sprites[line], sprite)
+
+    def remove_sprite(self, sprite: int):
+        for line in self.sprite_lines(sprite):
+            self.line_sprites[line].remove(sprite)
+
+    def update_palettes(self):
+        # Color index -> color and color index -> RGB555 tables of BGP, OBP0
+        # and OBP1, only rebuilt when one of the registers is written
+        self.bg_colors = tuple((self.bgp >> (pixel * 2)) & 0x3 for pixel in range(4))
+        self.bg_shades = tuple(self.SHADES[color] for color in self.bg_colors)
+        self.ob_colors = []
+        self.ob_shades = []
+        for palette in (self.obp0, self.obp1):
+            colors = tuple((palette >> (pixel * 2)) & 0x3 for pixel in range(4))
+            self.ob_colors.append(colors)
+            self.ob_shades.append(tuple(self.SPRITE_SHADES[color] for color in colors))
+
+    def check_stat(self, old: int, new: int):
 
         if (new & 0b01000100) & ((~old) & 0b01000100):
         #if (new & 0b01000100):
-            InterruptManager.request_interrupt(Interrupt.INTERRUPT_LCDSTAT)
+            self.interrupt_manager.request_interrupt(Interrupt.INTERRUPT_LCDSTAT)
             return
 
         for i in range(3):
             #if (new & (1 << (3+i))) & ((~old) & (1 << (3+i))) and i == (new & 0b11):
             if (new & (1 << (3+i))) and i == (new & 0b11):
-                InterruptManager.request_interrupt(Interrupt.INTERRUPT_LCDSTAT)
+                self.interrupt_manager.request_interrupt(Interrupt.INTERRUPT_LCDSTAT)
                 return     
 
-    @classmethod
-    def step(cls, cycles : int = 1):
-        cls.modeclock += cycles
-        cls.auxillary_modeclock += cycles
-        if LCDControlRegister.lcd_display_enable(cls.lcdc):
-            if cls.screen_enabled:
-                if cls.mode == cls.H_BLANK_STATE:
-                    if cls.modeclock >= cls.H_BLANK_TIME:
-                        cls.exec_hblank()
-                        Window.refresh = True
-                elif cls.mode == cls.V_BLANK_STATE:
-                    cls.exec_vblank()
-                elif cls.mode == cls.OAM_READ_STATE:
-                    if cls.modeclock >= cls.OAM_SCANLINE_TIME:
-                        cls.exec_oam()
-                elif cls.mode == cls.VMRAM_READ_STATE:
-                    if cls.modeclock >= cls.VRAM_SCANLINE_TIME:
-                        cls.exec_vram()
-                
-            else:
-                cls.screen_enabled = True
-                cls.modeclock = 0
-                cls.mode = 0
-                cls.auxillary_modeclock = 0
-                cls.window_line = 0
-                cls.ly = 0
-                cls.update_stat_mode()
-                cls.compare_lylc()
-        else:
-            cls.screen_enabled = False
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
+        self.lcd_event = scheduler.schedule(scheduler.now, self.switch_lcd)
+        if self.screen_enabled:
+            self.mode_event_time = scheduler.now
+            self.enter_vblank()
+
+    def schedule_mode_event(self, cycles: int, callback):
+        # Mode changes are chained from the ideal time of the previous one
+        self.mode_event_time += cycles
+        self.mode_event = self.scheduler.schedule(self.mode_event_time, callback)
+
+    def switch_lcd(self):
+        self.lcd_event = None
+        if LCDControlRegister.lcd_display_enable(self.lcdc):
+            if not self.screen_enabled:
+                self.screen_enabled = True
+                self.scheduler.cancel(self.mode_event)
+                self.mode = 0
+                self.window_line = 0
+                self.ly = 0
+                self.update_stat_mode()
+                self.compare_lylc()
+                self.mode_event_time = self.scheduler.now
+                self.schedule_mode_event(self.H_BLANK_TIME, self.exec_hblank)
+        elif self.screen_enabled:
+            self.screen_enabled = False
+            self.flush()
+            self.scheduler.cancel(self.mode_event)
+            self.mode_event_time = self.scheduler.now
+            self.schedule_mode_event(self.FRAME_TIME, self.blank_frame)
+
+    def blank_frame(self):
+        self.frames += 1
+        self.schedule_mode_event(self.FRAME_TIME, self.blank_frame)
     
-    @classmethod
-    def exec_vram(cls):
-        cls.modeclock -= cls.VRAM_SCANLINE_TIME
-        cls.mode = cls.H_BLANK_STATE
-        cls.scanline()
-        cls.update_stat_mode()
-
-    @classmethod
-    def exec_oam(cls):
-        cls.modeclock -= cls.OAM_SCANLINE_TIME
-        cls.mode = cls.VMRAM_READ_STATE
-        cls.update_stat_mode()
-
-    @classmethod
-    def exec_hblank(cls):
-        cls.modeclock -= cls.H_BLANK_TIME
-        cls.mode = cls.OAM_READ_STATE
-        cls.ly += 1
-        cls.compare_lylc()
-
-        if cls.ly == 144:
-            cls.mode = cls.V_BLANK_STATE
-            cls.auxillary_modeclock = cls.modeclock
-            cls.window_line = 0
-            InterruptManager.request_interrupt(Interrupt.INTERRUPT_VBLANK)
+    def exec_vram(self):
+        self.mode = self.H_BLANK_STATE
+        self.scanline()
+        self.update_stat_mode()
+        self.schedule_mode_event(self.H_BLANK_TIME, self.exec_hblank)
+        if self.hdma is not None:
+            self.hdma.hblank(self.ly)
+
+    def exec_oam(self):
+        self.mode = self.VMRAM_READ_STATE
+        self.update_stat_mode()
+        self.schedule_mode_event(self.VRAM_SCANLINE_TIME, self.exec_vram)
+
+    def exec_hblank(self):
+        self.mode = self.OAM_READ_STATE
+        self.ly += 1
+        self.compare_lylc()
+
+        if self.ly == 144:
+            self.mode = self.V_BLANK_STATE
+            self.window_line = 0
+            self.interrupt_manager.request_interrupt(Interrupt.INTERRUPT_VBLANK)
+            self.frames += 1
+            self.flush()
+            self.enter_vblank()
+        else:
+            self.schedule_mode_event(self.OAM_SCANLINE_TIME, self.exec_oam)
             
-        cls.update_stat_mode()
+        self.update_stat_mode()
+        self.refresh = True
 
+    def enter_vblank(self):
+        self.vblank_line = 0
+        self.schedule_mode_event(456, self.exec_vblank)
         
-    @classmethod
-    def exec_vblank(cls):
-        if cls.auxillary_modeclock >= 456:
-            cls.auxillary_modeclock -= 456
-            cls.vblank_line += 1
-
-            if cls.vblank_line <= 9:
-                cls.ly += 1
-                cls.compare_lylc()
-
-        if cls.modeclock >= cls.V_BLANK_TIME:
-            cls.modeclock -= cls.V_BLANK_TIME
-            cls.mode = cls.OAM_READ_STATE    
-            cls.update_stat_mode()
-            cls.ly = 0
-            cls.vblank_line = 0
-
-    @classmethod
-    def scanline(cls):
-        if cls.ly <= 144:
-            cls.render_background(cls.ly)
-            cls.render_window(cls.ly)
-            cls.render_sprite(cls.ly)
-
-    @classmethod
-    def update_stat_mode(cls):
+    def exec_vblank(self):
+        self.vblank_line += 1
+        if self.vblank_line <= 9:
+            self.ly += 1
+            self.compare_lylc()
+            self.schedule_mode_event(456, self.exec_vblank)
+        else:
+            self.mode = self.OAM_READ_STATE    
+            self.update_stat_mode()
+            self.ly = 0
+            self.vblank_line = 0
+            self.schedule_mode_event(self.OAM_SCANLINE_TIME, self.exec_oam)
+
+    def scanline(self):
+        if self.ly <= 144:
+            if self.renderer is not None:
+                self.renderer.scanline(self.ly)
+                return
+            self.render_background(self.ly)
+            self.render_window(self.ly)
+            self.render_sprite(self.ly)
+
+    def flush(self):
+        # Draws the scanlines queued by the renderer
+        if self.renderer is not None:
+            self.renderer.flush()
+
+    def update_stat_mode(self):
         # LCD Status Register
         # FF41 - STAT - LCDC Status (R/W)
         # -------------------------------
@@ -259,284 +375,235 @@ class PPU(AddressSpace):
         # Mode 1  ____________________________________11111111111111_____
 
         
-        new_stat = (cls.stat & 0xfc) | (cls.mode & 0x3)
-        cls.check_stat(cls.stat,new_stat)
-        cls.STAT = new_stat
+        new_stat = (self.stat & 0xfc) | (self.mode & 0x3)
+        self.check_stat(self.stat,new_stat)
+        self.STAT = new_stat
         
-    @staticmethod
-    def rgb(color_code : int) -> int:
-        return {
-             0: 0x7fff,
-             1: 0x421f,
-             2: 0x1cf2,
-             3: 0x0000
-        }.get(color_code)
+    def rgb(self, color_code : int) -> int:
+        return self.SHADES[color_code]
 
-    @staticmethod
-    def rgb_sprite(color_code : int) -> int:
-        return {
-             0: 0x7fff,
-             1: 0x1bef,
-             2: 0x0200,
-             3: 0x0000
-        }.get(color_code)
-
-    @classmethod
-    def compare_lylc(cls):
-      if LCDControlRegister.lcd_display_enable(cls.lcdc):
+    def rgb_sprite(self, color_code : int) -> int:
+        return self.SPRITE_SHADES[color_code]
+
+    def compare_lylc(self):
+      if LCDControlRegister.lcd_display_enable(self.lcdc):
             
-            old_stat = cls.stat
+            old_stat = self.stat
 
-            if cls.lyc == cls.ly:
-                stat = cls.stat | 0x4
+            if self.lyc == self.ly:
+                stat = self.stat | 0x4
             else:
-                stat = cls.stat & 0xfb
-            cls.check_stat(old_stat, stat)
-            cls.STAT =  stat
-
-    @classmethod
-    def render_background(cls, line : int):
-        line_width = (Window.SCREEN_HEIGHT - line -1) * Window.SCREEN_WIDTH
-
-        if LCDControlRegister.bg_window_display_priority(cls.lcdc):
+                stat = self.stat & 0xfb
+            self.check_stat(old_stat, stat)
+            self.STAT =  stat
+
+    def decode_tile_row(self, bank: int, index: int) -> tuple:
+        # Decodes the two bitplanes of a tile row into 8 color indices, the
+        # horizontally flipped row is stored at index | TILE_ROW_FLIP
+        index &= ~self.TILE_ROW_FLIP
+        byte_1 = self.vram[bank][index << 1]
+        byte_2 = self.vram[bank][(index << 1) + 1]
+        row = tuple(((byte_1 >> bit) & 1) | (((byte_2 >> bit) & 1) << 1) for bit in range(7, -1, -1))
+        rows = self.tile_rows[bank]
+        rows[index] = row
+        rows[index | self.TILE_ROW_FLIP] = row[::-1]
+        return row
+
+    def tile_row(self, bank: int, index: int) -> tuple:
+        row = self.tile_rows[bank][index]
+        if row is None:
+            self.decode_tile_row(bank, index)
+            row = self.tile_rows[bank][index]
+        return row
+
+    def render_background(self, line : int):
+        line_width = (self.SCREEN_HEIGHT - line -1) * self.SCREEN_WIDTH
+
+        if LCDControlRegister.bg_window_display_priority(self.lcdc):
             # tile and map select
-            tiles_select = LCDControlRegister.bg_and_window_tile_data_select(cls.lcdc)
-            map_select = LCDControlRegister.bg_tile_map_display_select(cls.lcdc)
+            tiles_select = LCDControlRegister.bg_and_window_tile_data_select(self.lcdc)
+            map_select = LCDControlRegister.bg_tile_map_display_select(self.lcdc)
             # line with y offset
-            line_adjusted = (line + cls.scy) & 0xff
+            line_adjusted = (line + self.scy) & 0xff
             # get position of tile row to read
-            y_offset = (line_adjusted // 8) * 32
+            y_offset = map_select + (line_adjusted // 8) * 32
             # relative line number in tile
             tile_line = line_adjusted % 8
-            # relative line number offset
-            tile_line_offset = tile_line * 2
-            x = 0
-            while x < 32:
-                tile = 0
+            colors = self.bg_colors
+            shades = self.bg_shades
+            vram = self.vram[0]
+            # the first tile may be partially scrolled out on the left
+            x = self.scx >> 3
+            position = line_width - (self.scx & 7)
+            line_end = line_width + self.SCREEN_WIDTH
+            while position < line_end:
+                tile = vram[y_offset + (x & 31)]
                 if tiles_select == 0x800:
-                    tile = signed_value(cls.vram[0][map_select + y_offset + x])
-                    tile += 128
-                else:
-                    tile = cls.vram[0][map_select + y_offset + x]
-                    
-
-                line_pixel_offset = x * 8
-                tile_select_offset = tile * 16
-                tile_address = tiles_select + tile_select_offset + tile_line_offset
-
-                
-                
-                if not cls.cgb_mode:
-                    byte_1 = cls.vram[0][tile_address]
-                    byte_2 = cls.vram[0][tile_address + 1]
+                    tile = signed_value(tile) + 128
+                index = (tiles_select >> 1) + tile * 8
+
+                if not self.cgb_mode:
+                    row = self.tile_row(0, index + tile_line)
                 else:
-                    tile_attributes = TileAttributes(cls.vram[0][map_select + y_offset + x])
+                    tile_attributes = TileAttributes(vram[y_offset + (x & 31)])
                     if tile_attributes.is_vertical_flip():
-                        tile_address = tile_address - tile_line_offset + ( 7 - tile_line ) * 2
-                    byte_1 = cls.vram[tile_attributes.get_vram_bank()][tile_address]
-                    byte_2 = cls.vram[tile_attributes.get_vram_bank()][tile_address + 1]
+                        index += 7 - tile_line
+                    else:
+                        index += tile_line
                     if tile_attributes.is_horizontal_flip():
-                        byte_1 = flip_byte(byte_1)
-                        byte_2 = flip_byte(byte_2)
-
-                pixelx = 0
-                buffer_addr = (line_pixel_offset - cls.scx)
-                while pixelx < 8:
-
-                    shift = 0x1 << (7 - pixelx)
-                    pixelx += 1
-
-                    buffer_addr &= 0xff
-
-                    if 0 <= buffer_addr < Window.SCREEN_WIDTH:
-
-                        pixel = 1 if (byte_1 & shift > 0) else 0
-                        pixel |= 2 if (byte_2 & shift > 0) else 0
-                        color = (cls.bgp >> (pixel * 2)) & 0x3
-                        
-
-                        position = line_width + buffer_addr % Window.SCREEN_WIDTH
-                        cls.original_color[position] = color
-                        if not cls.cgb_mode:
-                            Window.framebuffer[position] = cls.rgb(color)
-                            
-                        else:
-                            """
-                            if cls.mmu.bootstrap_enabled or cls.mmu.rom.is_cgb():
-                                color = pixel
-                            """
-                            
-                            #Window.framebuffer[position] = cls.mmu.cgb_palette.get_bg_rgba_palette_color(tile_attributes.get_palette(), color)
-                            Window.framebuffer[position] = cls.rgb(color) #FIXME
-                            
-                            cls.bg_priority[position] = tile_attributes.is_bg_priority()
-                            
-                    buffer_addr = ( line_pixel_offset + pixelx - cls.scx )
-                            
+                        index |= self.TILE_ROW_FLIP
+                    row = self.tile_row(tile_attributes.get_vram_bank(), index)
+
+                start = line_width - position if position < line_width else 0
+                end = line_end - position if position + 8 > line_end else 8
+                pixels = row[start:end] if end - start < 8 else row
+                first = position + start
+                last = position + end
+                self.original_color[first:last] = [colors[pixel] for pixel in pixels]
+                self.framebuffer[first:last] = [shades[pixel] for pixel in pixels]
+                if self.cgb_mode:
+                    #self.framebuffer[position] = self.mmu.cgb_palette.get_bg_rgba_palette_color(tile_attributes.get_palette(), color)
+                    self.bg_priority[first:last] = [tile_attributes.is_bg_priority()] * (end - start)
+
+                position += 8
                 x += 1
         else:
-            for i in range(0, Window.SCREEN_WIDTH):
-                Window.framebuffer[line_width + i] = cls.rgb(0)
-                cls.original_color[line_width + i] = 0
+            self.framebuffer[line_width:line_width + self.SCREEN_WIDTH] = [self.SHADES[0]] * self.SCREEN_WIDTH
+            self.original_color[line_width:line_width + self.SCREEN_WIDTH] = [0] * self.SCREEN_WIDTH
 
 
-    @classmethod
-    def render_window(cls, line : int):
-        line_width = (Window.SCREEN_HEIGHT - line -1) * Window.SCREEN_WIDTH
+    def render_window(self, line : int):
+        line_width = (self.SCREEN_HEIGHT - line -1) * self.SCREEN_WIDTH
         # dont render if the window is outside the bounds of the screen or
         # if the LCDC window enable bit flag is not set
-        if cls.window_line > 143 or not LCDControlRegister.window_display_enable(cls.lcdc):
+        if self.window_line > 143 or not LCDControlRegister.window_display_enable(self.lcdc):
             return
 
-        window_pos_x = cls.wx - 7
-        window_pos_y = cls.wy
+        window_pos_x = self.wx - 7
+        window_pos_y = self.wy
 
         # don't render if the window is outside the bounds of the screen
         if window_pos_x > 159 or window_pos_y > 143 or window_pos_y > line:
             return 
 
-        tiles_select = LCDControlRegister.bg_and_window_tile_data_select(cls.lcdc)
-        map_select = LCDControlRegister.window_tile_map_display_select(cls.lcdc)
+        tiles_select = LCDControlRegister.bg_and_window_tile_data_select(self.lcdc)
+        map_select = LCDControlRegister.window_tile_map_display_select(self.lcdc)
 
-        line_adjusted = cls.window_line
-        y_offset = (line_adjusted // 8) * 32
+        line_adjusted = self.window_line
+        y_offset = map_select + (line_adjusted // 8) * 32
         tile_line = line_adjusted % 8
-        tile_line_offset = tile_line * 2
+        colors = self.bg_colors
+        shades = self.bg_shades
+        if self.cgb_mode:
+            cgb_colors = self.mmu.bootstrap_enabled or self.mmu.rom.is_cgb()
+            bg_rgba = self.mmu.cgb_palette.bg_rgba
 
         for x in range(32):
-            tile = 0
+            buffer_addr = x * 8 + window_pos_x
+            if buffer_addr >= self.SCREEN_WIDTH:
+                break
+            if buffer_addr <= -8:
+                continue
+
+            tile = self.vram[0][y_offset + x]
             if tiles_select == 0x800:
-                tile = signed_value(cls.vram[0][map_select + y_offset + x])
-                tile += 128
-            else:
-                tile = cls.vram[0][map_select + y_offset + x]
-            
-            line_pixel_offset = x * 8
-            tile_select_offset = tile * 16
-            tile_address = tiles_select + tile_select_offset + tile_line_offset
-            
+                tile = signed_value(tile) + 128
+            index = (tiles_select >> 1) + tile * 8
 
-            
-            tile_attributes = TileAttributes(cls.vram[1][map_select + y_offset + x])
-            
-            if not cls.cgb_mode:
-                byte_1 = cls.vram[0][tile_address]
-                byte_2 = cls.vram[0][tile_address + 1]
+            tile_attributes = TileAttributes(self.vram[1][y_offset + x])
+
+            if not self.cgb_mode:
+                row = self.tile_row(0, index + tile_line)
             else:
                 if tile_attributes.is_vertical_flip():
-                    tile_address = tile_address - tile_line_offset + ( 7 - tile_line ) * 2
-                byte_1 = cls.vram[tile_attributes.get_vram_bank()][tile_address]
-                byte_2 = cls.vram[tile_attributes.get_vram_bank()][tile_address + 1]
+                    index += 7 - tile_line
+                else:
+                    index += tile_line
                 if tile_attributes.is_horizontal_flip():
-                    byte_1 = flip_byte(byte_1)
-                    byte_2 = flip_byte(byte_2)
-
+                    index |= self.TILE_ROW_FLIP
+                row = self.tile_row(tile_attributes.get_vram_bank(), index)
+
+            start = -buffer_addr if buffer_addr < 0 else 0
+            end = self.SCREEN_WIDTH - buffer_addr if buffer_addr + 8 > self.SCREEN_WIDTH else 8
+            first = line_width + buffer_addr + start
+            last = line_width + buffer_addr + end
+            pixels = row[start:end] if end - start < 8 else row
+            if not self.cgb_mode:
+                self.framebuffer[first:last] = [shades[pixel] for pixel in pixels]
+                self.original_color[first:last] = [colors[pixel] for pixel in pixels]
+            else:
+                palette = bg_rgba[tile_attributes.get_palette()]
+                pixel_colors = pixels if cgb_colors else [colors[pixel] for pixel in pixels]
+                self.framebuffer[first:last] = [palette[color] for color in pixel_colors]
+                self.bg_priority[first:last] = [tile_attributes.is_bg_priority()] * (end - start)
+                self.original_color[first:last] = pixel_colors
 
-            for pixelx in range(8):
-                buffer_addr = line_pixel_offset + pixelx + window_pos_x
+        self.window_line += 1
 
-                if buffer_addr < 0 or buffer_addr >= Window.SCREEN_WIDTH:
-                    continue
+    def render_sprite(self, line : int):
+        line_width = (self.SCREEN_HEIGHT - line -1) * self.SCREEN_WIDTH
+        if not LCDControlRegister.sprite_display_enable(self.lcdc):
+            return
 
-                shift = 0x1 << (7 - pixelx)
-
-                pixel = 0
-                if (byte_1 & shift == shift) and (byte_2 & shift == shift):
-                    pixel = 3
-                elif (byte_1 & shift == 0x0) and (byte_2 & shift == shift):
-                    pixel = 2
-                elif (byte_1 & shift == shift) and (byte_2 & shift == 0x0):
-                    pixel = 1
-                elif (byte_1 & shift == 0x0) and (byte_2 & shift == 0x00):
-                    pixel = 0
-                position = line_width + buffer_addr
-                color = (cls.bgp >> (pixel * 2)) & 0x3
-                if not cls.cgb_mode:
-                    Window.framebuffer[position] = cls.rgb(color)
-                    cls.original_color[position] = color
-                else:
-                    if cls.mmu.bootstrap_enabled or cls.mmu.rom.is_cgb():
-                        color = pixel
-                    Window.framebuffer[position] = cls.mmu.cgb_palette.get_bg_rgba_palette_color(tile_attributes.get_palette(), color)
-                    cls.bg_priority[position] = tile_attributes.is_bg_priority()
-                    cls.original_color[position] = color
-
-        cls.window_line += 1
-
-    @classmethod
-    def render_sprite(cls, line : int):
-        line_width = (Window.SCREEN_HEIGHT - line -1) * Window.SCREEN_WIDTH
-        if not LCDControlRegister.sprite_display_enable(cls.lcdc):
+        sprites = self.line_sprites[line][:self.MAX_SPRITES_PER_LINE]
+        if not sprites:
             return
 
-        sprite_size = LCDControlRegister.sprite_size(cls.lcdc)
+        sprite_size = self.sprite_size
+        if self.cgb_mode:
+            cgb_colors = self.mmu.bootstrap_enabled or self.mmu.rom.is_cgb()
+            ob_rgba = self.mmu.cgb_palette.ob_rgba
+        else:
+            # Non CGB mode, the sprite with the smaller X is on top
+            sprites.sort(key=lambda sprite: self.oam[sprite * 4 + 1])
 
-        for sprite in range(39,-1,-1):
+        # Only the first 10 sprites of the line in OAM order are shown, they
+        # are drawn from the lowest priority so the highest ends up on top
+        for sprite in reversed(sprites):
             sprite_offset = sprite * 4
 
-            sprite_y = cls.oam[sprite_offset] - 16
-            if sprite_y > line or (sprite_y + sprite_size) <= line:
-                continue
+            sprite_y = self.oam[sprite_offset] - 16
 
-            sprite_x = cls.oam[sprite_offset + 1] - 8
-            if sprite_x < -7 or sprite_x >= Window.SCREEN_WIDTH:
+            sprite_x = self.oam[sprite_offset + 1] - 8
+            if sprite_x < -7 or sprite_x >= self.SCREEN_WIDTH:
                 continue
 
-            sprite_tile_offset = (cls.oam[sprite_offset + 2] & (0xfe if sprite_size == 16 else 0xff)) * 16
+            sprite_tile = self.oam[sprite_offset + 2] & (0xfe if sprite_size == 16 else 0xff)
             
-            sprite_attributes = SpriteAttributes(cls.oam[sprite_offset + 3])
+            sprite_attributes = SpriteAttributes(self.oam[sprite_offset + 3])
 
-            tiles = 0
             pixel_y = (15 if sprite_size == 16 else 7) - (line - sprite_y) if sprite_attributes.is_vertical_flip() else line - sprite_y
 
-            pixel_y_2 = 0
-            offset = 0
+            # 8x16 sprites continue on the next tile
+            index = sprite_tile * 8 + pixel_y
+            if sprite_attributes.is_horizontal_flip():
+                index |= self.TILE_ROW_FLIP
+            row = self.tile_row(sprite_attributes.get_vram_bank(), index)
 
-            if sprite_size == 16 and (pixel_y >= 8):
-                pixel_y_2 = (pixel_y - 8) * 2
-                offset = 16
+            if not self.cgb_mode:
+                shades = self.ob_shades[sprite_attributes.get_palette()]
             else:
-                pixel_y_2 = pixel_y * 2
-
-            tile_address = tiles + sprite_tile_offset + pixel_y_2 + offset
-            byte_1 = cls.vram[sprite_attributes.get_vram_bank()][tile_address]
-            byte_2 = cls.vram[sprite_attributes.get_vram_bank()][tile_address + 1]
-
-            if sprite_attributes.get_palette() == 0:
-                palette = cls.obp0
-            else:
-                palette = cls.obp1
+                colors = self.ob_colors[sprite_attributes.get_palette()]
+                palette = ob_rgba[sprite_attributes.get_cgb_palette()]
 
             for pixelx in range(8):
-                shift = 0x1 << (pixelx if sprite_attributes.is_horizontal_flip() else 7 - pixelx)
-                pixel = 0
-
-                if (byte_1 & shift == shift) and (byte_2 & shift == shift):
-                    pixel = 3
-                elif (byte_1 & shift == 0x0) and (byte_2 & shift == shift):
-                    pixel = 2
-                elif (byte_1 & shift == shift) and (byte_2 & shift == 0x0):
-                    pixel = 1
-                elif (byte_1 & shift == 0x0) and (byte_2 & shift == 0x00):
+                pixel = row[pixelx]
+                if pixel == 0:
                     continue
 
                 buffer_x = sprite_x + pixelx
-                if buffer_x < 0 or buffer_x >= Window.SCREEN_WIDTH:
+                if buffer_x < 0 or buffer_x >= self.SCREEN_WIDTH:
                     continue
 
                 position = line_width + buffer_x
 
-                color = (palette >> (pixel * 2)) & 0x3
-
-                if sprite_attributes.is_priority() or cls.original_color[position] == 0 :
-                    if not cls.cgb_mode:
-                        Window.framebuffer[position] = cls.rgb_sprite(color)
+                if sprite_attributes.is_priority() or self.original_color[position] == 0 :
+                    if not self.cgb_mode:
+                        self.framebuffer[position] = shades[pixel]
 
-                    elif not cls.bg_priority[position] \
-                        or cls.original_color[position] == 0:
-                        if cls.mmu.bootstrap_enabled or cls.mmu.rom.is_cgb():
-                            color = pixel
-                        Window.framebuffer[position] = cls.mmu.cgb_palette.get_ob_rgba_palette_color(sprite_attributes.get_cgb_palette(), color)
+                    elif not self.bg_priority[position] \
+                        or self.original_color[position] == 0:
+                        self.framebuffer[position] = palette[pixel if cgb_colors else colors[pixel]]
         
 
 
@@ -567,7 +634,7 @@ class LCDControlRegister:
 
     @staticmethod
     def window_display_enable(lcdc: int) -> int:
-        return check_bit(5,PPU.lcdc)
+        return check_bit(5,lcdc)
 
     @staticmethod
     def bg_and_window_tile_data_select(lcdc: int) -> int:
@@ -1,105 +1,79 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-class Registers:
-
-    Z_FLAG: int = 0x80
-    N_FLAG: int = 0x40
-    H_FLAG: int = 0x20
-    C_FLAG: int = 0x10
-
-    a: int = 0x00
-    b: int = 0x00
-    c: int = 0x00
-    d: int = 0x00
-    e: int = 0x00
-    f: int = 0x00
-    h: int = 0x00
-    l: int = 0x00
-    pc: int = 0x0000
-    sp: int = 0x0000
-
-    @classmethod    
-    def set_af(cls, word : int):
-        cls.a = ( word >> 8 ) & 0xff
-        cls.f = word & 0xf0
-
-    @classmethod
-    def set_bc(cls, word : int):
-        cls.b = ( word >> 8 ) & 0xff
-        cls.c = word & 0xff
-
-    @classmethod
-    def set_de(cls, word : int):
-        cls.d = ( word >> 8 ) & 0xff
-        cls.e = word & 0xff
-
-    @classmethod
-    def set_hl(cls, word : int):
-        cls.h = ( word >> 8 ) & 0xff
-        cls.l = word & 0xff
-
-    @classmethod
-    def get_af(cls) -> int:
-        return ((cls.a << 8) + cls.f) & 0xfff0
-
-    @classmethod
-    def get_bc(cls) -> int:
-        return (cls.b << 8) + cls.c
-
-    @classmethod
-    def get_de(cls) -> int:
-        return (cls.d << 8) + cls.e
-
-    @classmethod
-    def get_hl(cls) -> int:
-        return (cls.h << 8) + cls.l
-
-    @classmethod
-    def set_z_flag(cls):
-        cls.f |= cls.Z_FLAG
-
-    @classmethod
-    def reset_z_flag(cls):
-        cls.f &= cls.Z_FLAG ^ 0xff
-
-    @classmethod
-    def set_n_flag(cls):
-        cls.f |= cls.N_FLAG
-
-    @classmethod
-    def reset_n_flag(cls):
-        cls.f &= cls.N_FLAG ^ 0xff
-
-    @classmethod
-    def set_c_flag(cls):
-        cls.f |= cls.C_FLAG
-
-    @classmethod
-    def reset_c_flag(cls):
-        cls.f &= cls.C_FLAG ^ 0xff
-
-    @classmethod
-    def set_h_flag(cls):
-        cls.f |= cls.H_FLAG
-
-    @classmethod
-    def reset_h_flag(cls):
-        cls.f &= cls.H_FLAG ^ 0xff
-
-    @classmethod
-    def is_z_flag(cls) -> bool:
-        return cls.f & cls.Z_FLAG == cls.Z_FLAG
-
-    @classmethod
-    def is_n_flag(cls) -> bool:
-        return cls.f & cls.N_FLAG == cls.N_FLAG
-
-    @classmethod
-    def is_c_flag(cls) -> bool:
-        return cls.f & cls.C_FLAG == cls.C_FLAG
-
-    @classmethod
-    def is_h_flag(cls) -> bool:
-        return cls.f & cls.H_FLAG == cls.H_FLAG
+from vsgb.instance_proxy import InstanceProxy
+
+# Flags in F, the low nibble is always 0
+Z_FLAG = 0x80
+N_FLAG = 0x40
+H_FLAG = 0x20
+C_FLAG = 0x10
+
+class Registers(metaclass=InstanceProxy):
+
+    Z_FLAG: int = Z_FLAG
+    N_FLAG: int = N_FLAG
+    H_FLAG: int = H_FLAG
+    C_FLAG: int = C_FLAG
+
+    __slots__ = ('a', 'b', 'c', 'd', 'e', 'f', 'h', 'l', 'pc', 'sp')
+
+    def __init__(self):
+        self.a = 0x00
+        self.b = 0x00
+        self.c = 0x00
+        self.d = 0x00
+        self.e = 0x00
+        self.f = 0x00
+        self.h = 0x00
+        self.l = 0x00
+        self.pc = 0x0000
+        self.sp = 0x0000
+
+    def set_af(self, word : int):
+        self.a = ( word >> 8 ) & 0xff
+        self.f = word & 0xf0
+
+    def set_bc(self, word : int):
+        self.b = ( word >> 8 ) & 0xff
+        self.c = word & 0xff
+
+    def set_de(self, word : int):
+        self.d = ( word >> 8 ) & 0xff
+        self.e = word & 0xff
+
+    def set_hl(self, word : int):
+        self.h = ( word >> 8 ) & 0xff
+        self.l = word & 0xff
+
+    def get_af(self) -> int:
+        return (self.a << 8) | self.f
+
+    def get_bc(self) -> int:
+        return (self.b << 8) | self.c
+
+    def get_de(self) -> int:
+        return (self.d << 8) | self.e
+
+    def get_hl(self) -> int:
+        return (self.h << 8) | self.l
+
+    # 16 bit views of the register pairs. The instruction handlers call the
+    # methods, which are cheaper than properties in CPython.
+    af = property(get_af, set_af)
+    bc = property(get_bc, set_bc)
+    de = property(get_de, set_de)
+    hl = property(get_hl, set_hl)
+
+    def is_z_flag(self) -> bool:
+        return self.f & self.Z_FLAG == self.Z_FLAG
+
+    def is_n_flag(self) -> bool:
+        return self.f & self.N_FLAG == self.N_FLAG
+
+    def is_c_flag(self) -> bool:
+        return self.f & self.C_FLAG == self.C_FLAG
+
+    def is_h_flag(self) -> bool:
+        return self.f & self.H_FLAG == self.H_FLAG
 
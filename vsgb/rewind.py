@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Rewind keeps a snapshot of the emulator every few frames in a ring buffer
+# limited in memory. Every keyframe_interval snapshots a full snapshot is
+# kept, the ones in between are stored as the runs of 256 byte blocks that
+# changed since the previous snapshot. Most of the RAM doesn't change from a
+# frame to the next, so deltas are a small part of a snapshot. Only the RAM
+# pages written since the previous snapshot are looked at. The runs are XORed
+# with the previous snapshot and compressed together: the framebuffer is in
+# a run most frames, unchanged pixels XOR to zeros and the rest comes from a
+# few colors.
+
+from collections import deque
+import zlib
+
+class Rewind:
+
+    BLOCK_SIZE = 256 # bytes compared at once
+    RUN_OVERHEAD = 16 # bytes, rough size of a run besides its data
+    COMPRESSION_LEVEL = 1
+
+    __slots__ = ('emulator', 'interval', 'keyframe_interval', 'memory_limit', 'entries', 'size', 'last', 'snapshots', 'next_frame', 'deltas')
+
+    def __init__(self, emulator, interval: int = 1, keyframe_interval: int = 60, memory_limit: int = 32 * 1024 * 1024):
+        self.emulator = emulator
+        # Frames between snapshots
+        self.interval = interval
+        # Snapshots between full snapshots
+        self.keyframe_interval = keyframe_interval
+        # Bytes used by the stored snapshots
+        self.memory_limit = memory_limit
+        # (frame, full snapshot or None, delta or None, size), oldest first
+        self.entries = deque()
+        self.size = 0
+        # Last snapshot, the next delta is taken against it
+        self.last = None
+        # Snapshots of the save state manager when last was taken
+        self.snapshots = None
+        self.next_frame = emulator.ppu.frames
+        # Deltas since the last full snapshot
+        self.deltas = 0
+
+    def capture(self):
+        frame = self.emulator.ppu.frames
+        manager = self.emulator.save_state_manager
+        snapshot = manager.snapshot(self.emulator)
+        if not self.entries or self.deltas + 1 >= self.keyframe_interval:
+            self.deltas = 0
+            entry = (frame, snapshot, None, len(snapshot))
+        else:
+            self.deltas += 1
+            if manager.snapshots == self.snapshots + 1:
+                delta = self.delta(self.last, snapshot, manager.tracked_spans, manager.dirty_spans)
+            else:
+                # Another snapshot was taken in between, the written pages
+                # are the ones since that one
+                delta = self.delta(self.last, snapshot)
+            delta = self.pack(self.last, delta)
+            size, spans, changes = delta
+            entry = (frame, None, delta, len(changes) + len(spans) * self.RUN_OVERHEAD)
+        self.last = snapshot
+        self.snapshots = manager.snapshots
+        self.entries.append(entry)
+        self.size += entry[3]
+        self.next_frame = frame + self.interval
+        self.trim()
+
+    def trim(self):
+        # The oldest keyframe goes with the deltas that depend on it
+        while self.size > self.memory_limit and len(self.entries) > 1:
+            self.drop()
+            while self.entries and self.entries[0][1] is None:
+                self.drop()
+
+    def drop(self):
+        self.size -= self.entries.popleft()[3]
+
+    def rewind(self, frames: int) -> int:
+        # Restores the newest snapshot at least frames before the current
+        # frame, or the oldest one kept. Returns the frames rewound, 0 if
+        # there is no snapshot.
+        frame = self.emulator.ppu.frames
+        target = frame - frames
+        index = len(self.entries) - 1
+        while index > 0 and self.entries[index][0] > target:
+            index -= 1
+        if index < 0:
+            return 0
+        snapshot = self.snapshot(index)
+        # The snapshots after it are the future now
+        for i in range(len(self.entries) - 1 - index):
+            self.size -= self.entries.pop()[3]
+        self.deltas = 0
+        for entry in reversed(self.entries):
+            if entry[1] is not None:
+                break
+            self.deltas += 1
+        self.last = snapshot
+        self.emulator.save_state_manager.load(self.emulator, snapshot)
+        self.next_frame = self.emulator.ppu.frames + self.interval
+        return frame - self.emulator.ppu.frames
+
+    def snapshot(self, index: int) -> bytes:
+        # Rebuilds a snapshot from the keyframe before it
+        start = index
+        while self.entries[start][1] is None:
+            start -= 1
+        snapshot = self.entries[start][1]
+        for i in range(start + 1, index + 1):
+            snapshot = self.apply(snapshot, self.entries[i][2])
+        return snapshot
+
+    @staticmethod
+    def delta(previous: bytes, current: bytes, tracked: list = (), dirty: list = ()) -> tuple:
+        # (size, [(offset, changed bytes)]). Within the tracked spans only
+        # the dirty ones can differ, the rest is compared block by block and
+        # consecutive changed blocks are stored as a single run.
+        size = len(current)
+        runs = []
+        for start, end in dirty:
+            if previous[start:end] != current[start:end]:
+                runs.append((start, current[start:end]))
+        position = 0
+        for start, end in sorted(tracked) + [(size, size)]:
+            Rewind.compare(previous, current, position, start, runs)
+            position = end
+        return size, runs
+
+    @staticmethod
+    def compare(previous: bytes, current: bytes, start: int, end: int, runs: list):
+        block_size = Rewind.BLOCK_SIZE
+        changed = None
+        for offset in range(start, end, block_size):
+            block_end = min(offset + block_size, end)
+            if previous[offset:block_end] != current[offset:block_end]:
+                if changed is None:
+                    changed = offset
+            elif changed is not None:
+                runs.append((changed, current[changed:offset]))
+                changed = None
+        if changed is not None:
+            runs.append((changed, current[changed:end]))
+
+    @staticmethod
+    def xor(a: bytes, b: bytes) -> bytes:
+        return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(len(b), 'little')
+
+    @staticmethod
+    def pack(previous: bytes, delta: tuple) -> tuple:
+        # (size, [(offset, length)], compressed runs XORed with previous)
+        size, runs = delta
+        spans = []
+        changes = []
+        for offset, run in runs:
+            spans.append((offset, len(run)))
+            changes.append(Rewind.xor(previous[offset:offset + len(run)].ljust(len(run), b'\x00'), run))
+        return size, spans, zlib.compress(b''.join(changes), Rewind.COMPRESSION_LEVEL)
+
+    @staticmethod
+    def apply(previous: bytes, delta: tuple) -> bytes:
+        size, spans, changes = delta
+        snapshot = bytearray(previous[:size].ljust(size, b'\x00'))
+        changes = zlib.decompress(changes)
+        position = 0
+        for offset, length in spans:
+            end = offset + length
+            snapshot[offset:end] = Rewind.xor(snapshot[offset:end], changes[position:position + length])
+            position += length
+        return bytes(snapshot)
@@ -1,39 +1,361 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+# Save states are a binary snapshot of the machine: a header followed by
+# sections in a fixed order, device registers packed with struct and memories
+# as raw bytes. All sections but the pending scheduler events at the end have
+# a fixed size for a given cartridge, so each one is at a fixed offset.
+# Snapshots are taken between instructions, they don't include the ROM and
+# are loaded into the running emulator.
+#
+# The RAM of the previous snapshot is kept, a snapshot only copies again the
+# pages written since. The manager reads and clears the written pages through
+# a view of its own (see vsgb.memory.dirty_pages).
+
+import array
+import heapq
 import logging
-import pickle
+import struct
+
+from vsgb.memory.dirty_pages import DirtyPages
+from vsgb.ppu import LCDControlRegister
+from vsgb.scheduler import Scheduler
 
 class SaveStateManager:
 
+    MAGIC = b'VSGB'
+    VERSION = 3
+    HEADER = struct.Struct('<4sH?')
+
+    # Device sections: attributes and how they are packed
+    REGISTERS = (('a', 'b', 'c', 'd', 'e', 'f', 'h', 'l', 'pc', 'sp'), struct.Struct('<8B2H'))
+    CPU = (('ime', 'halted', 'stop', 'locked', 'pending_interrupts_before_halt'), struct.Struct('<4?B'))
+    SCHEDULER = (('now', 'speed_shift', 'cpu_epoch', 'epoch'), struct.Struct('<qBqq'))
+    MMU = (('bootstrap_enabled',), struct.Struct('<?'))
+    INTERRUPTS = (('ie_register', 'if_register'), struct.Struct('<2B'))
+    TIMER = (('KEY1', 'TIMA', 'TMA', 'TAC', 'div_start', 'tima_start', 'tima_cycles'), struct.Struct('<4B3q'))
+    SERIAL = (('SB', 'SC'), struct.Struct('<2B'))
+    INPUT = (('P1',), struct.Struct('<B'))
+    WRAM = (('SVBK',), struct.Struct('<B'))
+    PPU = (
+        ('mode', 'vblank_line', 'screen_enabled', 'window_line', 'mode_event_time', 'frames', 'refresh',
+         'ly', 'stat', 'STAT', 'lyc', 'scx', 'scy', 'bgp', 'wx', 'wy', 'lcdc', 'obp0', 'obp1', 'vbk'),
+        struct.Struct('<2B?H2q?13B')
+    )
+    DMA = (('in_progress', 'page', 'counter'), struct.Struct('<?HB'))
+    HDMA = (
+        ('ticks', 'in_progress', 'stalled', 'type', 'length', 'msb_source_address', 'lsb_source_address',
+         'msb_destination_address', 'lsb_destination_address', 'counter'),
+        struct.Struct('<B2?BH4BH')
+    )
+    APU = (('frame_sequencer_time', 'sample_time'), struct.Struct('<2q'))
+    SOUND_CHANNEL = (('_nr0', '_nr1', '_nr2', '_nr3', '_nr4', 'channel_enabled', 'dac_enabled', 'i'), struct.Struct('<5B2?q'))
+    SQUARE_CHANNEL = (('freq_divider', 'last_output'), struct.Struct('<2q'))
+    WAVE_CHANNEL = (('freq_divider', 'last_output', 'ticks_since_read', 'last_read_addr', 'buffer', 'triggered'), struct.Struct('<5q?'))
+    NOISE_CHANNEL = (('last_result',), struct.Struct('<q'))
+    LENGTH_COUNTER = (('length', 'i', 'enabled'), struct.Struct('<2q?'))
+    VOLUME_ENVELOPE = (('i', 'volume', 'initial_volume', 'sweep', 'envelope_direction', 'finished'), struct.Struct('<5q?'))
+    FREQUENCY_SWEEP = (
+        ('period', 'negate', 'shift', 'timer', 'shadow_freq', '_nr13', '_nr14', 'i', 'overflow', 'counter_enabled', 'negging'),
+        struct.Struct('<q?6q3?')
+    )
+    POLYNOMIAL_COUNTER = (('i', 'shifted_divisor'), struct.Struct('<2q'))
+    LFSR = (('lfsr',), struct.Struct('<q'))
+    PALETTE_INDEXES = struct.Struct('<2B')
+    # Cartridge registers, a memory bank controller saves the ones it has
+    CARTRIDGE = (
+        ('rom_bank', 'H'), ('ram_bank', 'B'), ('ram_enabled', '?'), ('memory_mode', 'B'),
+        ('rtc_register_mode', '?'), ('rtc_register_selected', 'B'), ('rtc_seconds', 'B'),
+        ('rtc_minutes', 'B'), ('rtc_hours', 'B'), ('rtc_days', 'H'), ('rtc_halt', '?'),
+        ('rtc_carry', '?'), ('rtc_latch', 'B'), ('rtc_time', 'q')
+    )
+    EVENT_COUNT = struct.Struct('<H')
+    EVENT = struct.Struct('<qB')
+
     def __init__(self):
-        self.version = '1'
+        self.version = SaveStateManager.VERSION
+        # Copies of the tracked memories as of the last snapshot
+        self.images = {}
+        # Snapshots taken, the spans below are about the last one
+        self.snapshots = 0
+        # (start, end) of the tracked memories in the snapshot and of the
+        # pages copied again, the rest of the tracked memories is the same
+        # as in the previous snapshot
+        self.tracked_spans = []
+        self.dirty_spans = []
+        # Written pages of the emulator the images are from
+        self.dirty_pages = None
+        self.dirty_view = None
 
     def create(self, emulator):
-        temp_rom = emulator.mmu.rom.data
-        with open(emulator.cartridge.rom().get_game_id()+'.bin','wb') as save_state_file:
-            self.mmu = emulator.mmu
-            self.mmu.rom.data = None
-            self.ppu = emulator.ppu
-            self.hdma = emulator.hdma
-            self.dma = emulator.dma
-            self.cpu = emulator.cpu
-            pickle.dump(self, save_state_file)
-        emulator.mmu.rom.data = temp_rom
+        with open(emulator.cartridge.header.game_id+'.bin','wb') as save_state_file:
+            save_state_file.write(self.snapshot(emulator))
         logging.info('Saved state')
 
     def restore(self, emulator):
         try:
-            with open(emulator.cartridge.rom().get_game_id()+'.bin','rb') as save_state_file:
-                state = pickle.load(save_state_file)
-                emulator.mmu = state.mmu
-                emulator.mmu.rom.data = emulator.cartridge.rom().data
-                emulator.mmu.input = emulator.input
-                emulator.ppu = state.ppu
-                emulator.hdma = state.hdma
-                emulator.dma = state.dma
-                emulator.cpu = state.cpu
+            with open(emulator.cartridge.header.game_id+'.bin','rb') as save_state_file:
+                self.load(emulator, save_state_file.read())
             logging.info('Loaded state')
-        except:
+        except FileNotFoundError:
             pass
-    
\ No newline at end of file
+        except (ValueError, struct.error) as e:
+            logging.warning('Save state not loaded: {}'.format(e))
+
+    def snapshot(self, emulator) -> bytes:
+        # Queued scanlines are drawn first, the renderer queue is not saved
+        emulator.ppu.flush()
+        parts = [SaveStateManager.HEADER.pack(SaveStateManager.MAGIC, SaveStateManager.VERSION, emulator.cgb_mode)]
+        for device, (fields, packer) in self.sections(emulator):
+            parts.append(packer.pack(*[getattr(device, field) for field in fields]))
+        self.tracked_spans = []
+        self.dirty_spans = []
+        dirty_pages = emulator.mmu.dirty_pages
+        if dirty_pages is not self.dirty_pages:
+            self.dirty_pages = dirty_pages
+            self.dirty_view = dirty_pages.view()
+            self.images = {}
+        regions = dirty_pages.regions(self.dirty_view)
+        offset = sum(map(len, parts))
+        for region in regions[:-1]:
+            parts.append(self.image(region, offset))
+            offset += len(parts[-1])
+        # Registers, always copied
+        parts.append(bytes(emulator.mmu.io_memory.memory))
+        parts.append(bytes(emulator.mmu.apu.sound_channels[2].wave_ram))
+        parts.append(bytes(emulator.apu.registers.values()))
+        framebuffer = emulator.ppu.framebuffer
+        if isinstance(framebuffer, list):
+            parts.append(array.array('I', framebuffer).tobytes())
+        else:
+            parts.append(framebuffer.tobytes())
+        palette = emulator.mmu.cgb_palette
+        parts.append(SaveStateManager.PALETTE_INDEXES.pack(palette.bgpi.get_value(), palette.obpi.get_value()))
+        parts.append(array.array('H', [color.get_rgba() for color in palette.bg_palettes + palette.ob_palettes]).tobytes())
+        rom = emulator.mmu.rom
+        fields, packer = self.cartridge_section(rom)
+        parts.append(packer.pack(*[getattr(rom, field) for field in fields]))
+        if hasattr(rom, 'rtc_latched'):
+            parts.append(bytes(rom.rtc_latched))
+        parts.append(self.image(regions[-1], sum(map(len, parts))))
+        parts.append(self.pack_events(emulator))
+        dirty_pages.clear(self.dirty_view)
+        self.snapshots += 1
+        # The images are joined as they are, this is the only copy
+        return b''.join(parts)
+
+    def image(self, region: tuple, offset: int) -> bytearray:
+        # Contents of a tracked memory at offset in the snapshot
+        name, flags, banks = region
+        bank_size = len(banks[0])
+        image = self.images.get(name)
+        if image is None or len(image) != bank_size * len(banks):
+            image = self.images[name] = bytearray(b''.join(banks))
+            self.dirty_spans.append((offset, offset + len(image)))
+        else:
+            bank_pages = len(flags) // len(banks)
+            for page in DirtyPages.pages(flags):
+                bank, page = divmod(page, bank_pages)
+                start = page * DirtyPages.PAGE_SIZE
+                data = banks[bank][start:start + DirtyPages.PAGE_SIZE]
+                position = bank * bank_size + start
+                image[position:position + len(data)] = data
+                self.dirty_spans.append((offset + position, offset + position + len(data)))
+        self.tracked_spans.append((offset, offset + len(image)))
+        return image
+
+    def load(self, emulator, data: bytes):
+        magic, version, cgb_mode = SaveStateManager.HEADER.unpack_from(data)
+        if magic != SaveStateManager.MAGIC or version != SaveStateManager.VERSION:
+            raise ValueError('unsupported save state format')
+        if cgb_mode != emulator.cgb_mode:
+            raise ValueError('save state was created in {} mode'.format('CGB' if cgb_mode else 'DMG'))
+        data = memoryview(data)
+        offset = SaveStateManager.HEADER.size
+        for device, (fields, packer) in self.sections(emulator):
+            for field, value in zip(fields, packer.unpack_from(data, offset)):
+                setattr(device, field, value)
+            offset += packer.size
+        for memory in self.memories(emulator):
+            memory[:] = data[offset:offset + len(memory)]
+            offset += len(memory)
+        registers = emulator.apu.registers
+        for register, value in zip(list(registers), data[offset:offset + len(registers)]):
+            registers[register] = value
+        offset += len(registers)
+        framebuffer = emulator.ppu.framebuffer
+        size = len(framebuffer) * 4
+        if isinstance(framebuffer, list):
+            values = array.array('I')
+            values.frombytes(data[offset:offset + size])
+            framebuffer[:] = values
+        else:
+            memoryview(framebuffer).cast('B')[:] = data[offset:offset + size]
+        offset += size
+        palette = emulator.mmu.cgb_palette
+        bgpi, obpi = SaveStateManager.PALETTE_INDEXES.unpack_from(data, offset)
+        offset += SaveStateManager.PALETTE_INDEXES.size
+        palette.bgpi.set_value(bgpi)
+        palette.obpi.set_value(obpi)
+        colors = palette.bg_palettes + palette.ob_palettes
+        values = array.array('H')
+        values.frombytes(data[offset:offset + len(colors) * 2])
+        offset += len(colors) * 2
+        for color, value in zip(colors, values):
+            color.set_color(value)
+        rom = emulator.mmu.rom
+        fields, packer = self.cartridge_section(rom)
+        for field, value in zip(fields, packer.unpack_from(data, offset)):
+            setattr(rom, field, value)
+        offset += packer.size
+        if hasattr(rom, 'rtc_latched'):
+            rom.rtc_latched = list(data[offset:offset + 5])
+            offset += 5
+        rom.ram[:] = data[offset:offset + len(rom.ram)]
+        offset += len(rom.ram)
+        self.unpack_events(emulator, data, offset)
+        self.refresh(emulator)
+
+    def sections(self, emulator) -> list:
+        mmu = emulator.mmu
+        apu = mmu.apu
+        square_1, square_2, wave, noise = apu.sound_channels
+        return [
+            (emulator.registers, SaveStateManager.REGISTERS),
+            (emulator.cpu, SaveStateManager.CPU),
+            (emulator.scheduler, SaveStateManager.SCHEDULER),
+            (mmu, SaveStateManager.MMU),
+            (mmu.interrupt_manager, SaveStateManager.INTERRUPTS),
+            (mmu.timer, SaveStateManager.TIMER),
+            (mmu.serial, SaveStateManager.SERIAL),
+            (mmu.input, SaveStateManager.INPUT),
+            (mmu.wram, SaveStateManager.WRAM),
+            (emulator.ppu, SaveStateManager.PPU),
+            (emulator.dma, SaveStateManager.DMA),
+            (emulator.hdma, SaveStateManager.HDMA),
+            (apu, SaveStateManager.APU),
+            (square_1, SaveStateManager.SOUND_CHANNEL),
+            (square_1, SaveStateManager.SQUARE_CHANNEL),
+            (square_1.length, SaveStateManager.LENGTH_COUNTER),
+            (square_1.volume_envelope, SaveStateManager.VOLUME_ENVELOPE),
+            (square_1.frequency_sweep, SaveStateManager.FREQUENCY_SWEEP),
+            (square_2, SaveStateManager.SOUND_CHANNEL),
+            (square_2, SaveStateManager.SQUARE_CHANNEL),
+            (square_2.length, SaveStateManager.LENGTH_COUNTER),
+            (square_2.volume_envelope, SaveStateManager.VOLUME_ENVELOPE),
+            (wave, SaveStateManager.SOUND_CHANNEL),
+            (wave, SaveStateManager.WAVE_CHANNEL),
+            (wave.length, SaveStateManager.LENGTH_COUNTER),
+            (noise, SaveStateManager.SOUND_CHANNEL),
+            (noise, SaveStateManager.NOISE_CHANNEL),
+            (noise.length, SaveStateManager.LENGTH_COUNTER),
+            (noise.volume_envelope, SaveStateManager.VOLUME_ENVELOPE),
+            (noise.polynominal_counter, SaveStateManager.POLYNOMIAL_COUNTER),
+            (noise.lfsr, SaveStateManager.LFSR)
+        ]
+
+    def memories(self, emulator) -> list:
+        # Saved as raw bytes, restored in place. The tracked ones come first
+        # in the order of DirtyPages.regions()
+        mmu = emulator.mmu
+        return [
+            emulator.ppu.vram[0],
+            emulator.ppu.vram[1],
+            emulator.ppu.oam,
+            *mmu.wram.ram,
+            mmu.hram.ram,
+            mmu.io_memory.memory,
+            mmu.apu.sound_channels[2].wave_ram
+        ]
+
+    @staticmethod
+    def cartridge_section(rom) -> tuple:
+        fields = [(field, code) for field, code in SaveStateManager.CARTRIDGE if hasattr(rom, field)]
+        return [field for field, code in fields], struct.Struct('<' + ''.join(code for field, code in fields))
+
+    @staticmethod
+    def event_callbacks(emulator) -> list:
+        # Callbacks the scheduler events can have and the attribute holding
+        # the event, the index in this list is saved with the event
+        ppu = emulator.ppu
+        return [
+            (ppu.switch_lcd, ppu, 'lcd_event'),
+            (ppu.exec_hblank, ppu, 'mode_event'),
+            (ppu.exec_oam, ppu, 'mode_event'),
+            (ppu.exec_vram, ppu, 'mode_event'),
+            (ppu.exec_vblank, ppu, 'mode_event'),
+            (ppu.blank_frame, ppu, 'mode_event'),
+            (emulator.timer.overflow, emulator.timer, 'overflow_event'),
+            (emulator.serial.finish_transfer, emulator.serial, 'transfer_event'),
+            (emulator.dma.start, emulator.dma, 'event'),
+            (emulator.dma.step, emulator.dma, 'event'),
+            (emulator.dma.finish, emulator.dma, 'event'),
+            (emulator.hdma.step_gdma, emulator.hdma, 'event'),
+            (emulator.hdma.resume, emulator.hdma, 'event'),
+            (emulator.apu.frame_sequencer, None, None),
+            (emulator.apu.sample, None, None)
+        ]
+
+    def pack_events(self, emulator) -> bytes:
+        # Pending events in the order they run, events of the caller (like
+        # the one ending run_cycles) are left out
+        indexes = {callback: index for index, (callback, device, field) in enumerate(self.event_callbacks(emulator))}
+        events = []
+        for timestamp, sequence, event in sorted(emulator.scheduler.events):
+            index = indexes.get(event.callback)
+            if not event.cancelled and index is not None:
+                events.append(SaveStateManager.EVENT.pack(timestamp, index))
+        return SaveStateManager.EVENT_COUNT.pack(len(events)) + b''.join(events)
+
+    def unpack_events(self, emulator, data: bytes, offset: int):
+        callbacks = self.event_callbacks(emulator)
+        known = {callback for callback, device, field in callbacks}
+        scheduler = emulator.scheduler
+        # Only the events of the caller are kept
+        events = []
+        for entry in scheduler.events:
+            if entry[2].callback in known:
+                entry[2].cancelled = True
+            else:
+                events.append(entry)
+        heapq.heapify(events)
+        scheduler.events = events
+        scheduler.deadline = events[0][0] if events else Scheduler.NEVER
+        for callback, device, field in callbacks:
+            if device is not None:
+                setattr(device, field, None)
+        count, = SaveStateManager.EVENT_COUNT.unpack_from(data, offset)
+        offset += SaveStateManager.EVENT_COUNT.size
+        for timestamp, index in SaveStateManager.EVENT.iter_unpack(data[offset:offset + count * SaveStateManager.EVENT.size]):
+            callback, device, field = callbacks[index]
+            event = scheduler.schedule(timestamp, callback)
+            if device is not None:
+                setattr(device, field, event)
+
+    def refresh(self, emulator):
+        # Rebuilds what is derived from the restored state
+        mmu = emulator.mmu
+        ppu = emulator.ppu
+        mmu.map_rom()
+        mmu.rom.select_rom_bank()
+        mmu.rom.select_ram_bank()
+        palette = mmu.cgb_palette
+        palette.bg_rgba = [palette.palette_rgba(palette.bg_palettes, index) for index in range(8)]
+        palette.ob_rgba = [palette.palette_rgba(palette.ob_palettes, index) for index in range(8)]
+        ppu.update_palettes()
+        ppu.sprite_size = LCDControlRegister.sprite_size(ppu.lcdc)
+        ppu.index_sprites()
+        ppu.tile_rows = [[None]*0x2000, [None]*0x2000]
+        if ppu.renderer is not None:
+            ppu.renderer.lines = []
+            ppu.renderer.tiles = None
+        # Every page differs from the previous snapshot now
+        mmu.dirty_pages.mark_all()
+        # Blocks translated from RAM may not match the restored code, and
+        # the cached ROM blocks are the cartridge ones while the boot ROM
+        # is mapped
+        if mmu.bootstrap_enabled:
+            emulator.cpu.translator.flush()
+        else:
+            emulator.cpu.translator.invalidate_code()
+
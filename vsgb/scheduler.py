@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import heapq
+
+class Event:
+
+    __slots__ = ('timestamp', 'callback', 'cancelled')
+
+    def __init__(self, timestamp: int, callback):
+        self.timestamp = timestamp
+        self.callback = callback
+        self.cancelled = False
+
+class Scheduler:
+
+    # Timestamps are counted in the normal speed clock (4194304 Hz). In CGB
+    # double speed mode the CPU and everything clocked by it (DIV, TIMA, serial,
+    # OAM DMA) runs twice as fast, so their cycles are scaled by speed_shift.
+    NEVER: int = 1 << 62
+
+    def __init__(self):
+        self.now = 0
+        self.deadline = Scheduler.NEVER
+        self.events = []
+        self.sequence = 0
+        self.speed_shift = 0
+        self.speed_listeners = []
+        # CPU cycle counter at the last speed switch, used by cpu_time()
+        self.cpu_epoch = 0
+        self.epoch = 0
+
+    def schedule(self, timestamp: int, callback) -> Event:
+        event = Event(timestamp, callback)
+        # the sequence number keeps events with the same timestamp in FIFO order
+        heapq.heappush(self.events, (timestamp, self.sequence, event))
+        self.sequence += 1
+        if timestamp < self.deadline:
+            self.deadline = timestamp
+        return event
+
+    def schedule_in(self, cycles: int, callback) -> Event:
+        return self.schedule(self.now + cycles, callback)
+
+    def schedule_cpu(self, cycles: int, callback) -> Event:
+        return self.schedule(self.now + (cycles >> self.speed_shift), callback)
+
+    def cancel(self, event: Event):
+        if event is not None:
+            event.cancelled = True
+
+    def run_due_events(self):
+        events = self.events
+        while events and events[0][0] <= self.now:
+            event = heapq.heappop(events)[2]
+            if not event.cancelled:
+                event.callback()
+        self.deadline = events[0][0] if events else Scheduler.NEVER
+
+    def cpu_time(self) -> int:
+        return self.cpu_epoch + ((self.now - self.epoch) << self.speed_shift)
+
+    def cpu_to_timestamp(self, cpu_time: int) -> int:
+        # round up so CPU clocked events never fire early
+        return self.epoch - ((self.cpu_epoch - cpu_time) >> self.speed_shift)
+
+    def set_double_speed(self, enabled: bool):
+        self.cpu_epoch = self.cpu_time()
+        self.epoch = self.now
+        self.speed_shift = 1 if enabled else 0
+        for listener in self.speed_listeners:
+            listener()
+
+    def is_double_speed(self) -> bool:
+        return self.speed_shift == 1
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Documentation source:
+# - https://gbdev.gg8.se/wiki/articles/Serial_Data_Transfer_(Link_Cable)
+
+# FF01 - SB - Serial transfer data (R/W)
+# 8 Bits of data to be read/written
+# FF02 - SC - Serial Transfer Control (R/W)
+#  Bit 7 - Transfer Start Flag (0=No transfer is in progress or requested, 1=Transfer in progress, or requested)
+#  Bit 1 - Clock Speed (0=Normal, 1=Fast) ** CGB Mode Only **
+#  Bit 0 - Shift Clock (0=External Clock, 1=Internal Clock)
+# There is no link cable, so a transfer using the internal clock shifts in
+# 0xff bits and finishes after 8 serial clocks. Transfers waiting for an
+# external clock never finish.
+
+from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
+from vsgb.interrupt_manager import Interrupt, InterruptManager
+from vsgb.io_registers import IO_Registers
+
+class Serial(AddressSpace, metaclass=InstanceProxy):
+
+    TRANSFER_TIME: int = 8 * 512 # cycles, 8 bits at 8192Hz
+
+    __slots__ = ('interrupt_manager', 'SB', 'SC', 'cgb_mode', 'scheduler', 'transfer_event')
+
+    def __init__(self, interrupt_manager: InterruptManager, cgb_mode: bool = False):
+        self.interrupt_manager = interrupt_manager
+        self.SB = 0x00
+        self.SC = 0x7e
+        self.cgb_mode = cgb_mode
+        self.scheduler = None
+        self.transfer_event = None
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
+
+    def accept(self, address: int) -> bool:
+        return address == IO_Registers.SB or address == IO_Registers.SC
+
+    def read(self, address: int) -> int:
+        if address == IO_Registers.SB:
+            return self.SB
+        # unused bits read as 1
+        if self.cgb_mode:
+            return self.SC | 0b01111100
+        return self.SC | 0b01111110
+
+    def write(self, address: int, value: int):
+        if address == IO_Registers.SB:
+            self.SB = value
+            return
+        self.SC = value
+        self.scheduler.cancel(self.transfer_event)
+        self.transfer_event = None
+        if value & 0b10000001 == 0b10000001:
+            transfer_time = self.TRANSFER_TIME
+            if self.cgb_mode and value & 0b00000010:
+                transfer_time //= 32
+            self.transfer_event = self.scheduler.schedule_cpu(transfer_time, self.finish_transfer)
+
+    def finish_transfer(self):
+        self.transfer_event = None
+        self.SB = 0xff
+        self.SC &= 0b01111111
+        self.interrupt_manager.request_interrupt(Interrupt.INTERRUPT_SERIAL)
@@ -1,29 +1,39 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from vsgb.instance_proxy import InstanceProxy
 from vsgb.registers import Registers
 from vsgb.mmu import MMU
 
-class StackManager:
+class StackManager(metaclass=InstanceProxy):
 
-    @staticmethod
-    def push_byte(byte : int):
+    __slots__ = ('registers', 'mmu')
+
+    def __init__(self, registers: Registers, mmu: MMU):
+        self.registers = registers
+        self.mmu = mmu
+
+    def push_byte(self, byte : int):
         byte = byte & 0xff
-        Registers.sp -= 1
-        MMU.write(Registers.sp, byte)
-
-    @classmethod
-    def push_word(cls, word : int):
-        cls.push_byte((word >> 8))
-        cls.push_byte(word)
-
-    @staticmethod
-    def pop_byte() -> int:
-        byte = MMU.read(Registers.sp)
-        Registers.sp += 1
-        return byte
+        self.registers.sp -= 1
+        self.mmu.write_byte(self.registers.sp, byte)
 
-    @classmethod
-    def pop_word(cls) -> int:
-        return cls.pop_byte() | ( cls.pop_byte() << 8 )
+    def push_word(self, word : int):
+        registers = self.registers
+        write_byte = self.mmu.write_byte
+        sp = registers.sp
+        write_byte(sp - 1, (word >> 8) & 0xff)
+        write_byte(sp - 2, word & 0xff)
+        registers.sp = sp - 2
+
+    def pop_byte(self) -> int:
+        byte = self.mmu.read_byte(self.registers.sp)
+        self.registers.sp += 1
+        return byte
 
+    def pop_word(self) -> int:
+        registers = self.registers
+        read_byte = self.mmu.read_byte
+        sp = registers.sp
+        registers.sp = sp + 2
+        return read_byte(sp) | ( read_byte(sp + 1) << 8 )
\ No newline at end of file
@@ -3,22 +3,40 @@
 
 from vsgb.interrupt_manager import Interrupt, InterruptManager
 from vsgb.address_space import AddressSpace
+from vsgb.instance_proxy import InstanceProxy
 from vsgb.io_registers import IO_Registers
 
 
-class Timer(AddressSpace):
+class Timer(AddressSpace, metaclass=InstanceProxy):
 
+    # DIV and TIMA are not ticked, their values are derived from the scheduler
+    # CPU clock and only the TIMA overflow is scheduled as an event
     DIV_INC_TIME: int = 256 # cycles
-    KEY1: int = 0
-    TIMA: int = 0
-    TMA: int = 0
-    DIV: int = 0
-    TAC: int = 0
-    div_cycles: int = 0
-    tima_cycles: int = 0
-
-    @classmethod
-    def accept(cls, address: int) -> bool:
+    __slots__ = (
+        'interrupt_manager', 'KEY1', 'TIMA', 'TMA', 'TAC', 'div_start',
+        'tima_start', 'tima_cycles', 'scheduler', 'overflow_event'
+    )
+
+    def __init__(self, interrupt_manager: InterruptManager):
+        self.interrupt_manager = interrupt_manager
+        self.KEY1 = 0
+        self.TIMA = 0
+        self.TMA = 0
+        self.TAC = 0
+        self.div_start = 0
+        self.tima_start = 0
+        self.tima_cycles = 0
+        self.scheduler = None
+        self.overflow_event = None
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
+        self.div_start = scheduler.cpu_time()
+        self.tima_start = self.div_start
+        scheduler.speed_listeners.append(self.schedule_overflow)
+        self.schedule_overflow()
+
+    def accept(self, address: int) -> bool:
         return address in [
             IO_Registers.DIV,
             IO_Registers.KEY1,
@@ -27,85 +45,87 @@ class Timer(AddressSpace):
             IO_Registers.TAC
         ]
 
-    @classmethod
-    def read(cls, address: int) -> int:
+    def read(self, address: int) -> int:
         if address == IO_Registers.DIV:
-            return cls.DIV
+            return ((self.scheduler.cpu_time() - self.div_start) // self.DIV_INC_TIME) & 0xff
         if address == IO_Registers.KEY1:
-            return cls.KEY1
+            return self.KEY1
         if address == IO_Registers.TMA:
-            return cls.TMA
+            return self.TMA
         if address == IO_Registers.TIMA:
-            return cls.TIMA
+            return self.tima()
         if address == IO_Registers.TAC:
-            return cls.TAC
+            return self.TAC
 
-    @classmethod
-    def write(cls, address: int, value: int):
+    def write(self, address: int, value: int):
         if address == IO_Registers.DIV:
-            cls.DIV = 0
+            self.div_start = self.scheduler.cpu_time()
         elif address == IO_Registers.KEY1:
-            cls.KEY1 = value
+            # Bit 7 (current speed) is read only, it changes on STOP
+            self.KEY1 = (self.KEY1 & 0b10000000) | (value & 0b00000001)
         elif address == IO_Registers.TMA:
-            cls.TMA = value
+            self.TMA = value
         elif address == IO_Registers.TIMA:
-            cls.TIMA = value
+            self.sync_tima()
+            self.TIMA = value
+            self.schedule_overflow()
         elif address == IO_Registers.TAC:
-            cls.TAC = value
-
-    @classmethod
-    def tick(cls, cycles : int = 0):
-        multiplier = 1
-        cls.div_cycles += cycles
-
-        # increment again if DOUBLE SPEED MODE
-        if cls.KEY1 & 0b10000000:
-            cls.div_cycles += cycles
-            multiplier = 2
-
-        if cls.KEY1 & 1: #Prepare enable/disable double speed
-            cls.KEY1  &= 0b10000000
-            cls.div_cycles += 128 * 1024 - 76
-
-        # incremnt DIV register if its time to
-        if cls.div_cycles >= cls.DIV_INC_TIME :
-            cls.inc_div_register()
-        # dont bother if TIMA is not running
-        if Tima.running():
-            # increment TIMA and DIV register
-            cls.tima_cycles += cycles
-            frequency = Tima.frequency()
-            if cls.tima_cycles >= frequency:
-                cls.inc_tima_register()
-                cls.tima_cycles -= frequency
-
-    @classmethod
-    def inc_tima_register(cls):
-        if 0xff == cls.TIMA:
-            cls.TIMA = cls.TMA
-            InterruptManager.request_interrupt(Interrupt.INTERRUPT_TIMER)
-        else:
-            cls.TIMA += 1
-            cls.TIMA &= 0xff
-        
-    @classmethod
-    def inc_div_register(cls):
-        cls.DIV = ( cls.DIV + 1 ) & 0xff
-        cls.div_cycles -= Timer.DIV_INC_TIME
-
-        
+            self.sync_tima()
+            self.TAC = value
+            self.tima_cycles %= self.tima_frequency()
+            self.schedule_overflow()
+
+    def tima(self) -> int:
+        if not self.tima_running():
+            return self.TIMA
+        elapsed = self.scheduler.cpu_time() - self.tima_start
+        return min(self.TIMA + elapsed // self.tima_frequency(), 0xff)
+
+    def sync_tima(self):
+        # Fold the elapsed increments into TIMA and keep the partial period
+        if self.tima_running():
+            frequency = self.tima_frequency()
+            elapsed = self.scheduler.cpu_time() - self.tima_start
+            self.TIMA = min(self.TIMA + elapsed // frequency, 0xff)
+            self.tima_cycles = elapsed % frequency
+
+    def schedule_overflow(self):
+        self.scheduler.cancel(self.overflow_event)
+        self.overflow_event = None
+        if self.tima_running():
+            frequency = self.tima_frequency()
+            self.tima_start = self.scheduler.cpu_time() - self.tima_cycles
+            overflow = self.tima_start + (0x100 - self.TIMA) * frequency
+            self.overflow_event = self.scheduler.schedule(self.scheduler.cpu_to_timestamp(overflow), self.overflow)
+
+    def overflow(self):
+        frequency = self.tima_frequency()
+        self.tima_start += (0x100 - self.TIMA) * frequency
+        self.TIMA = self.TMA
+        self.interrupt_manager.request_interrupt(Interrupt.INTERRUPT_TIMER)
+        overflow = self.tima_start + (0x100 - self.TIMA) * frequency
+        self.overflow_event = self.scheduler.schedule(self.scheduler.cpu_to_timestamp(overflow), self.overflow)
+
+    def switch_speed(self):
+        self.sync_tima()
+        self.KEY1 = (self.KEY1 ^ 0b10000000) & 0b10000000
+        self.scheduler.set_double_speed(self.KEY1 & 0b10000000 != 0)
+
+    def tima_running(self) -> bool:
+        return self.TAC & 0x4
+
+    def tima_frequency(self) -> int:
+        return Tima.FREQUENCIES[self.TAC & 0x3]
+
 
 class Tima:
 
+    FREQUENCIES: tuple = (1024, 16, 64, 256)
+
     @staticmethod
     def running() -> bool:
         return Timer.TAC & 0x4
 
     @staticmethod
     def frequency() -> int:
-        return {
-            0x0 : 1024,
-            0x1 : 16,
-            0x2 : 64,
-            0x3 : 256
-        }.get(Timer.TAC & 0x3)
+        return Tima.FREQUENCIES[Timer.TAC & 0x3]
@@ -6,7 +6,6 @@ from threading import Thread
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
-from vsgb.input import Input
 
 
 class Window(Thread):
@@ -17,11 +16,10 @@ class Window(Thread):
     H_SCALE: int = 4
     WINDOW_WIDTH: int = SCREEN_WIDTH * H_SCALE
     WINDOW_HEIGHT: int = SCREEN_HEIGHT * V_SCALE
-    framebuffer: list = [0xffffffff]*(WINDOW_WIDTH * WINDOW_HEIGHT)
-    refresh: bool = False
 
-    def __init__(self):
+    def __init__(self, parent):
         super(Window, self). __init__()
+        self.parent = parent
         
     def run(self):
         glutInit()
@@ -40,13 +38,14 @@ class Window(Thread):
         glutMainLoop()
 
     def draw(self):
-        if Window.refresh:
+        ppu = self.parent.ppu
+        if ppu.refresh:
             glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
             glLoadIdentity()
-            glDrawPixels(Window.SCREEN_WIDTH, Window.SCREEN_HEIGHT, GL_RGBA, GL_UNSIGNED_SHORT_1_5_5_5_REV, Window.framebuffer)
+            glDrawPixels(Window.SCREEN_WIDTH, Window.SCREEN_HEIGHT, GL_RGBA, GL_UNSIGNED_SHORT_1_5_5_5_REV, ppu.framebuffer)
             glFlush()
             glutSwapBuffers()
-            Window.refresh = False
+            ppu.refresh = False
         
 
     def resize(self, width, height):
@@ -71,50 +70,48 @@ class Window(Thread):
     def _glkeyboardspecial(self, c, x, y, up):
         if up:
             if c == GLUT_KEY_UP:
-                Input.BUTTON_UP = False  
+                self.parent.input.BUTTON_UP = False  
             elif c == GLUT_KEY_DOWN:
-                Input.BUTTON_DOWN = False
+                self.parent.input.BUTTON_DOWN = False
             elif c == GLUT_KEY_LEFT:
-                Input.BUTTON_LEFT = False
+                self.parent.input.BUTTON_LEFT = False
             elif c == GLUT_KEY_RIGHT:
-                Input.BUTTON_RIGHT = False
+                self.parent.input.BUTTON_RIGHT = False
             elif c == GLUT_KEY_F4:
-                #self.parent.save_state()
-                print('TODO bind savestate')
+                self.parent.save_state()
             elif c == GLUT_KEY_F5:
-                #self.parent.load_state()    
-                print('TODO bind savestate')
+                self.parent.load_state()
                 
         else:
             if c == GLUT_KEY_UP:
-                Input.BUTTON_UP = True
+                self.parent.input.BUTTON_UP = True
             elif c == GLUT_KEY_DOWN:
-                Input.BUTTON_DOWN = True
+                self.parent.input.BUTTON_DOWN = True
             elif c == GLUT_KEY_LEFT:
-                Input.BUTTON_LEFT = True
+                self.parent.input.BUTTON_LEFT = True
             elif c == GLUT_KEY_RIGHT:
-                Input.BUTTON_RIGHT = True 
+                self.parent.input.BUTTON_RIGHT = True 
 
     def _glkeyboard(self, c, x, y, up):
         if up:
             if c == 'z':
-                Input.BUTTON_A = False
+                self.parent.input.BUTTON_A = False
             elif c == 'x':
-                Input.BUTTON_B = False
+                self.parent.input.BUTTON_B = False
             elif c == chr(13):
-                Input.BUTTON_START = False
+                self.parent.input.BUTTON_START = False
             elif c == chr(8):
-                Input.BUTTON_SELECT = False
+                self.parent.input.BUTTON_SELECT = False
                 
         else:
             if c == 'z':
-                Input.BUTTON_A = True  
+                self.parent.input.BUTTON_A = True  
             elif c == 'x':
-                Input.BUTTON_B = True  
+                self.parent.input.BUTTON_B = True  
             elif c == chr(13):
-                Input.BUTTON_START = True
+                self.parent.input.BUTTON_START = True
             elif c == chr(8):
-                Input.BUTTON_SELECT = True
+                self.parent.input.BUTTON_SELECT = True
                 
 
 